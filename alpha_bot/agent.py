@@ -1,10 +1,14 @@
 """Alpha-Bot 核心逻辑"""
 
-from typing import Optional
+import hashlib
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple
 from loguru import logger
 
-from .models.types import TaskStatus, ExecutionResult
-from .executor.shell import ShellExecutor
+from .models.types import TaskStatus, ExecutionResult, SkillContext, SkillSelectResponse, FLAG_COMPLETE, FLAG_DANGEROUS
+from .executor.shell import ShellExecutor, NO_OUTPUT_TEXT
 from .ui.console import ConsoleUI
 from .skills import SkillManager
 from .context.task_context import TaskContext
@@ -16,12 +20,33 @@ class AlphaBot:
     用自然语言操控你的终端，使用AI技能系统完成各种任务。
     """
     
+    # 技能选择缓存有效期（秒）
+    SELECTOR_CACHE_TTL = 600
+    
+    # 直接LLM模式使用的技能
+    DIRECT_SKILL_NAME = "DirectLLMSkill"
+    
+    # 取数命令成功后，内容处理类任务直接交给直接LLM技能，省去一次技能选择调用
+    FETCH_COMMAND_PATTERN = re.compile(r"^\s*(curl|wget|cat|head|tail|less|more)\b")
+    CONTENT_TASK_PATTERN = re.compile(r"翻译|总结|摘要|概括|translate|summar", re.IGNORECASE)
+    
+    # 危险操作确认时用户选项到操作指令的映射（"e" 需要额外交互，单独处理）
+    _ACTION_MAP = {"q": "quit", "n": "skip", "y": "execute"}
+    
+    # 后台提示学习最多排队的任务数，超出时丢弃新的学习请求
+    MAX_PENDING_HINT_JOBS = 4
+    
     def __init__(
         self,
         auto_execute: bool = False,
         working_dir: Optional[str] = None,
         direct_mode: bool = False,
-        enable_persistence: bool = True
+        enable_persistence: bool = True,
+        enable_semantic_cache: bool = False,
+        semantic_cache_ttl: float = 86400,
+        enable_exec_cache: bool = False,
+        enable_speculation: bool = False,
+        prompt_cache: Optional[bool] = None
     ):
         """
         初始化 Agent
@@ -31,6 +56,14 @@ class AlphaBot:
             working_dir: 工作目录
             direct_mode: 是否强制使用直接LLM模式（翻译、总结等任务）
             enable_persistence: 是否启用技能持久化
+            enable_semantic_cache: 是否启用语义缓存（需要 faiss 和 sentence-transformers）
+            semantic_cache_ttl: 语义缓存条目的有效期（秒），默认一天
+            enable_exec_cache: 是否短时间缓存只读命令（ls、pwd、cat 等）的执行结果（默认关闭）
+            enable_speculation: 是否在命令执行期间预先选择下一步的技能（假设命令成功且没有输出，
+                实际结果与假设一致时才采用）
+            prompt_cache: 是否请求服务端缓存静态提示词前缀（系统提示词和技能列表），
+                只作用于本 Agent 的技能和技能选择器，None 时沿用 OPENAI_PROMPT_CACHE 环境变量
+                （默认只对官方 API 开启）
         """
         self.auto_execute = auto_execute
         self.force_direct_mode = direct_mode
@@ -43,7 +76,30 @@ class AlphaBot:
         self.cancelled = False
         
         # 初始化技能管理器（传递 UI 和 persistence 配置）
-        self.skill_manager = SkillManager(ui=self.ui, enable_persistence=enable_persistence)
+        self.skill_manager = SkillManager(ui=self.ui, enable_persistence=enable_persistence, prompt_cache=prompt_cache)
+        
+        # 技能选择缓存：key -> (skill_name, 写入时间)
+        self._selector_cache: Dict[str, Tuple[str, float]] = {}
+        
+        # 语义缓存：相似的任务和上一步输出直接复用技能响应
+        self.cache_enabled = enable_semantic_cache
+        self.semantic_cache = None
+        if enable_semantic_cache:
+            from .cache import SemanticCache
+            self.semantic_cache = SemanticCache(ttl=semantic_cache_ttl)
+        
+        # 执行缓存：短时间内重复的只读命令直接复用结果
+        self.exec_cache = None
+        if enable_exec_cache:
+            from .cache import ExecCache
+            self.exec_cache = ExecCache()
+        
+        # 推测执行：命令运行期间在后台线程中完成下一步的技能选择
+        self._speculation_pool = ThreadPoolExecutor(max_workers=1) if enable_speculation else None
+        
+        # 提示学习在后台线程中进行，不阻塞任务结束后返回给用户
+        self._hint_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hint-learn")
+        self._hint_jobs: List[Future] = []
     
     def run(self, task: str) -> TaskContext:
         """
@@ -62,15 +118,54 @@ class AlphaBot:
         # 重置取消标志
         self.cancelled = False
         
+        # 技能选择缓存只在一次任务内有效
+        self._selector_cache.clear()
+        
         # 显示任务
         self.ui.print_task(task)
         
         # 重置技能状态
         self.skill_manager.reset_all()
         
+        # 直接LLM模式只有一个固定技能，走专门的单步流程
+        if self.force_direct_mode:
+            return self._run_direct(task, context)
+        
         # 执行任务使用技能系统
         return self._run_with_skills(task, context)
     
+    def _run_direct(self, task: str, context: TaskContext) -> TaskContext:
+        """
+        直接LLM模式：固定使用 DirectLLMSkill 处理任务
+        
+        跳过技能选择、缓存查询、命令执行和危险确认，只调用一次 LLM。
+        
+        Args:
+            task: 任务描述
+            context: 任务上下文
+            
+        Returns:
+            TaskContext: 任务执行上下文
+        """
+        context.iteration = 1
+        self.ui.print_step(context.iteration)
+        
+        skill_context = SkillContext(iteration=context.iteration, history=context.history, memory_bank=context.memory_bank)
+        try:
+            response = self.skill_manager.execute(task, context=skill_context, forced_skill=self.DIRECT_SKILL_NAME)
+        except Exception as e:
+            self.ui.print_error(f"技能执行失败: {e}")
+            context.status = TaskStatus.FAILED
+            return context
+        
+        self.ui.print_skill_response(response, skip_all=True)
+        context.add_result(ExecutionResult(command="", returncode=0, stdout=response.direct_response, stderr="", skill_response=response))
+        
+        context.status = TaskStatus.COMPLETED
+        self.ui.print_complete()
+        self.skill_manager.reset_all()
+        return context
+    
     def _run_with_skills(self, task: str, context: TaskContext) -> TaskContext:
         """
         使用技能系统运行任务
@@ -82,7 +177,11 @@ class AlphaBot:
         Returns:
             TaskContext: 任务执行上下文
         """
-        # Track skill responses for context
+        # 技能上下文在整个任务期间复用，每轮原地更新
+        skill_context = SkillContext(history=context.history, memory_bank=context.memory_bank)
+        
+        # 上一步推测得到、且已核对过假设的技能选择
+        next_selection: Optional[SkillSelectResponse] = None
         
         # 主循环：不断调用技能直到任务完成
         while context.status == TaskStatus.RUNNING:
@@ -96,26 +195,39 @@ class AlphaBot:
             context.iteration += 1
             self.ui.print_step(context.iteration)
             
-            # 准备上下文
-            skill_context = {
-                'last_result': context.last_result,
-                'iteration': context.iteration,
-                'history': context.history,
-                'memory_bank': context.memory_bank,
-            }
+            # 更新上下文
+            skill_context.last_result = context.last_result
+            skill_context.iteration = context.iteration
+            
+            # 相同任务和上一步结果下复用之前的技能选择，省去一次选择器 LLM 调用
+            cache_key = self._selector_cache_key(task, context.last_result)
+            cached_skill = self._get_cached_skill(cache_key) or self._fused_skill(task, context.last_result)
+            selection, next_selection = next_selection, None
+            
+            # 语义缓存命中时直接复用之前的响应
+            semantic_key = None
+            response = None
+            if self.cache_enabled and self.semantic_cache:
+                semantic_key = self.semantic_cache.make_key(task, context.last_result, context.iteration)
+                response = self.semantic_cache.lookup(semantic_key)
             
             # 使用技能管理器执行任务
             try:
-                response = self.skill_manager.execute(
-                    task,
-                    context=skill_context,
-                )
+                if response is None:
+                    response = self.skill_manager.execute(
+                        task,
+                        context=skill_context,
+                        forced_skill=cached_skill,
+                        selection=selection,
+                    )
+                    if semantic_key is not None:
+                        self.semantic_cache.store(semantic_key, response)
             except Exception as e:
                 self.ui.print_error(f"技能执行失败: {e}")
                 context.status = TaskStatus.FAILED
                 
                 # Trigger auto hint learning even on failure to learn from mistakes
-                self._trigger_auto_hint_learning(context, task)
+                self._schedule_auto_hint_learning(context, task)
                 
                 break
             
@@ -124,18 +236,29 @@ class AlphaBot:
             
             # Determine if task is complete based on skill selector's assessment
             # Use task_complete field which is set by the skill selector
-            task_complete = response.task_complete if response.task_complete is not None else False
+            task_complete = bool(response.flags & FLAG_COMPLETE)
             
             
-            # 获取要执行的命令
-            command = response.command.strip() if response.command else ""
+            # 获取要执行的命令（互相独立的多条命令会并发执行）
+            parallel_commands = [c.strip() for c in response.parallel_commands if c and c.strip()]
+            if len(parallel_commands) > 1:
+                command = "\n".join(parallel_commands)
+            else:
+                command = response.command.strip() if response.command else ""
+                if not command and parallel_commands:
+                    command = parallel_commands[0]
+                parallel_commands = []
+            
+            # 不经过执行器的步骤（浏览器、PPT 等技能自行操作）可能改变了文件，缓存的输出不再可信
+            if not command and self.exec_cache is not None:
+                self.exec_cache.clear()
             
             # 如果任务完成且没有命令需要执行，直接退出
             if task_complete and not command:
                 context.status = TaskStatus.COMPLETED
                 self.ui.print_complete()
                 self.skill_manager.reset_all()
-                self._trigger_auto_hint_learning(context, task)
+                self._schedule_auto_hint_learning(context, task)
                 break
             
             # 如果没有命令，跳过
@@ -152,7 +275,7 @@ class AlphaBot:
                 self.ui.print_cancelled()
                 
                 # Trigger auto hint learning even on cancellation to capture partial learning
-                self._trigger_auto_hint_learning(context, task)
+                self._schedule_auto_hint_learning(context, task)
                 
                 break
             elif action == "skip":
@@ -168,14 +291,34 @@ class AlphaBot:
                 continue
             elif action.startswith("edit:"):
                 command = action[5:]
+                parallel_commands = []
+            
+            # 命令执行期间在后台预先选择下一步的技能
+            speculation = None if (task_complete or parallel_commands) else self._start_speculation(task, context, command, response)
             
             # 执行命令
             with self.ui.executing_animation(command):
-                result = self.executor.execute(command)
-            context.add_result(ExecutionResult(command=command, returncode=result.returncode, stdout=result.stdout, stderr=result.stderr, skill_response=response))
+                if parallel_commands:
+                    results = self.executor.execute_batch(parallel_commands)
+                    if self.exec_cache is not None:
+                        for result in results:
+                            self.exec_cache.record(result.command, self.executor.working_dir, result)
+                else:
+                    results = [self._execute_command(command)]
+            
+            for result in results:
+                context.add_result(ExecutionResult(command=result.command, returncode=result.returncode, stdout=result.stdout, stderr=result.stderr, skill_response=response))
+                
+                # 显示执行结果
+                self.ui.print_result(result)
             
-            # 显示执行结果
-            self.ui.print_result(result)
+            # 缓存本次的技能选择：只缓存由选择器选出、未完成任务且命令全部执行成功的步骤
+            if (cached_skill is None and selection is None and response.skill is not None and not task_complete
+                    and all(result.success for result in results)):
+                self._selector_cache[cache_key] = (response.skill_name, time.monotonic())
+            
+            if speculation is not None:
+                next_selection = self._finish_speculation(speculation, context.last_result)
             
             # 如果有错误分析，在执行结果后显示
             if response.error_analysis:
@@ -187,7 +330,7 @@ class AlphaBot:
                 self.ui.print_complete()
                 
                 # Trigger auto hint learning after successful task completion
-                self._trigger_auto_hint_learning(context, task)
+                self._schedule_auto_hint_learning(context, task)
                 
                 # 任务完成后清理技能状态，特别是浏览器技能
                 self.skill_manager.reset_all()
@@ -195,6 +338,102 @@ class AlphaBot:
         
         return context
     
+    def _execute_command(self, command: str) -> ExecutionResult:
+        """执行单条命令，只读命令优先使用执行缓存"""
+        if self.exec_cache is None:
+            return self.executor.execute_streaming(command, on_chunk=self.ui.append_output)
+        
+        cwd = self.executor.working_dir
+        cached = self.exec_cache.get(command, cwd)
+        if cached is not None:
+            return cached
+        
+        result = self.executor.execute_streaming(command, on_chunk=self.ui.append_output)
+        self.exec_cache.record(command, cwd, result)
+        return result
+    
+    def _start_speculation(self, task: str, context: TaskContext, command: str, response) -> Optional[Tuple[Future, ExecutionResult]]:
+        """
+        假设命令成功且没有任何输出（mkdir、cp 等常见情况），在后台为下一步选择技能
+        
+        选择器看到的是完整的假设结果，它对任务是否完成的判断也一并保留。
+        
+        Returns:
+            (选择结果的 Future, 假设的执行结果)，无需推测时返回 None
+        """
+        if self._speculation_pool is None:
+            return None
+        
+        tentative = ExecutionResult(
+            command=command,
+            returncode=0,
+            stdout=NO_OUTPUT_TEXT,
+            stderr="",
+            skill_response=response
+        )
+        tentative_context = {
+            'last_result': tentative,
+            'iteration': context.iteration + 1,
+            'history': context.history + [tentative],
+            'memory_bank': context.memory_bank,
+        }
+        return self._speculation_pool.submit(self.skill_manager.speculative_select, task, tentative_context), tentative
+    
+    @staticmethod
+    def _finish_speculation(speculation: Tuple[Future, ExecutionResult],
+                            result: Optional[ExecutionResult]) -> Optional[SkillSelectResponse]:
+        """
+        实际结果与假设完全一致时采用推测的选择（包括任务是否完成的判断），否则丢弃
+        
+        输出与假设不同时推测的选择没有依据，下一步仍由选择器根据真实输出判断。
+        """
+        future, tentative = speculation
+        if (result is None or result.command != tentative.command or result.returncode != tentative.returncode
+                or result.stdout != tentative.stdout or result.stderr != tentative.stderr):
+            future.cancel()
+            return None
+        return future.result()
+    
+    def _fused_skill(self, task: str, last_result: Optional[ExecutionResult]) -> Optional[str]:
+        """
+        "先取数、再处理"的两步任务：上一步成功取到内容时直接选择直接LLM技能
+        
+        例如翻译网页时先 curl 获取内容，拿到输出后下一步必然是翻译，
+        无需再让选择器调用一次 LLM。
+        """
+        if last_result is None or not last_result.success or not last_result.stdout:
+            return None
+        if last_result.skill_response is None or last_result.skill_response.skill_name == self.DIRECT_SKILL_NAME:
+            return None
+        if not self.FETCH_COMMAND_PATTERN.match(last_result.command):
+            return None
+        if not self.CONTENT_TASK_PATTERN.search(task):
+            return None
+        return self.DIRECT_SKILL_NAME
+    
+    @staticmethod
+    def _selector_cache_key(task: str, last_result: Optional[ExecutionResult]) -> str:
+        """根据任务和上一步执行结果生成技能选择缓存的 key"""
+        last_command = last_result.command if last_result else ""
+        last_returncode = last_result.returncode if last_result else ""
+        raw = f"{task.strip().lower()}|{last_command}|{last_returncode}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _get_cached_skill(self, cache_key: str) -> Optional[str]:
+        """
+        取出未过期的缓存技能名称
+        
+        缓存的选择只使用一次：复用时跳过了选择器对任务是否完成的判断，
+        同样的状态再次出现时交回选择器，让它有机会结束任务。
+        """
+        entry = self._selector_cache.pop(cache_key, None)
+        if entry is None:
+            return None
+        skill_name, stored_at = entry
+        if time.monotonic() - stored_at > self.SELECTOR_CACHE_TTL:
+            return None
+        return skill_name
+    
     def _handle_user_confirmation(self, command: str, response) -> str:
         """
         处理用户确认（只有危险操作才需要确认）
@@ -210,27 +449,18 @@ class AlphaBot:
                 - "quit": 退出
                 - "edit:xxx": 编辑后的命令
         """
-        # 如果是自动执行模式，直接执行
-        if self.auto_execute:
-            return "execute"
-        
-        # 如果不是危险操作，直接执行
-        if not response.is_dangerous:
+        # 自动执行模式或非危险操作，直接执行
+        if self.auto_execute or not response.flags & FLAG_DANGEROUS:
             return "execute"
         
         # 危险操作，显示警告并要求确认
         self.ui.print_danger_warning(response.danger_reason)
         choice = self.ui.prompt_action()
         
-        if choice == "q":
-            return "quit"
-        elif choice == "n":
-            return "skip"
-        elif choice == "e":
+        if choice == "e":
             edited = self.ui.prompt_edit_command(command)
             return f"edit:{edited}"
-        else:  # "y"
-            return "execute"
+        return self._ACTION_MAP.get(choice, "execute")
     
     def run_interactive(self):
         """运行交互模式"""
@@ -251,27 +481,63 @@ class AlphaBot:
                 self.ui.console.print("\n[yellow]再见![/yellow]")
                 break
     
-    def _trigger_auto_hint_learning(self, context, task_description: str):
+    def _schedule_auto_hint_learning(self, context, task_description: str):
         """
-        Trigger auto hint learning after task completion
+        Queue auto hint learning on the background worker
+        
+        History and skills are copied first so the next run() can't change
+        them while the analysis is in progress.
         
         Args:
             context: Task context with execution history
             task_description: Original task description
         """
+        self._hint_jobs = [job for job in self._hint_jobs if not job.done()]
+        if len(self._hint_jobs) >= self.MAX_PENDING_HINT_JOBS:
+            logger.warning("Auto hint learning queue is full, skipping this task")
+            return
+        
+        self._hint_jobs.append(self._hint_pool.submit(
+            self._trigger_auto_hint_learning,
+            list(context.history),
+            list(self.skill_manager.skills),
+            task_description
+        ))
+    
+    def _trigger_auto_hint_learning(self, history, skills, task_description: str):
+        """
+        Trigger auto hint learning after task completion
+        
+        Args:
+            history: Snapshot of the task's execution history
+            skills: Snapshot of the available skills
+            task_description: Original task description
+        """
         try:
             from .auto_hint import get_auto_hint_system
             auto_hint_system = get_auto_hint_system()
             
             # Only trigger learning if we have sufficient history
-            if len(context.history) >= 2:
-                auto_hint_system.process_task_completion(
-                    context.history, 
-                    self.skill_manager.skills, 
+            if len(history) >= 2:
+                # The hint system's own worker runs the analysis and batches
+                # saves across tasks that complete close together
+                if auto_hint_system.submit_task_completion(
+                    history, 
+                    skills, 
                     task_description
-                )
-                logger.info("Auto hint learning triggered after task completion")
+                ):
+                    logger.info("Auto hint learning queued after task completion")
             else:
                 logger.info("Insufficient execution history for hint learning")
         except Exception as e:
             logger.warning(f"Failed to trigger auto hint learning: {e}")
+    
+    def close(self):
+        """
+        释放后台线程池
+        
+        不等待正在进行的提示学习；解释器退出时仍会等它完成。
+        """
+        self._hint_pool.shutdown(wait=False)
+        if self._speculation_pool is not None:
+            self._speculation_pool.shutdown(wait=False)
@@ -1,11 +1,17 @@
 """Auto Hint System - Automatically extract skill hints from execution history"""
 
 from .types import HintPattern, HintCategory, HintMetadata
-from .analyzer import ExecutionResultAnalyzer
 from .generator import HintGenerator
 from .persistence import HintPersistenceManager
 # Import system after other modules to avoid circular imports
 
+def __getattr__(name):
+    # The analyzer (and its optional numeric backends) is only imported when first used
+    if name == 'ExecutionResultAnalyzer':
+        from .analyzer import ExecutionResultAnalyzer
+        return ExecutionResultAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def get_auto_hint_system(enable_persistence=True):
     """Get or create the global auto hint system instance"""
     from .system import get_auto_hint_system as _get_auto_hint_system
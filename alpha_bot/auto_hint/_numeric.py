@@ -0,0 +1,110 @@
+"""Numeric kernels over the success-flag column of a HistoryView
+
+The column is an ``array('B')`` of 0/1 flags, one byte per row, which
+NumPy can view without copying. Each kernel has up to three
+implementations, picked at import time: a Numba-compiled loop
+(``cache=True`` so compilation happens once per machine), a pure NumPy
+version, and a plain Python fallback. Neither numba nor numpy is a
+dependency; results are identical whichever is used.
+"""
+
+from array import array
+from typing import List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if np is not None and njit is not None:
+    @njit(cache=True)
+    def _max_run_of_zeros_jit(ok):
+        best = 0
+        run = 0
+        for flag in ok:
+            if flag:
+                run = 0
+            else:
+                run += 1
+                if run > best:
+                    best = run
+        return best
+
+    @njit(cache=True)
+    def _segment_success_runs_jit(ok, min_len):
+        runs = np.empty((len(ok) // max(min_len, 1) + 1, 2), dtype=np.int64)
+        count = 0
+        start = -1
+        for i in range(len(ok) + 1):
+            if i < len(ok) and ok[i]:
+                if start < 0:
+                    start = i
+            elif start >= 0:
+                if i - start >= min_len:
+                    runs[count, 0] = start
+                    runs[count, 1] = i
+                    count += 1
+                start = -1
+        return runs[:count]
+else:
+    _max_run_of_zeros_jit = None
+    _segment_success_runs_jit = None
+
+
+def as_flags(ok: array):
+    """Zero-copy uint8 NumPy view of an array('B') success column"""
+    return np.frombuffer(ok, dtype=np.uint8)
+
+
+def max_run_of_zeros(ok: array) -> int:
+    """Length of the longest run of failures (zeros) in a success-flag column"""
+    if _max_run_of_zeros_jit is not None:
+        return int(_max_run_of_zeros_jit(as_flags(ok)))
+
+    if np is not None:
+        # Distance between neighbouring successes (with sentinels at both ends) minus one is a failure run
+        idx = np.flatnonzero(np.r_[1, as_flags(ok), 1])
+        return int((np.diff(idx) - 1).max())
+
+    run = 0
+    best = 0
+    for flag in ok:
+        if flag:
+            run = 0
+        else:
+            run += 1
+            best = max(best, run)
+    return best
+
+
+def segment_success_runs(ok: array, min_len: int) -> List[Tuple[int, int]]:
+    """Half-open (start, end) row ranges of success runs at least `min_len` long"""
+    if _segment_success_runs_jit is not None:
+        return [(int(s), int(e)) for s, e in _segment_success_runs_jit(as_flags(ok), min_len)]
+
+    if np is not None:
+        edges = np.diff(np.r_[0, as_flags(ok) != 0, 0].astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        keep = ends - starts >= min_len
+        return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+    runs = []
+    start = None
+    for i, flag in enumerate(ok):
+        if flag:
+            if start is None:
+                start = i
+        elif start is not None:
+            if i - start >= min_len:
+                runs.append((start, i))
+            start = None
+    if start is not None and len(ok) - start >= min_len:
+        runs.append((start, len(ok)))
+    return runs
@@ -1,13 +1,193 @@
 """Execution Result Analyzer - Analyze execution history to discover patterns"""
 
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
 import re
+import sys
 from loguru import logger
 
-from ..models.types import ExecutionResult
+from ..models.types import ExecutionResult, SLOTS
 # Import moved to function level to avoid circular import
 from .types import HintPattern, HintCategory, ExecutionAnalysisResult
+from ._numeric import as_flags, max_run_of_zeros, segment_success_runs
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Keyword tokens for context extraction and the words never worth keeping
+_WORD = re.compile(r"[a-z0-9_]{4,}")
+_STOPWORDS = frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+# Single-pass command normalizer: each alternative maps to a placeholder
+_NORMALIZER = re.compile(
+    r"(?P<url>https?://\S+)"
+    r"|(?P<path>/\S*)"
+    r"|(?P<home>~\S*)"
+    r"|(?P<file>[a-zA-Z0-9_\-]+\.(?:txt|py|md|json|yaml|yml))"
+    r"|(?P<num>\b\d+\b)"
+)
+_PLACEHOLDERS = {
+    "url": "URL",
+    "path": "/PATH",
+    "home": "~/PATH",
+    "file": "FILE.EXT",
+    "num": "NUM",
+}
+
+# Ordered (substring, label) table for error classification; first match wins
+_ERROR_CLASSES = (
+    ("permission denied", "permission_error"),
+    ("file not found", "file_not_found"),
+    ("no such file", "file_not_found"),
+    ("command not found", "command_not_found"),
+    ("syntax error", "syntax_error"),
+    ("timeout", "timeout"),
+    ("connection refused", "connection_error"),
+    ("connection failed", "connection_error"),
+    ("invalid", "invalid_input"),
+    ("memory", "memory_error"),
+)
+
+
+def _placeholder(match: "re.Match") -> str:
+    return _PLACEHOLDERS[match.lastgroup]
+
+
+@lru_cache(maxsize=4096)
+def _normalize_command(command: str) -> Optional[str]:
+    """Normalize command for pattern matching (memoized: real histories repeat commands a lot)"""
+    if not command.strip():
+        return None
+    
+    # Replace URLs, paths, filenames and numbers with placeholders in one pass
+    normalized = _NORMALIZER.sub(_placeholder, command)
+    
+    # Interned: the same key is hashed and compared across every group lookup
+    return sys.intern(normalized.strip())
+
+
+@dataclass(**SLOTS)
+class _SkillAgg:
+    """Per-skill execution totals for the insights block"""
+    total: int = 0
+    success: int = 0
+    commands: List[str] = field(default_factory=list)  # first 3 commands only
+
+
+def _per_skill_stats(view: "HistoryView") -> Dict[str, _SkillAgg]:
+    """Per-skill totals, successes and first commands, keyed in order of first appearance"""
+    rows = [i for i, name in enumerate(view.skill_names) if name]
+    if np is not None and rows:
+        rows = np.asarray(rows)
+        names = np.array([view.skill_names[i] for i in rows], dtype=object)
+        uniq, first, inverse = np.unique(names, return_index=True, return_inverse=True)
+        totals = np.bincount(inverse)
+        successes = np.bincount(inverse, weights=as_flags(view.ok)[rows])
+        return {
+            uniq[k]: _SkillAgg(
+                total=int(totals[k]),
+                success=int(successes[k]),
+                commands=[view.commands[i] for i in rows[inverse == k][:3]],
+            )
+            for k in np.argsort(first, kind="stable")
+        }
+    
+    skill_stats: Dict[str, _SkillAgg] = {}
+    for i in rows:
+        name = view.skill_names[i]
+        stats = skill_stats.get(name)
+        if stats is None:
+            stats = skill_stats[name] = _SkillAgg()
+        stats.total += 1
+        stats.success += view.ok[i]
+        if len(stats.commands) < 3:
+            stats.commands.append(view.commands[i])
+    return skill_stats
+
+
+class HistoryView:
+    """
+    Column-oriented view of an execution history
+    
+    Built once per analysis so the extractors scan flat parallel lists instead
+    of dereferencing `result.skill_response.skill_name` etc. on every pass.
+    Skill names are interned, so they (and the HintPattern.skill_name values
+    derived from them) are shared strings that compare by identity first.
+    """
+    
+    __slots__ = ("size", "commands", "commands_lower", "ok", "skill_names", "stderrs", "stderrs_lower", "thinkings")
+    
+    def __init__(self, history: List[ExecutionResult]):
+        self.size = len(history)
+        self.commands: List[str] = []
+        self.commands_lower: List[str] = []
+        # One byte per row rather than a bool object per result
+        self.ok = array("B")
+        # None when the result has no skill response
+        self.skill_names: List[Optional[str]] = []
+        self.stderrs: List[str] = []
+        # Lowered once here so classification and keyword extraction don't copy per use
+        self.stderrs_lower: List[str] = []
+        self.thinkings: List[str] = []
+        
+        for result in history:
+            skill_response = result.skill_response
+            command = result.command or ""
+            self.commands.append(command)
+            self.commands_lower.append(command.lower())
+            self.ok.append(1 if result.success else 0)
+            stderr = result.stderr or ""
+            self.stderrs.append(stderr)
+            self.stderrs_lower.append(stderr.lower())
+            if skill_response:
+                skill_name = skill_response.skill_name
+                self.skill_names.append(sys.intern(skill_name) if skill_name else skill_name)
+                self.thinkings.append(getattr(skill_response, "thinking", "") or "")
+            else:
+                self.skill_names.append(None)
+                self.thinkings.append("")
+
+
+@dataclass(**SLOTS)
+class _Agg:
+    """One group of history rows: the first row's skill and member row indices (4 bytes each)"""
+    skill: str
+    rows: array = field(default_factory=lambda: array("i"))
+    
+    def successes(self, view: "HistoryView") -> int:
+        """Number of successful rows in the group"""
+        if np is not None:
+            return int(as_flags(view.ok)[np.frombuffer(self.rows, dtype=np.intc)].sum())
+        ok = view.ok
+        return sum(ok[i] for i in self.rows)
+    
+    def failed_rows(self, view: "HistoryView", limit: int) -> List[int]:
+        """First `limit` failed rows of the group"""
+        if np is not None:
+            rows = np.frombuffer(self.rows, dtype=np.intc)
+            return rows[as_flags(view.ok)[rows] == 0][:limit].tolist()
+        ok = view.ok
+        return [i for i in self.rows if not ok[i]][:limit]
+
+
+@dataclass
+class _HistoryAggregate:
+    """Groups of a HistoryView built in one pass by ExecutionResultAnalyzer._aggregate"""
+    command_groups: Dict[str, _Agg] = field(default_factory=dict)
+    error_groups: Dict[str, _Agg] = field(default_factory=dict)
+    success_sequences: List[range] = field(default_factory=list)
+    skill_groups: Dict[str, _Agg] = field(default_factory=dict)
 
 
 class ExecutionResultAnalyzer:
@@ -19,6 +199,22 @@ class ExecutionResultAnalyzer:
         self.min_frequency_threshold = 3 # Minimum frequency to consider a pattern
         self.min_confidence_threshold = 0.8  # Minimum confidence for pattern extraction
         self.success_rate_threshold = 0.8  # Threshold for successful patterns
+        self._error_automaton = self._build_error_automaton()
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _build_error_automaton():
+        """Build an Aho-Corasick automaton over the error table (None if pyahocorasick is missing)
+        
+        Built once per process and shared by all analyzers; it is only read after construction.
+        """
+        if ahocorasick is None:
+            return None
+        automaton = ahocorasick.Automaton()
+        for priority, (needle, label) in enumerate(_ERROR_CLASSES):
+            automaton.add_word(needle, (priority, label))
+        automaton.make_automaton()
+        return automaton
     
     def analyze_history(self, history: List[ExecutionResult], skills) -> ExecutionAnalysisResult:
         """
@@ -34,25 +230,29 @@ class ExecutionResultAnalyzer:
         if not history:
             return ExecutionAnalysisResult()
         
+        # Too short for any group to reach the frequency threshold: only the overall numbers are meaningful
+        if len(history) < self.min_frequency_threshold:
+            return ExecutionAnalysisResult(skill_insights=self._lightweight_insights(history))
+        
         logger.info(f"Analyzing execution history with {len(history)} steps")
         
-        # Extract patterns by different dimensions
-        command_patterns = self._extract_command_patterns(history)
-        error_patterns = self._extract_error_patterns(history)
-        success_patterns = self._extract_success_patterns(history)
-        skill_usage_patterns = self._extract_skill_usage_patterns(history, skills)
+        # Build the columnar view and group it once, then extract patterns by different dimensions
+        view = HistoryView(history)
+        agg = self._aggregate(view)
+        command_patterns = self._extract_command_patterns(view, agg)
+        error_patterns = self._extract_error_patterns(view, agg)
+        success_patterns = self._extract_success_patterns(view, agg)
+        skill_usage_patterns = self._extract_skill_usage_patterns(view, agg)
         
         # Combine all patterns
         all_patterns = command_patterns + error_patterns + success_patterns + skill_usage_patterns
         
         # Filter and categorize patterns
-        filtered_patterns = self._filter_patterns(all_patterns)
-        success_patterns = [p for p in filtered_patterns if p.category == HintCategory.SUCCESS_PATTERN]
-        failure_patterns = [p for p in filtered_patterns if p.category == HintCategory.FAILURE_PATTERN]
+        filtered_patterns, success_patterns, failure_patterns = self._filter_patterns(all_patterns)
         
         # Generate insights
-        improvement_opportunities = self._generate_improvement_opportunities(history, failure_patterns)
-        skill_insights = self._generate_skill_insights(history, skills)
+        improvement_opportunities = self._generate_improvement_opportunities(view, failure_patterns)
+        skill_insights = self._generate_skill_insights(view, skills)
         
         result = ExecutionAnalysisResult(
             patterns=filtered_patterns,
@@ -65,131 +265,129 @@ class ExecutionResultAnalyzer:
         logger.info(f"Analysis complete: {len(result.patterns)} patterns discovered")
         return result
     
-    def _extract_command_patterns(self, history: List[ExecutionResult]) -> List[HintPattern]:
-        """Extract patterns from command execution"""
-        patterns = []
-        
-        # Group by similar commands
-        command_groups = defaultdict(list)
-        
-        for result in history:
-            if result.command and result.skill_response:
+    def _aggregate(self, view: HistoryView) -> _HistoryAggregate:
+        """Group the history rows by command, error type, success run and skill in a single pass"""
+        agg = _HistoryAggregate()
+        command_groups = agg.command_groups
+        error_groups = agg.error_groups
+        skill_groups = agg.skill_groups
+        
+        for i, (command, ok, skill_name, stderr) in enumerate(
+            zip(view.commands, view.ok, view.skill_names, view.stderrs)
+        ):
+            if command and skill_name is not None:
                 # Normalize command for pattern matching
-                normalized_cmd = self._normalize_command(result.command)
+                normalized_cmd = _normalize_command(command)
                 if normalized_cmd:
-                    command_groups[normalized_cmd].append(result)
+                    group = command_groups.get(normalized_cmd)
+                    if group is None:
+                        group = command_groups[normalized_cmd] = _Agg(skill_name)
+                    group.rows.append(i)
+            
+            if not ok and stderr:
+                # Extract error type/categories
+                error_type = self._classify_error(view.stderrs_lower[i])
+                if error_type:
+                    group = error_groups.get(error_type)
+                    if group is None:
+                        group = error_groups[error_type] = _Agg(
+                            skill_name if skill_name is not None else "unknown"
+                        )
+                    group.rows.append(i)
+            
+            if skill_name:
+                group = skill_groups.get(skill_name)
+                if group is None:
+                    group = skill_groups[skill_name] = _Agg(skill_name)
+                group.rows.append(i)
+        
+        # Runs of at least 2 consecutive successes
+        agg.success_sequences = [range(start, end) for start, end in segment_success_runs(view.ok, 2)]
+        
+        return agg
+    
+    def _extract_command_patterns(self, view: HistoryView, agg: _HistoryAggregate) -> List[HintPattern]:
+        """Extract patterns from command execution"""
+        patterns = []
+        commands = view.commands
         
         # Create patterns for frequently used command types
-        for cmd_pattern, results in command_groups.items():
-            if len(results) >= self.min_frequency_threshold:
-                success_count = sum(1 for r in results if r.success)
-                success_rate = success_count / len(results)
+        for cmd_pattern, group in agg.command_groups.items():
+            count = len(group.rows)
+            if count >= self.min_frequency_threshold:
+                success_rate = group.successes(view) / count
                 
                 pattern = HintPattern(
                     category=HintCategory.SUCCESS_PATTERN if success_rate >= self.success_rate_threshold 
                             else HintCategory.FAILURE_PATTERN,
-                    skill_name=results[0].skill_response.skill_name if results[0].skill_response else "unknown",
+                    skill_name=group.skill,
                     pattern_description=f"Command pattern: {cmd_pattern}",
-                    context_keywords=self._extract_context_keywords(results),
+                    context_keywords=self._extract_context_keywords(view, group.rows),
                     success_rate=success_rate,
-                    frequency=len(results),
-                    confidence=min(1.0, len(results) / 10.0),  # Normalize confidence
-                    examples=[r.command for r in results[:3]],  # First 3 examples
-                    anti_examples=[r.command for r in results if not r.success][:3]  # First 3 failures
+                    frequency=count,
+                    confidence=min(1.0, count / 10.0),  # Normalize confidence
+                    examples=[commands[i] for i in group.rows[:3]],  # First 3 examples
+                    anti_examples=[commands[i] for i in group.failed_rows(view, 3)]  # First 3 failures
                 )
                 patterns.append(pattern)
         
         return patterns
     
-    def _extract_error_patterns(self, history: List[ExecutionResult]) -> List[HintPattern]:
+    def _extract_error_patterns(self, view: HistoryView, agg: _HistoryAggregate) -> List[HintPattern]:
         """Extract patterns from error messages"""
         patterns = []
-        error_groups = defaultdict(list)
+        commands, stderrs = view.commands, view.stderrs
         
-        for result in history:
-            if result.stderr and not result.success:
-                # Extract error type/categories
-                error_type = self._classify_error(result.stderr)
-                if error_type:
-                    error_groups[error_type].append(result)
-        
-        for error_type, results in error_groups.items():
-            if len(results) >= self.min_frequency_threshold:
+        for error_type, group in agg.error_groups.items():
+            count = len(group.rows)
+            if count >= self.min_frequency_threshold:
                 pattern = HintPattern(
                     category=HintCategory.TROUBLESHOOTING,
-                    skill_name=results[0].skill_response.skill_name if results[0].skill_response else "unknown",
+                    skill_name=group.skill,
                     pattern_description=f"Error pattern: {error_type}",
-                    context_keywords=[error_type] + self._extract_context_keywords(results),
+                    context_keywords=[error_type] + self._extract_context_keywords(view, group.rows),
                     success_rate=0.0,  # All are failures
-                    frequency=len(results),
-                    confidence=min(1.0, len(results) / 5.0),
-                    examples=[f"Command: {r.command}\nError: {r.stderr[:100]}" for r in results[:3]]
+                    frequency=count,
+                    confidence=min(1.0, count / 5.0),
+                    examples=[f"Command: {commands[i]}\nError: {stderrs[i][:100]}" for i in group.rows[:3]]
                 )
                 patterns.append(pattern)
         
         return patterns
     
-    def _extract_success_patterns(self, history: List[ExecutionResult]) -> List[HintPattern]:
+    def _extract_success_patterns(self, view: HistoryView, agg: _HistoryAggregate) -> List[HintPattern]:
         """Extract patterns from successful executions"""
         patterns = []
-        
-        # Find successful command sequences
-        success_sequences = []
-        current_sequence = []
-        
-        for result in history:
-            if result.success:
-                current_sequence.append(result)
-            else:
-                if len(current_sequence) >= 2:  # At least 2 consecutive successes
-                    success_sequences.append(current_sequence)
-                current_sequence = []
-        
-        # Don't forget the last sequence
-        if len(current_sequence) >= 2:
-            success_sequences.append(current_sequence)
+        commands, skill_names = view.commands, view.skill_names
         
         # Create patterns from successful sequences
-        for i, sequence in enumerate(success_sequences):
-            if len(sequence) >= 2:
-                skill_names = [r.skill_response.skill_name for r in sequence if r.skill_response]
-                unique_skills = list(set(skill_names))
-                
-                pattern = HintPattern(
-                    category=HintCategory.SUCCESS_PATTERN,
-                    skill_name=",".join(unique_skills) if unique_skills else "unknown",
-                    pattern_description=f"Successful execution sequence #{i+1}",
-                    context_keywords=self._extract_context_keywords(sequence),
-                    success_rate=1.0,
-                    frequency=1,
-                    confidence=0.9,
-                    examples=[f"Step {j+1}: {r.command}" for j, r in enumerate(sequence)]
-                )
-                patterns.append(pattern)
+        for i, sequence in enumerate(agg.success_sequences):
+            unique_skills = list(set(skill_names[j] for j in sequence if skill_names[j] is not None))
+            
+            pattern = HintPattern(
+                category=HintCategory.SUCCESS_PATTERN,
+                skill_name=",".join(unique_skills) if unique_skills else "unknown",
+                pattern_description=f"Successful execution sequence #{i+1}",
+                context_keywords=self._extract_context_keywords(view, sequence),
+                success_rate=1.0,
+                frequency=1,
+                confidence=0.9,
+                examples=[f"Step {step+1}: {commands[j]}" for step, j in enumerate(sequence)]
+            )
+            patterns.append(pattern)
         
         return patterns
     
-    def _extract_skill_usage_patterns(self, history: List[ExecutionResult], skills) -> List[HintPattern]:
+    def _extract_skill_usage_patterns(self, view: HistoryView, agg: _HistoryAggregate) -> List[HintPattern]:
         """Extract patterns related to skill usage"""
         patterns = []
-        
-        # Analyze skill selection patterns
-        skill_selection_counts = defaultdict(int)
-        for result in history:
-            if result.skill_response and result.skill_response.skill_name:
-                skill_selection_counts[result.skill_response.skill_name] += 1
+        commands = view.commands
         
         # Create patterns for frequently selected skills
-        for skill_name, count in skill_selection_counts.items():
+        for skill_name, group in agg.skill_groups.items():
+            count = len(group.rows)
             if count >= self.min_frequency_threshold:
-                # Get examples for this skill
-                skill_examples = [
-                    r for r in history 
-                    if r.skill_response and r.skill_response.skill_name == skill_name
-                ]
-                
-                success_count = sum(1 for r in skill_examples if r.success)
-                success_rate = success_count / len(skill_examples) if skill_examples else 0
+                success_rate = group.successes(view) / count
                 
                 pattern = HintPattern(
                     category=HintCategory.SUCCESS_PATTERN if success_rate >= self.success_rate_threshold 
@@ -200,22 +398,33 @@ class ExecutionResultAnalyzer:
                     success_rate=success_rate,
                     frequency=count,
                     confidence=min(1.0, count / 8.0),
-                    examples=[r.command for r in skill_examples[:3]]
+                    examples=[commands[i] for i in group.rows[:3]]
                 )
                 patterns.append(pattern)
         
         return patterns
     
-    def _filter_patterns(self, patterns: List[HintPattern]) -> List[HintPattern]:
-        """Filter patterns based on confidence and frequency thresholds"""
-        filtered = []
+    def _filter_patterns(self, patterns: List[HintPattern]
+                         ) -> Tuple[List[HintPattern], List[HintPattern], List[HintPattern]]:
+        """
+        Filter patterns based on confidence and frequency thresholds
+        
+        Returns:
+            (all kept patterns in input order, kept success patterns, kept failure patterns)
+        """
+        filtered, success, failure = [], [], []
+        min_frequency, min_confidence = self.min_frequency_threshold, self.min_confidence_threshold
         for pattern in patterns:
-            if (pattern.frequency >= self.min_frequency_threshold and 
-                pattern.confidence >= self.min_confidence_threshold):
-                filtered.append(pattern)
-        return filtered
+            if pattern.frequency < min_frequency or pattern.confidence < min_confidence:
+                continue
+            filtered.append(pattern)
+            if pattern.category == HintCategory.SUCCESS_PATTERN:
+                success.append(pattern)
+            elif pattern.category == HintCategory.FAILURE_PATTERN:
+                failure.append(pattern)
+        return filtered, success, failure
     
-    def _generate_improvement_opportunities(self, history: List[ExecutionResult], 
+    def _generate_improvement_opportunities(self, view: HistoryView, 
                                           failure_patterns: List[HintPattern]) -> List[str]:
         """Generate improvement opportunities based on failure analysis"""
         opportunities = []
@@ -225,135 +434,90 @@ class ExecutionResultAnalyzer:
             opportunities.append("Identify and address common failure patterns in execution")
         
         # Check for repeated failures
-        consecutive_failures = 0
-        max_consecutive_failures = 0
-        for result in history:
-            if not result.success:
-                consecutive_failures += 1
-                max_consecutive_failures = max(max_consecutive_failures, consecutive_failures)
-            else:
-                consecutive_failures = 0
+        max_consecutive_failures = max_run_of_zeros(view.ok)
         
         if max_consecutive_failures > 2:
             opportunities.append(f"Address pattern of {max_consecutive_failures} consecutive failures")
         
         # Check for skill diversity
-        skill_names = [
-            r.skill_response.skill_name for r in history 
-            if r.skill_response and r.skill_response.skill_name
-        ]
-        unique_skills = set(skill_names)
-        if len(unique_skills) == 1 and len(history) > 3:
+        unique_skills = set(name for name in view.skill_names if name)
+        if len(unique_skills) == 1 and view.size > 3:
             opportunities.append("Consider using different skills for better task distribution")
         
         return opportunities
     
-    def _generate_skill_insights(self, history: List[ExecutionResult], 
+    @staticmethod
+    def _overall_insights(total_executions: int, successful_executions: int) -> Dict[str, Any]:
+        return {
+            "total_executions": total_executions,
+            "successful_executions": successful_executions,
+            "success_rate": successful_executions / total_executions if total_executions > 0 else 0
+        }
+    
+    def _lightweight_insights(self, history: List[ExecutionResult]) -> Dict[str, Any]:
+        """Overall statistics only, for histories too short to analyze"""
+        return {"overall": self._overall_insights(len(history), sum(1 for r in history if r.success))}
+    
+    def _generate_skill_insights(self, view: HistoryView, 
                                 skills) -> Dict[str, Any]:
         """Generate insights about skill performance"""
         insights = {}
         
         # Overall statistics
-        total_executions = len(history)
-        successful_executions = sum(1 for r in history if r.success)
-        success_rate = successful_executions / total_executions if total_executions > 0 else 0
-        
-        insights["overall"] = {
-            "total_executions": total_executions,
-            "successful_executions": successful_executions,
-            "success_rate": success_rate
-        }
+        successful_executions = int(as_flags(view.ok).sum()) if np is not None else sum(view.ok)
+        insights["overall"] = self._overall_insights(view.size, successful_executions)
         
         # Per-skill statistics
-        skill_stats = defaultdict(lambda: {"total": 0, "success": 0, "commands": []})
-        for result in history:
-            if result.skill_response and result.skill_response.skill_name:
-                skill_name = result.skill_response.skill_name
-                skill_stats[skill_name]["total"] += 1
-                if result.success:
-                    skill_stats[skill_name]["success"] += 1
-                skill_stats[skill_name]["commands"].append(result.command)
+        skill_stats = _per_skill_stats(view)
         
         insights["per_skill"] = {
             skill: {
-                "total_executions": stats["total"],
-                "success_rate": stats["success"] / stats["total"] if stats["total"] > 0 else 0,
-                "sample_commands": stats["commands"][:3]
+                "total_executions": stats.total,
+                "success_rate": stats.success / stats.total if stats.total > 0 else 0,
+                "sample_commands": stats.commands
             }
             for skill, stats in skill_stats.items()
         }
         
         return insights
     
-    def _normalize_command(self, command: str) -> Optional[str]:
-        """Normalize command for pattern matching"""
-        if not command.strip():
-            return None
-        
-        # Remove specific values and keep structure
-        normalized = command
-        
-        # Replace file paths with generic placeholder
-        normalized = re.sub(r'/[^\s]*', '/PATH', normalized)
-        normalized = re.sub(r'~[^\s]*', '~/PATH', normalized)
-        
-        # Replace specific filenames with generic placeholder
-        normalized = re.sub(r'[a-zA-Z0-9_\-]+\.(txt|py|md|json|yaml|yml)', 'FILE.EXT', normalized)
-        
-        # Replace numbers with generic placeholder
-        normalized = re.sub(r'\b\d+\b', 'NUM', normalized)
-        
-        # Replace URLs with generic placeholder
-        normalized = re.sub(r'https?://[^\s]+', 'URL', normalized)
-        
-        return normalized.strip()
-    
     def _classify_error(self, error_output: str) -> Optional[str]:
-        """Classify error type from error output"""
-        error_output = error_output.lower()
-        
-        # Common error classifications
-        if "permission denied" in error_output:
-            return "permission_error"
-        elif "file not found" in error_output or "no such file" in error_output:
-            return "file_not_found"
-        elif "command not found" in error_output:
-            return "command_not_found"
-        elif "syntax error" in error_output:
-            return "syntax_error"
-        elif "timeout" in error_output:
-            return "timeout"
-        elif "connection refused" in error_output or "connection failed" in error_output:
-            return "connection_error"
-        elif "invalid" in error_output:
-            return "invalid_input"
-        elif "memory" in error_output:
-            return "memory_error"
-        else:
-            return None
+        """Classify error type from already-lowercased error output"""
+        # Single pass over stderr; the highest-priority hit wins
+        if self._error_automaton is not None:
+            best = min((hit for _, hit in self._error_automaton.iter(error_output)), default=None)
+            return best[1] if best else None
+        
+        # Common error classifications, checked in priority order
+        for needle, label in _ERROR_CLASSES:
+            if needle in error_output:
+                return label
+        return None
     
-    def _extract_context_keywords(self, results: List[ExecutionResult]) -> List[str]:
-        """Extract context keywords from execution results"""
-        keywords = []
-        
-        for result in results:
-            # Extract from command
-            if result.command:
-                # Extract command verbs
-                words = result.command.lower().split()
-                keywords.extend([w for w in words if len(w) > 3])
-            
-            # Extract from skill name
-            if result.skill_response and result.skill_response.skill_name:
-                keywords.append(result.skill_response.skill_name.lower())
-            
-            # Extract from thinking/output
-            if result.skill_response and hasattr(result.skill_response, 'thinking') and result.skill_response.thinking:
-                thinking_words = result.skill_response.thinking.lower().split()
-                keywords.extend([w for w in thinking_words if len(w) > 4])
-        
-        # Remove duplicates and common words
-        common_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        unique_keywords = list(set(k for k in keywords if k not in common_words))
-        
-        return unique_keywords[:10]  # Limit to top 10 keywords
\ No newline at end of file
+    def _row_keywords(self, view: HistoryView, i: int) -> Iterator[str]:
+        """Context keywords contributed by one row of the history, stopwords removed"""
+        # Extract command verbs
+        command = view.commands_lower[i]
+        if command:
+            yield from (w for w in _WORD.findall(command) if w not in _STOPWORDS)
+        
+        # Extract from skill name
+        skill_name = view.skill_names[i]
+        if skill_name:
+            yield skill_name.lower()
+        
+        # Extract from thinking/output
+        thinking = view.thinkings[i]
+        if thinking:
+            yield from (w for w in _WORD.findall(thinking.lower()) if len(w) > 4 and w not in _STOPWORDS)
+    
+    @staticmethod
+    def _top_keywords(keywords: Counter) -> List[str]:
+        return [word for word, _ in keywords.most_common(10)]  # Limit to top 10 keywords
+    
+    def _extract_context_keywords(self, view: HistoryView, rows: Iterable[int]) -> List[str]:
+        """Extract the most frequent context keywords from the given rows of the history"""
+        keywords = Counter()
+        for i in rows:
+            keywords.update(self._row_keywords(view, i))
+        return self._top_keywords(keywords)
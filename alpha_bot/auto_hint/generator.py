@@ -1,36 +1,174 @@
 """Hint Generator - Generate hints content from discovered patterns"""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from collections import OrderedDict, defaultdict
 from datetime import datetime
+from itertools import islice
+import asyncio
 import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
 from loguru import logger
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ..llm.cache import LLMResponseCache
 from ..llm.openai_client import OpenAIClient
 from .types import HintPattern, HintCategory, HintMetadata, ExecutionAnalysisResult
 
 
+def _dumps(obj: Any) -> str:
+    """Indented JSON for prompts, via orjson when it is installed"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # Not serializable by orjson (e.g. int subclasses); let json try
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+# Error keywords in failure pattern descriptions, one named group per label
+_ERR_RE = re.compile(
+    r"(?P<permission>permission)|(?P<path>file not found|no such file)|(?P<cmd>command not found)"
+    r"|(?P<syntax>syntax)|(?P<timeout>timeout)|(?P<conn>connection)",
+    re.IGNORECASE
+)
+_ERR_LABELS = {
+    "permission": "Permission Issues",
+    "path": "File/Path Issues",
+    "cmd": "Command Issues",
+    "syntax": "Syntax Errors",
+    "timeout": "Timeout Issues",
+    "conn": "Connection Issues",
+}
+_ERR_PRECEDENCE = {group: i for i, group in enumerate(_ERR_LABELS)}
+
+# Prompts. System prompts and the instruction part of each user prompt are
+# constants so every call of a category sends the same byte-exact prefix,
+# which the provider's automatic prompt caching can reuse; the per-pattern
+# data goes last.
+
+_FAILURE_SYS = """You are an expert AI assistant that helps users learn from failures.
+Based on failure patterns, create helpful guidance that prevents similar issues."""
+
+_FAILURE_USER_PREFIX = """Generate a helpful hint for the failure pattern below that explains:
+1. What typically goes wrong in this situation
+2. How to avoid or fix this issue
+3. Alternative approaches to consider
+4. Warning signs to watch for
+
+Keep it concise (2-3 sentences) and constructive."""
+
+_OVERALL_SYS = """You are an expert AI assistant that provides strategic guidance.
+Based on execution analysis, create high-level best practices for task execution."""
+
+_OVERALL_USER_PREFIX = """Generate 3-5 high-level best practices that apply across different skills and situations.
+Focus on strategic principles rather than specific techniques."""
+
+_SKILL_HINTS_SYS = """You are an expert AI assistant that turns execution analysis of a skill into helpful hints.
+Create concise, actionable guidance: what works, how to use the skill well, and how to recover when it fails.
+Respond with a single JSON object."""
+
+_SKILL_HINTS_USER_PREFIX = """Using the analysis of the skill below, return a JSON object with one string field for each
+section present in the analysis, and no other fields:
+
+- "success_pattern" (for "Success Pattern Analysis"): a hint that explains what makes this pattern
+  successful, when to apply this approach, key factors for success and potential pitfalls to avoid.
+  Keep it concise (2-3 sentences) and actionable.
+- "best_practice" (for "Performance Data"): 2-3 skill-specific best practices that help users get the
+  most from this skill. Focus on when and how to use this skill effectively.
+- "troubleshooting" (for "Common Failure Patterns"): a troubleshooting guide with common symptoms and
+  their likely causes, a step-by-step diagnostic approach, quick fixes for typical issues, and when to
+  escalate or try alternative approaches. Keep it practical and actionable."""
+
+# Hint categories covered by the combined per-skill call, in output order
+_SKILL_CATEGORIES = (HintCategory.SUCCESS_PATTERN, HintCategory.BEST_PRACTICE, HintCategory.TROUBLESHOOTING)
+
 class HintGenerator:
     """
     Generates hints content from discovered patterns using LLM
     """
     
-    def __init__(self, enable_llm=True):
+    # Below this many prompts the Batch API's turnaround isn't worth it
+    BATCH_MIN_PROMPTS = 50
+    
+    # Batch job states after which polling stops
+    _BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+    
+    # Default seconds to wait for a batch job before cancelling it and falling
+    # back to real-time calls; jobs may take up to the 24h completion window
+    BATCH_WAIT_TIMEOUT = 30 * 60
+    
+    # Combined patterns memoized per generator
+    COMBINE_CACHE_SIZE = 256
+    
+    # Hints are short, so a small model is enough; only used with the official API
+    DEFAULT_HINT_MODEL = "gpt-4o-mini"
+    
+    # Transient API errors worth retrying with backoff
+    RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+    
+    def __init__(self, enable_llm=True, max_workers: int = 8, model: Optional[str] = None,
+                 retries: int = 3, rate_limit_per_min: float = 300):
+        """
+        Args:
+            enable_llm: Generate hint content with the LLM (templates otherwise)
+            max_workers: Maximum concurrent LLM calls while generating hints
+            model: Model for hint generation; defaults to AUTO_HINT_MODEL, then
+                DEFAULT_HINT_MODEL for the official API or MODEL_NAME with OPENAI_API_BASE
+            retries: Retries of a call after a rate limit, timeout, connection or 5xx error
+            rate_limit_per_min: Maximum LLM requests started per minute (0 for no limit)
+        """
         self.enable_llm = enable_llm
         try:
             if enable_llm:
-                self.llm = OpenAIClient()
+                model = model or os.getenv("AUTO_HINT_MODEL")
+                if not model and not os.getenv("OPENAI_API_BASE"):
+                    model = self.DEFAULT_HINT_MODEL
+                # Prompts depend only on the analysis, so identical ones reuse the cached response
+                self.llm = LLMResponseCache(OpenAIClient(model=model))
             else:
                 self.llm = None
         except Exception:
             self.llm = None
             self.enable_llm = False
         self.max_hints_per_category = 5  # Limit hints per category to avoid overwhelming
+        self.max_workers = max_workers  # Maximum concurrent LLM calls while generating hints
+        self.retries = retries
+        self.rate_limit_per_min = rate_limit_per_min
+        # Request pacing and call metrics, shared by the worker threads
+        self._pace_lock = threading.Lock()
+        self._next_request_at = 0.0
+        self.llm_calls = 0
+        self.llm_retries = 0
+        self.llm_failures = 0
+        # Failure hints for semantically similar patterns (needs faiss and sentence-transformers)
+        self.hint_cache = None
+        if self.enable_llm:
+            from ..cache.semantic import SemanticTextCache
+            self.hint_cache = SemanticTextCache(threshold=0.92, ttl=7 * 24 * 3600)
+        # Combined patterns by the content signatures of their members, most recently used last
+        self._combine_cache: "OrderedDict[Tuple[Tuple[Any, ...], ...], HintPattern]" = OrderedDict()
+        self._combine_cache_lock = threading.Lock()
+        # Prompt-ready (examples, anti_examples) text of combined patterns, by pattern id
+        self._example_snippets: Dict[str, Tuple[str, str]] = {}
         
     def generate_hints_from_analysis(self, analysis_result: ExecutionAnalysisResult, 
                                    task_description: str = "") -> List[Dict[str, Any]]:
         """
         Generate hints from analysis results
         
+        Blocking wrapper around agenerate_hints_from_analysis; must not be
+        called from inside a running event loop.
+        
         Args:
             analysis_result: Analysis result from ExecutionResultAnalyzer
             task_description: Original task description for context
@@ -38,370 +176,737 @@ class HintGenerator:
         Returns:
             List of generated hints with metadata
         """
-        hints = []
-        
-        # Generate hints for different categories
-        hints.extend(self._generate_success_hints(analysis_result.success_patterns, task_description))
-        hints.extend(self._generate_failure_hints(analysis_result.failure_patterns, task_description))
-        hints.extend(self._generate_best_practice_hints(analysis_result, task_description))
-        hints.extend(self._generate_troubleshooting_hints(analysis_result.failure_patterns, task_description))
-        
-        logger.info(f"Generated {len(hints)} hints from analysis")
-        return hints
+        return asyncio.run(self.agenerate_hints_from_analysis(analysis_result, task_description))
     
-    def _generate_success_hints(self, patterns: List[HintPattern], 
-                               task_description: str) -> List[Dict[str, Any]]:
-        """Generate hints from successful patterns"""
-        hints = []
+    async def agenerate_hints_from_analysis(self, analysis_result: ExecutionAnalysisResult,
+                                            task_description: str = "") -> List[Dict[str, Any]]:
+        """
+        Generate hints from analysis results, issuing the LLM calls concurrently
         
-        # Group patterns by skill
-        skill_patterns = {}
-        for pattern in patterns:
-            if pattern.skill_name not in skill_patterns:
-                skill_patterns[pattern.skill_name] = []
-            skill_patterns[pattern.skill_name].append(pattern)
+        Success, best practice and troubleshooting hints of one skill come from
+        a single combined call (_generate_skill_hints); failure hints (grouped
+        by error type) and the overall best practices have their own calls.
+        All calls run concurrently, at most max_workers in flight. Hints keep
+        the category order and, within a category, the group order.
         
-        # Generate hints for each skill
-        for skill_name, skill_patterns_list in skill_patterns.items():
-            if len(hints) >= self.max_hints_per_category:
-                break
-                
-            # Combine similar patterns
-            combined_pattern = self._combine_patterns(skill_patterns_list)
+        Args:
+            analysis_result: Analysis result from ExecutionResultAnalyzer
+            task_description: Original task description for context
             
-            hint_content = self._generate_success_hint_content(combined_pattern, task_description)
-            if hint_content:
-                metadata = HintMetadata(
-                    title=f"Success Pattern for {skill_name}",
-                    category=HintCategory.SUCCESS_PATTERN,
-                    skill_name=skill_name,
-                    pattern_id=combined_pattern.id
-                )
-                
-                hints.append({
-                    "metadata": metadata,
-                    "content": hint_content,
-                    "skill_name": skill_name,
-                    "category": "success_pattern"
-                })
+        Returns:
+            List of generated hints with metadata
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+        inputs, order = self._skill_plan(analysis_result)
+        limits = self._skill_limits(analysis_result, overall_hint=True)
+        contents = {}
+        
+        # The overall hint takes one best practice slot; generate it alongside everything else
+        failure_hints, overall_hint, _ = await asyncio.gather(
+            self._agen_failure_hints(analysis_result.failure_patterns, task_description, semaphore),
+            self._agen_overall_best_practices(analysis_result, task_description, semaphore),
+            self._agen_skill_hints(inputs, order, limits, task_description, semaphore, contents),
+        )
+        if not overall_hint:
+            # The slot reserved for the overall hint is free again
+            limits = self._skill_limits(analysis_result, overall_hint=False)
+            await self._agen_skill_hints(inputs, order, limits, task_description, semaphore, contents)
+        
+        hints = list(self._iter_hints(inputs, order, contents, limits, failure_hints, overall_hint))
         
+        logger.info("Generated {} hints from analysis", len(hints))
         return hints
     
-    def _generate_failure_hints(self, patterns: List[HintPattern], 
-                               task_description: str) -> List[Dict[str, Any]]:
-        """Generate hints from failure patterns"""
-        hints = []
+    def generate_hints_from_analysis_batch(self, analysis_result: ExecutionAnalysisResult,
+                                           task_description: str = "",
+                                           poll_interval: float = 30.0,
+                                           timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Generate hints through the OpenAI Batch API instead of real-time calls
         
-        # Group by error type
-        error_patterns = {}
-        for pattern in patterns:
-            error_type = self._extract_error_type(pattern)
-            if error_type not in error_patterns:
-                error_patterns[error_type] = []
-            error_patterns[error_type].append(pattern)
-        
-        # Generate hints for each error type
-        for error_type, error_patterns_list in error_patterns.items():
-            if len(hints) >= self.max_hints_per_category:
-                break
-                
-            combined_pattern = self._combine_patterns(error_patterns_list)
-            
-            hint_content = self._generate_failure_hint_content(combined_pattern, task_description)
-            if hint_content:
-                metadata = HintMetadata(
-                    title=f"Failure Pattern: {error_type}",
-                    category=HintCategory.FAILURE_PATTERN,
-                    skill_name=combined_pattern.skill_name,
-                    pattern_id=combined_pattern.id
-                )
-                
-                hints.append({
-                    "metadata": metadata,
-                    "content": hint_content,
-                    "skill_name": combined_pattern.skill_name,
-                    "category": "failure_pattern"
-                })
+        Hint generation is background work, so every prompt of every category
+        is written to one JSONL file and submitted as a single batch job (half
+        the price, separate rate limits). This blocks until the job finishes
+        or `timeout` passes; run it offline, not on the interactive path.
+        Small workloads (fewer than BATCH_MIN_PROMPTS prompts), failed or
+        timed-out jobs and unreadable output fall back to
+        generate_hints_from_analysis.
         
-        return hints
-    
-    def _generate_best_practice_hints(self, analysis_result: ExecutionAnalysisResult,
-                                     task_description: str) -> List[Dict[str, Any]]:
-        """Generate best practice hints from overall analysis"""
-        hints = []
+        Unlike the real-time path, all groups are submitted at once, so a
+        category may use more prompts than hints it keeps.
         
-        # Analyze overall success patterns
-        if analysis_result.skill_insights:
-            overall_insights = analysis_result.skill_insights.get("overall", {})
-            per_skill_insights = analysis_result.skill_insights.get("per_skill", {})
-            
-            # Generate overall best practices
-            overall_hint = self._generate_overall_best_practices(overall_insights, per_skill_insights, task_description)
-            if overall_hint:
-                metadata = HintMetadata(
-                    title="Overall Best Practices",
-                    category=HintCategory.BEST_PRACTICE,
-                    skill_name="general"
-                )
-                
-                hints.append({
-                    "metadata": metadata,
-                    "content": overall_hint,
-                    "skill_name": "general",
-                    "category": "best_practice"
-                })
+        Args:
+            analysis_result: Analysis result from ExecutionResultAnalyzer
+            task_description: Original task description for context
+            poll_interval: Seconds between batch status checks
+            timeout: Seconds to wait before cancelling the batch (BATCH_WAIT_TIMEOUT by default)
             
-            # Generate skill-specific best practices
-            for skill_name, skill_stats in per_skill_insights.items():
-                if len(hints) >= self.max_hints_per_category:
-                    break
-                    
-                if skill_stats["success_rate"] > 0.7:  # Only for reasonably successful skills
-                    skill_hint = self._generate_skill_best_practices(skill_name, skill_stats, task_description)
-                    if skill_hint:
-                        metadata = HintMetadata(
-                            title=f"Best Practices for {skill_name}",
-                            category=HintCategory.BEST_PRACTICE,
-                            skill_name=skill_name
-                        )
-                        
-                        hints.append({
-                            "metadata": metadata,
-                            "content": skill_hint,
-                            "skill_name": skill_name,
-                            "category": "best_practice"
-                        })
+        Returns:
+            List of generated hints with metadata
+        """
+        if timeout is None:
+            timeout = self.BATCH_WAIT_TIMEOUT
+
+        # Collect every prompt without calling the LLM
+        inputs, order = self._skill_plan(analysis_result)
+        failure = list(self._failure_groups(analysis_result.failure_patterns))
+        skills = list(inputs)
+        
+        prompts = {
+            f"failure-{i}": self._failure_prompts(combined_pattern, task_description)
+            for i, (_, combined_pattern) in enumerate(failure)
+        }
+        prompts.update(
+            (f"skill-{i}", self._skill_hints_prompts(skill_name, inputs[skill_name], task_description))
+            for i, skill_name in enumerate(skills)
+        )
+        if analysis_result.skill_insights:
+            prompts["best_practice-overall"] = self._overall_best_practices_prompts(
+                analysis_result.skill_insights.get("overall", {}),
+                self._per_skill_json(analysis_result.skill_insights),
+                task_description
+            )
         
-        return hints
-    
-    def _generate_troubleshooting_hints(self, failure_patterns: List[HintPattern],
-                                       task_description: str) -> List[Dict[str, Any]]:
-        """Generate troubleshooting hints"""
-        hints = []
+        if not self.enable_llm or self.llm is None or len(prompts) < self.BATCH_MIN_PROMPTS:
+            return self.generate_hints_from_analysis(analysis_result, task_description)
+        
+        results = self._run_batch(prompts, poll_interval, timeout)
+        if results is None:
+            logger.warning("Batch hint generation failed, falling back to real-time calls")
+            return self.generate_hints_from_analysis(analysis_result, task_description)
+        
+        failure_hints = islice(
+            (
+                self._failure_hint(error_type, combined_pattern, results[f"failure-{i}"])
+                for i, (error_type, combined_pattern) in enumerate(failure)
+                if results.get(f"failure-{i}")
+            ),
+            self.max_hints_per_category
+        )
         
-        if not failure_patterns:
-            return hints
+        overall_hint = results.get("best_practice-overall")
         
-        # Group by skill for troubleshooting
-        skill_failures = {}
-        for pattern in failure_patterns:
-            if pattern.skill_name not in skill_failures:
-                skill_failures[pattern.skill_name] = []
-            skill_failures[pattern.skill_name].append(pattern)
+        # Errored requests fall back like failed real-time calls
+        contents = {}
+        for i, skill_name in enumerate(skills):
+            try:
+                contents[skill_name] = self._parse_skill_hints(results[f"skill-{i}"], inputs[skill_name])
+            except Exception:
+                contents[skill_name] = self._skill_hints_fallback(inputs[skill_name])
+        limits = self._skill_limits(analysis_result, overall_hint=bool(overall_hint))
         
-        # Generate troubleshooting guide for each skill
-        for skill_name, failures in skill_failures.items():
-            if len(hints) >= self.max_hints_per_category:
-                break
-                
-            troubleshooting_guide = self._generate_troubleshooting_guide(skill_name, failures, task_description)
-            if troubleshooting_guide:
-                metadata = HintMetadata(
-                    title=f"Troubleshooting Guide for {skill_name}",
-                    category=HintCategory.TROUBLESHOOTING,
-                    skill_name=skill_name
-                )
-                
-                hints.append({
-                    "metadata": metadata,
-                    "content": troubleshooting_guide,
-                    "skill_name": skill_name,
-                    "category": "troubleshooting"
-                })
+        hints = list(self._iter_hints(inputs, order, contents, limits, failure_hints, overall_hint))
         
+        logger.info("Generated {} hints from analysis via batch of {} prompts", len(hints), len(prompts))
         return hints
     
-    def _generate_success_hint_content(self, pattern: HintPattern, task_description: str) -> Optional[str]:
-        """Generate content for success pattern hint"""
-        system_prompt = """You are an expert AI assistant that generates helpful hints and best practices.
-        Based on successful execution patterns, create concise, actionable guidance that helps users
-        achieve better results in similar situations."""
-        
-        user_prompt = f"""
-        Task: {task_description or 'General task execution'}
-        
-        Success Pattern Analysis:
-        - Pattern: {pattern.pattern_description}
-        - Skill: {pattern.skill_name}
-        - Success Rate: {pattern.success_rate:.1%}
-        - Frequency: {pattern.frequency}
-        - Examples: {pattern.examples[:2] if pattern.examples else 'N/A'}
-        
-        Generate a helpful hint that explains:
-        1. What makes this pattern successful
-        2. When to apply this approach
-        3. Key factors for success
-        4. Potential pitfalls to avoid
-        
-        Keep it concise (2-3 sentences) and actionable.
+    def _run_batch(self, prompts: Dict[str, Tuple[str, str]], poll_interval: float,
+                   timeout: float) -> Optional[Dict[str, str]]:
         """
+        Submit prompts as one Batch API job and wait for it
         
-        try:
-            if not self.enable_llm or self.llm is None:
-                # Return template-based hint when LLM is not available
-                return f"Based on successful execution pattern: {pattern.pattern_description}. Try similar approaches in similar contexts."
+        Args:
+            prompts: custom_id -> (system_prompt, user_prompt)
             
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_input=user_prompt
+        Returns:
+            custom_id -> stripped content for requests that succeeded, or None if the
+            job failed, timed out or its output could not be read
+        """
+        client = self.llm.client
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", prefix="hints_batch_",
+                                         delete=False, encoding="utf-8") as f:
+            for custom_id, (system_prompt, user_prompt) in prompts.items():
+                f.write(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.llm.model,
+                        "messages": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        "temperature": 0.1
+                    }
+                }, ensure_ascii=False) + "\n")
+            path = f.name
+        
+        try:
+            with open(path, "rb") as input_jsonl:
+                input_file = client.files.create(file=input_jsonl, purpose="batch")
+            batch = client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
             )
-            return response.raw_json.strip() if response and response.raw_json else None
+            logger.info("Submitted hint batch {} with {} prompts", batch.id, len(prompts))
+            
+            deadline = time.monotonic() + timeout
+            while batch.status not in self._BATCH_FINAL_STATES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    client.batches.cancel(batch.id)
+                    logger.warning("Hint batch {} timed out, cancelled", batch.id)
+                    return None
+                time.sleep(min(poll_interval, remaining))
+                batch = client.batches.retrieve(batch.id)
+            
+            if batch.status != "completed" or not batch.output_file_id:
+                logger.warning("Hint batch {} ended with status {}", batch.id, batch.status)
+                return None
+            output = client.files.content(batch.output_file_id).text
+            
+            contents = {}
+            for line in output.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    response = record.get("response") or {}
+                    if record.get("error") or response.get("status_code") != 200:
+                        continue
+                    message = response["body"]["choices"][0]["message"]
+                    contents[record["custom_id"]] = (message.get("content") or "").strip()
+                except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                    # Like an errored request: the skill falls back to its template
+                    logger.warning("Skipping unreadable line in hint batch {} output: {!r}", batch.id, e)
+            if not contents:
+                logger.warning("Hint batch {} returned no usable responses", batch.id)
+                return None
+            return contents
         except Exception as e:
-            logger.warning(f"Failed to generate success hint: {e}")
-            # Fallback to template-based hint
-            return f"Based on successful execution pattern: {pattern.pattern_description}. Try similar approaches in similar contexts."
+            logger.opt(exception=e).warning("Failed to run hint batch")
+            return None
+        finally:
+            os.remove(path)
     
-    def _generate_failure_hint_content(self, pattern: HintPattern, task_description: str) -> Optional[str]:
-        """Generate content for failure pattern hint"""
-        system_prompt = """You are an expert AI assistant that helps users learn from failures.
-        Based on failure patterns, create helpful guidance that prevents similar issues."""
-        
-        user_prompt = f"""
-        Task: {task_description or 'General task execution'}
+    def _llm_generate(self, system_prompt: str, user_prompt: str):
+        """
+        self.llm.generate with request pacing and retries
         
-        Failure Pattern Analysis:
-        - Pattern: {pattern.pattern_description}
-        - Skill: {pattern.skill_name}
-        - Failure Examples: {pattern.examples[:2] if pattern.examples else 'N/A'}
-        - Anti-examples: {pattern.anti_examples[:2] if pattern.anti_examples else 'N/A'}
+        Requests are spaced to stay under rate_limit_per_min across all
+        worker threads. Rate limits, timeouts, connection errors and 5xx
+        responses are retried with jittered exponential backoff; other errors
+        and the last failed attempt are raised to the caller.
+        """
+        for attempt in range(self.retries + 1):
+            self._wait_for_slot()
+            try:
+                return self.llm.generate(system_prompt=system_prompt, user_input=user_prompt)
+            except self.RETRYABLE_ERRORS as e:
+                if attempt == self.retries:
+                    with self._pace_lock:
+                        self.llm_failures += 1
+                    raise
+                delay = min(2 ** attempt, 30) * (0.5 + random.random())
+                with self._pace_lock:
+                    self.llm_retries += 1
+                logger.debug("Hint LLM call failed ({}), retrying in {:.1f}s", type(e).__name__, delay)
+                time.sleep(delay)
+            except Exception:
+                with self._pace_lock:
+                    self.llm_failures += 1
+                raise
+    
+    def _wait_for_slot(self):
+        """Block until the next request may start under rate_limit_per_min"""
+        with self._pace_lock:
+            self.llm_calls += 1
+            if self.rate_limit_per_min <= 0:
+                return
+            now = time.monotonic()
+            start = max(now, self._next_request_at)
+            self._next_request_at = start + 60.0 / self.rate_limit_per_min
+        if start > now:
+            time.sleep(start - now)
+    
+    @staticmethod
+    async def _call(semaphore: asyncio.Semaphore, func, *args):
+        """Run a blocking hint helper on the loop's thread pool, bounded by the semaphore"""
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def _first_contents(self, semaphore: asyncio.Semaphore, func, 
+                              candidates: Iterator[Tuple[Any, tuple]], limit: int) -> List[Tuple[Any, str]]:
+        """
+        Call func(*args) for (key, args) candidates in order until `limit` calls returned content
         
-        Generate a helpful hint that explains:
-        1. What typically goes wrong in this situation
-        2. How to avoid or fix this issue
-        3. Alternative approaches to consider
-        4. Warning signs to watch for
+        Each wave starts only as many calls as results are still missing, so no
+        more LLM calls are made than a sequential loop would, and a failed call
+        is replaced by the next candidate just like before.
         
-        Keep it concise (2-3 sentences) and constructive.
+        Returns:
+            (key, content) pairs in candidate order
         """
-        
-        try:
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_input=user_prompt
-            )
-            return response.raw_json.strip() if response and response.raw_json else None
-        except Exception as e:
-            logger.warning(f"Failed to generate failure hint: {e}")
-            return None
+        results = []
+        while len(results) < limit:
+            wave = list(islice(candidates, limit - len(results)))
+            if not wave:
+                break
+            contents = await asyncio.gather(*(self._call(semaphore, func, *args) for _, args in wave))
+            results.extend((key, content) for (key, _), content in zip(wave, contents) if content)
+        return results
     
-    def _generate_overall_best_practices(self, overall_insights: Dict[str, Any],
-                                        per_skill_insights: Dict[str, Any],
-                                        task_description: str) -> Optional[str]:
-        """Generate overall best practices"""
-        system_prompt = """You are an expert AI assistant that provides strategic guidance.
-        Based on execution analysis, create high-level best practices for task execution."""
+    async def _agen_failure_hints(self, patterns: List[HintPattern], task_description: str,
+                                  semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
+        """Generate hints from failure patterns"""
+        results = await self._first_contents(
+            semaphore, self._generate_failure_hint_content,
+            ((group, (group[1], task_description)) for group in self._failure_groups(patterns)),
+            self.max_hints_per_category
+        )
+        return [
+            self._failure_hint(error_type, combined_pattern, hint_content)
+            for (error_type, combined_pattern), hint_content in results
+        ]
+    
+    async def _agen_overall_best_practices(self, analysis_result: ExecutionAnalysisResult,
+                                           task_description: str,
+                                           semaphore: asyncio.Semaphore) -> Optional[str]:
+        """Generate the overall best practices from the skill insights"""
+        if not analysis_result.skill_insights:
+            return None
         
-        user_prompt = f"""
-        Task: {task_description or 'General task execution'}
+        return await self._call(
+            semaphore, self._generate_overall_best_practices,
+            analysis_result.skill_insights.get("overall", {}),
+            self._per_skill_json(analysis_result.skill_insights),
+            task_description
+        )
+    
+    async def _agen_skill_hints(self, inputs: Dict[str, Dict[HintCategory, Any]],
+                                order: Dict[HintCategory, List[str]], limits: Dict[HintCategory, int],
+                                task_description: str, semaphore: asyncio.Semaphore,
+                                contents: Dict[str, Dict[HintCategory, Optional[str]]]):
+        """
+        Make combined per-skill calls until every category has `limits` hints or runs out of skills
         
-        Overall Performance:
-        - Total Executions: {overall_insights.get('total_executions', 0)}
-        - Success Rate: {overall_insights.get('success_rate', 0):.1%}
+        Like _first_contents, each wave only calls the skills that can still
+        fill a missing slot, so a skill beyond the limit of every category it
+        appears in is never called. Results are added to `contents`.
+        """
+        while True:
+            wave = list(dict.fromkeys(
+                skill_name
+                for category, skill_names in order.items()
+                for skill_name in self._pending_skills(skill_names, category, limits[category], contents)
+            ))
+            if not wave:
+                break
+            results = await asyncio.gather(*(
+                self._call(semaphore, self._generate_skill_hints, skill_name, inputs[skill_name], task_description)
+                for skill_name in wave
+            ))
+            contents.update(zip(wave, results))
+    
+    @staticmethod
+    def _pending_skills(skill_names: List[str], category: HintCategory, limit: int,
+                        contents: Dict[str, Dict[HintCategory, Optional[str]]]) -> List[str]:
+        """Uncalled skills, in order, that are needed to fill a category up to `limit`"""
+        found = 0
+        pending = []
+        for skill_name in skill_names:
+            if found + len(pending) >= limit:
+                break
+            if skill_name not in contents:
+                pending.append(skill_name)
+            elif contents[skill_name].get(category):
+                found += 1
+        return pending
+    
+    @staticmethod
+    def _picked_skill_hints(category: HintCategory, order: Dict[HintCategory, List[str]],
+                            contents: Dict[str, Dict[HintCategory, Optional[str]]],
+                            limits: Dict[HintCategory, int]) -> Iterator[Tuple[str, str]]:
+        """(skill_name, content) for the first `limit` skills of a category that got content back"""
+        return islice(
+            (
+                (skill_name, contents[skill_name][category])
+                for skill_name in order[category]
+                if skill_name in contents and contents[skill_name].get(category)
+            ),
+            limits[category]
+        )
+    
+    def _skill_limits(self, analysis_result: ExecutionAnalysisResult, overall_hint: bool) -> Dict[HintCategory, int]:
+        """Hints per category from the combined per-skill calls"""
+        limits = dict.fromkeys(_SKILL_CATEGORIES, self.max_hints_per_category)
+        if analysis_result.skill_insights and overall_hint:
+            limits[HintCategory.BEST_PRACTICE] -= 1
+        return limits
+    
+    def _iter_hints(self, inputs: Dict[str, Dict[HintCategory, Any]], order: Dict[HintCategory, List[str]],
+                    contents: Dict[str, Dict[HintCategory, Optional[str]]], limits: Dict[HintCategory, int],
+                    failure_hints: Iterable[Dict[str, Any]], overall_hint: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """Hints in category order: success, failure, best practice, troubleshooting"""
+        for skill_name, content in self._picked_skill_hints(HintCategory.SUCCESS_PATTERN, order, contents, limits):
+            yield self._success_hint(skill_name, inputs[skill_name][HintCategory.SUCCESS_PATTERN], content)
+        yield from failure_hints
+        if overall_hint:
+            yield self._overall_hint(overall_hint)
+        for skill_name, content in self._picked_skill_hints(HintCategory.BEST_PRACTICE, order, contents, limits):
+            yield self._skill_best_practice_hint(skill_name, content)
+        for skill_name, content in self._picked_skill_hints(HintCategory.TROUBLESHOOTING, order, contents, limits):
+            yield self._troubleshooting_hint(skill_name, content)
+    
+    # Grouping: which hints each category asks for, in order
+    
+    def _success_groups(self, patterns: List[HintPattern]) -> Iterator[Tuple[str, HintPattern]]:
+        """(skill_name, combined pattern) per skill; patterns are combined lazily"""
+        # Group patterns by skill
+        skill_patterns = defaultdict(list)
+        for pattern in patterns:
+            skill_patterns[pattern.skill_name].append(pattern)
         
-        Skill Performance:
-        {json.dumps(per_skill_insights, indent=2, ensure_ascii=False)}
+        # Combine similar patterns, most frequent skills first
+        for skill_name, skill_patterns_list in self._by_frequency(skill_patterns):
+            yield skill_name, self._combine_patterns(skill_patterns_list)
+    
+    def _failure_groups(self, patterns: List[HintPattern]) -> Iterator[Tuple[str, HintPattern]]:
+        """(error_type, combined pattern) per error type; patterns are combined lazily"""
+        # Group by error type
+        error_patterns = defaultdict(list)
+        for pattern in patterns:
+            error_patterns[self._extract_error_type(pattern)].append(pattern)
         
-        Generate 3-5 high-level best practices that apply across different skills and situations.
-        Focus on strategic principles rather than specific techniques.
+        for error_type, error_patterns_list in self._by_frequency(error_patterns):
+            yield error_type, self._combine_patterns(error_patterns_list)
+    
+    @staticmethod
+    def _best_practice_skills(per_skill_insights: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Skills that get their own best practices"""
+        # Only for reasonably successful skills, most used first
+        return sorted(
+            (
+                (skill_name, skill_stats) for skill_name, skill_stats in per_skill_insights.items()
+                if skill_stats["success_rate"] > 0.7
+            ),
+            key=lambda item: item[1].get("total_executions", 0),
+            reverse=True
+        )
+    
+    @classmethod
+    def _troubleshooting_groups(cls, failure_patterns: List[HintPattern]) -> List[Tuple[str, List[HintPattern]]]:
+        """(skill_name, failures) per skill"""
+        # Group by skill for troubleshooting
+        skill_failures = defaultdict(list)
+        for pattern in failure_patterns:
+            skill_failures[pattern.skill_name].append(pattern)
+        return cls._by_frequency(skill_failures)
+    
+    @staticmethod
+    def _by_frequency(groups: Dict[str, List[HintPattern]]) -> List[Tuple[str, List[HintPattern]]]:
         """
+        Groups ordered by total pattern frequency, highest first (ties keep first-seen order)
         
-        try:
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_input=user_prompt
-            )
-            return response.raw_json.strip() if response and response.raw_json else None
-        except Exception as e:
-            logger.warning(f"Failed to generate overall best practices: {e}")
-            return None
+        Categories are capped, so this decides which groups get an LLM call:
+        the most common patterns come first and rare ones are dropped.
+        """
+        return sorted(groups.items(), key=lambda item: sum(p.frequency for p in item[1]), reverse=True)
     
-    def _generate_skill_best_practices(self, skill_name: str, skill_stats: Dict[str, Any],
-                                      task_description: str) -> Optional[str]:
-        """Generate skill-specific best practices"""
-        system_prompt = """You are an expert AI assistant specializing in skill optimization.
-        Based on skill performance data, create targeted best practices for optimal usage."""
+    def _skill_plan(self, analysis_result: ExecutionAnalysisResult
+                    ) -> Tuple[Dict[str, Dict[HintCategory, Any]], Dict[HintCategory, List[str]]]:
+        """
+        Inputs of the combined call per skill, and the skills of each category in order
         
-        user_prompt = f"""
-        Task: {task_description or 'General task execution'}
-        Skill: {skill_name}
+        A skill's inputs hold its combined success pattern, its formatted
+        performance data (if it qualifies for best practices) and its
+        failures, keyed by the category they produce. Performance data is
+        formatted here, in one pass over the insights, rather than per prompt.
+        """
+        inputs = defaultdict(dict)
+        order = {category: [] for category in _SKILL_CATEGORIES}
         
-        Performance Data:
-        - Success Rate: {skill_stats.get('success_rate', 0):.1%}
-        - Total Executions: {skill_stats.get('total_executions', 0)}
-        - Sample Commands: {skill_stats.get('sample_commands', [])[:2]}
+        def add(category, skill_name, value):
+            inputs[skill_name][category] = value
+            order[category].append(skill_name)
+        
+        for skill_name, combined_pattern in self._success_groups(analysis_result.success_patterns):
+            add(HintCategory.SUCCESS_PATTERN, skill_name, combined_pattern)
+        if analysis_result.skill_insights:
+            per_skill_insights = analysis_result.skill_insights.get("per_skill", {})
+            for skill_name, skill_stats in self._best_practice_skills(per_skill_insights):
+                add(HintCategory.BEST_PRACTICE, skill_name, self._performance_data(skill_stats))
+        for skill_name, failures in self._troubleshooting_groups(analysis_result.failure_patterns):
+            add(HintCategory.TROUBLESHOOTING, skill_name, failures)
+        return dict(inputs), order
+    
+    # Hint records
+    
+    @staticmethod
+    def _make_hint(title: str, category: HintCategory, skill_name: str, content: str,
+                   pattern_id: str = "") -> Dict[str, Any]:
+        metadata = HintMetadata(
+            title=title,
+            category=category,
+            skill_name=skill_name,
+            pattern_id=pattern_id
+        )
+        return {
+            "metadata": metadata,
+            "content": content,
+            "skill_name": skill_name,
+            "category": category.value
+        }
+    
+    def _success_hint(self, skill_name: str, pattern: HintPattern, content: str) -> Dict[str, Any]:
+        return self._make_hint(f"Success Pattern for {skill_name}", HintCategory.SUCCESS_PATTERN,
+                               skill_name, content, pattern.id)
+    
+    def _failure_hint(self, error_type: str, pattern: HintPattern, content: str) -> Dict[str, Any]:
+        return self._make_hint(f"Failure Pattern: {error_type}", HintCategory.FAILURE_PATTERN,
+                               pattern.skill_name, content, pattern.id)
+    
+    def _overall_hint(self, content: str) -> Dict[str, Any]:
+        return self._make_hint("Overall Best Practices", HintCategory.BEST_PRACTICE, "general", content)
+    
+    def _skill_best_practice_hint(self, skill_name: str, content: str) -> Dict[str, Any]:
+        return self._make_hint(f"Best Practices for {skill_name}", HintCategory.BEST_PRACTICE, skill_name, content)
+    
+    def _troubleshooting_hint(self, skill_name: str, content: str) -> Dict[str, Any]:
+        return self._make_hint(f"Troubleshooting Guide for {skill_name}", HintCategory.TROUBLESHOOTING,
+                               skill_name, content)
+    
+    # Prompts and LLM calls
+    
+    @staticmethod
+    def _success_fallback(pattern: HintPattern) -> str:
+        return f"Based on successful execution pattern: {pattern.pattern_description}. Try similar approaches in similar contexts."
+    
+    def _skill_hints_prompts(self, skill_name: str, inputs: Dict[HintCategory, Any],
+                             task_description: str) -> Tuple[str, str]:
+        """(system_prompt, user_prompt) for the combined hints of one skill"""
+        sections = []
+        
+        pattern = inputs.get(HintCategory.SUCCESS_PATTERN)
+        if pattern is not None:
+            sections.append(f"""Success Pattern Analysis:
+- Pattern: {pattern.pattern_description}
+- Skill: {pattern.skill_name}
+- Success Rate: {pattern.success_rate:.1%}
+- Frequency: {pattern.frequency}
+- Examples: {self._examples_snippet(pattern)[0]}
+""")
+        
+        performance_data = inputs.get(HintCategory.BEST_PRACTICE)
+        if performance_data is not None:
+            sections.append(performance_data)
+        
+        failures = inputs.get(HintCategory.TROUBLESHOOTING)
+        if failures is not None:
+            failure_descriptions = [f.pattern_description for f in failures[:3]]
+            sections.append(f"""Common Failure Patterns:
+{chr(10).join(f'- {desc}' for desc in failure_descriptions)}
+""")
+        
+        user_prompt = f"""{_SKILL_HINTS_USER_PREFIX}
+
+Task: {task_description or 'General task execution'}
+Skill: {skill_name}
+
+{chr(10).join(sections)}"""
+        return _SKILL_HINTS_SYS, user_prompt
+    
+    def _generate_skill_hints(self, skill_name: str, inputs: Dict[HintCategory, Any],
+                              task_description: str) -> Dict[HintCategory, Optional[str]]:
+        """
+        Generate the success, best practice and troubleshooting hints of a skill in one call
         
-        Generate 2-3 skill-specific best practices that help users get the most from this skill.
-        Focus on when and how to use this skill effectively.
+        Returns:
+            Content per requested category; None where the model returned nothing
         """
+        system_prompt, user_prompt = self._skill_hints_prompts(skill_name, inputs, task_description)
         
         try:
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_input=user_prompt
-            )
-            return response.raw_json.strip() if response and response.raw_json else None
+            if not self.enable_llm or self.llm is None:
+                # Return template-based hints when LLM is not available
+                return self._skill_hints_fallback(inputs)
+            
+            response = self._llm_generate(system_prompt, user_prompt)
+            return self._parse_skill_hints(response.raw_json if response else None, inputs)
         except Exception as e:
-            logger.warning(f"Failed to generate skill best practices: {e}")
-            return None
+            logger.opt(exception=e).warning("Failed to generate hints for skill {}", skill_name)
+            # Fallback to template-based hints
+            return self._skill_hints_fallback(inputs)
     
-    def _generate_troubleshooting_guide(self, skill_name: str, failures: List[HintPattern],
-                                       task_description: str) -> Optional[str]:
-        """Generate troubleshooting guide for a skill"""
-        system_prompt = """You are an expert troubleshooter who helps users resolve issues efficiently.
-        Create practical troubleshooting guidance based on common failure patterns."""
-        
-        failure_descriptions = [f.pattern_description for f in failures[:3]]
-        
-        user_prompt = f"""
-        Task: {task_description or 'General task execution'}
-        Skill: {skill_name}
+    @staticmethod
+    def _parse_skill_hints(text: Optional[str], inputs: Dict[HintCategory, Any]) -> Dict[HintCategory, Optional[str]]:
+        """Read the combined JSON response; raises ValueError if it is not a JSON object"""
+        if not text:
+            return dict.fromkeys(inputs)
+        
+        # Models sometimes wrap the object in a markdown code fence
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.split("\n", 1)[-1].rsplit("```", 1)[0]
+        data = json.loads(text)
+        if not isinstance(data, dict):
+            raise ValueError("skill hints response is not a JSON object")
+        
+        return {
+            category: str(data.get(category.value) or "").strip() or None
+            for category in inputs
+        }
+    
+    def _skill_hints_fallback(self, inputs: Dict[HintCategory, Any]) -> Dict[HintCategory, Optional[str]]:
+        """Template success hint when the combined call fails; the other categories are skipped"""
+        contents = dict.fromkeys(inputs)
+        pattern = inputs.get(HintCategory.SUCCESS_PATTERN)
+        if pattern is not None:
+            contents[HintCategory.SUCCESS_PATTERN] = self._success_fallback(pattern)
+        return contents
+    
+    def _failure_prompts(self, pattern: HintPattern, task_description: str) -> Tuple[str, str]:
+        """(system_prompt, user_prompt) for a failure pattern hint"""
+        examples, anti_examples = self._examples_snippet(pattern)
+        user_prompt = f"""{_FAILURE_USER_PREFIX}
+
+Task: {task_description or 'General task execution'}
+
+Failure Pattern Analysis:
+- Pattern: {pattern.pattern_description}
+- Skill: {pattern.skill_name}
+- Failure Examples: {examples}
+- Anti-examples: {anti_examples}
+"""
+        return _FAILURE_SYS, user_prompt
+    
+    @staticmethod
+    def _failure_cache_text(pattern: HintPattern) -> str:
+        """What a failure hint is semantically cached under: the pattern, not the prompt boilerplate"""
+        return "\n".join([pattern.skill_name, pattern.pattern_description,
+                          *pattern.examples[:2], *pattern.anti_examples[:2]])
+    
+    def _generate_failure_hint_content(self, pattern: HintPattern, task_description: str) -> Optional[str]:
+        """Generate content for failure pattern hint"""
+        # Exact repeats are served by the response cache; near-identical patterns reuse a hint here
+        cache_text = self._failure_cache_text(pattern)
+        if self.hint_cache is not None:
+            cached = self.hint_cache.lookup(cache_text)
+            if cached:
+                return cached
         
-        Common Failure Patterns:
-        {chr(10).join(f'- {desc}' for desc in failure_descriptions)}
+        system_prompt, user_prompt = self._failure_prompts(pattern, task_description)
         
-        Create a troubleshooting guide with:
-        1. Common symptoms and their likely causes
-        2. Step-by-step diagnostic approach
-        3. Quick fixes for typical issues
-        4. When to escalate or try alternative approaches
+        try:
+            response = self._llm_generate(system_prompt, user_prompt)
+            content = response.raw_json.strip() if response and response.raw_json else None
+        except Exception as e:
+            logger.opt(exception=e).warning("Failed to generate failure hint")
+            return None
         
-        Keep it practical and actionable.
-        """
+        if content and self.hint_cache is not None:
+            self.hint_cache.store(cache_text, content)
+        return content
+    
+    @staticmethod
+    def _per_skill_json(skill_insights: Dict[str, Any]) -> str:
+        """Per-skill insights serialized once per run for the overall best practices prompt"""
+        return _dumps(skill_insights.get("per_skill", {}))
+    
+    @staticmethod
+    def _performance_data(skill_stats: Dict[str, Any]) -> str:
+        """Performance Data section of a skill's combined prompt"""
+        return f"""Performance Data:
+- Success Rate: {skill_stats.get('success_rate', 0):.1%}
+- Total Executions: {skill_stats.get('total_executions', 0)}
+- Sample Commands: {skill_stats.get('sample_commands', [])[:2]}
+"""
+    
+    def _overall_best_practices_prompts(self, overall_insights: Dict[str, Any], per_skill_json: str,
+                                        task_description: str) -> Tuple[str, str]:
+        """(system_prompt, user_prompt) for the overall best practices"""
+        user_prompt = f"""{_OVERALL_USER_PREFIX}
+
+Task: {task_description or 'General task execution'}
+
+Overall Performance:
+- Total Executions: {overall_insights.get('total_executions', 0)}
+- Success Rate: {overall_insights.get('success_rate', 0):.1%}
+
+Skill Performance:
+{per_skill_json}
+"""
+        return _OVERALL_SYS, user_prompt
+    
+    def _generate_overall_best_practices(self, overall_insights: Dict[str, Any], per_skill_json: str,
+                                        task_description: str) -> Optional[str]:
+        """Generate overall best practices"""
+        system_prompt, user_prompt = self._overall_best_practices_prompts(
+            overall_insights, per_skill_json, task_description
+        )
         
         try:
-            response = self.llm.generate(
-                system_prompt=system_prompt,
-                user_input=user_prompt
-            )
+            response = self._llm_generate(system_prompt, user_prompt)
             return response.raw_json.strip() if response and response.raw_json else None
         except Exception as e:
-            logger.warning(f"Failed to generate troubleshooting guide: {e}")
+            logger.opt(exception=e).warning("Failed to generate overall best practices")
             return None
     
     def _combine_patterns(self, patterns: List[HintPattern]) -> HintPattern:
-        """Combine multiple similar patterns into one"""
+        """
+        Combine multiple similar patterns into one
+        
+        Results are memoized by the members' content signatures (in order,
+        since the first pattern is the base). Pattern ids are fresh uuids on
+        every analysis run, so they can't be the key; the signatures are
+        equal whenever a later run rediscovers the same patterns.
+        """
         if not patterns:
             return HintPattern()
         
+        key = tuple(self._pattern_signature(pattern) for pattern in patterns)
+        with self._combine_cache_lock:
+            combined = self._combine_cache.get(key)
+            if combined is not None:
+                self._combine_cache.move_to_end(key)
+                return combined
+        
+        combined = self._combine_patterns_uncached(patterns)
+        with self._combine_cache_lock:
+            self._combine_cache[key] = combined
+            self._example_snippets[combined.id] = self._format_examples(combined)
+            if len(self._combine_cache) > self.COMBINE_CACHE_SIZE:
+                _, evicted = self._combine_cache.popitem(last=False)
+                self._example_snippets.pop(evicted.id, None)
+        return combined
+    
+    @staticmethod
+    def _pattern_signature(pattern: HintPattern) -> Tuple[Any, ...]:
+        """Everything _combine_patterns_uncached reads from a pattern"""
+        return (
+            pattern.category,
+            pattern.skill_name,
+            pattern.pattern_description,
+            tuple(pattern.context_keywords),
+            pattern.success_rate,
+            pattern.frequency,
+            tuple(pattern.examples[:2]),
+            tuple(pattern.anti_examples[:2]),
+        )
+    
+    def _combine_patterns_uncached(self, patterns: List[HintPattern]) -> HintPattern:
         # Use the first pattern as base
         base_pattern = patterns[0]
         
-        # Combine attributes
-        combined_examples = []
-        combined_anti_examples = []
+        # Combine attributes; dicts act as ordered sets, filled until their cap
+        combined_examples = {}
+        combined_anti_examples = {}
         total_frequency = 0
         weighted_success_rate = 0.0
         
         for pattern in patterns:
-            combined_examples.extend(pattern.examples[:2])  # Take top 2 examples from each
-            combined_anti_examples.extend(pattern.anti_examples[:2])
+            for example in islice(pattern.examples, 2):  # Take top 2 examples from each
+                if len(combined_examples) >= 5:
+                    break
+                combined_examples[example] = None
+            for anti_example in islice(pattern.anti_examples, 2):
+                if len(combined_anti_examples) >= 3:
+                    break
+                combined_anti_examples[anti_example] = None
             total_frequency += pattern.frequency
             weighted_success_rate += pattern.success_rate * pattern.frequency
         
-        # Remove duplicates and limit size
-        combined_examples = list(dict.fromkeys(combined_examples))[:5]
-        combined_anti_examples = list(dict.fromkeys(combined_anti_examples))[:3]
-        
         avg_success_rate = weighted_success_rate / total_frequency if total_frequency > 0 else 0
         
         # Handle multi-skill patterns
@@ -424,24 +929,26 @@ class HintGenerator:
             success_rate=avg_success_rate,
             frequency=total_frequency,
             confidence=min(1.0, total_frequency / 20.0),
-            examples=combined_examples,
-            anti_examples=combined_anti_examples
+            examples=list(combined_examples),
+            anti_examples=list(combined_anti_examples)
+        )
+    
+    @staticmethod
+    def _format_examples(pattern: HintPattern) -> Tuple[str, str]:
+        """First two examples and anti-examples as they appear in prompts"""
+        return (
+            str(pattern.examples[:2]) if pattern.examples else 'N/A',
+            str(pattern.anti_examples[:2]) if pattern.anti_examples else 'N/A'
         )
     
+    def _examples_snippet(self, pattern: HintPattern) -> Tuple[str, str]:
+        """Prompt text of a pattern's examples, formatted once when it was combined"""
+        snippet = self._example_snippets.get(pattern.id)
+        return snippet if snippet is not None else self._format_examples(pattern)
+    
     def _extract_error_type(self, pattern: HintPattern) -> str:
         """Extract error type from pattern description"""
-        desc = pattern.pattern_description.lower()
-        if "permission" in desc:
-            return "Permission Issues"
-        elif "file not found" in desc or "no such file" in desc:
-            return "File/Path Issues"
-        elif "command not found" in desc:
-            return "Command Issues"
-        elif "syntax" in desc:
-            return "Syntax Errors"
-        elif "timeout" in desc:
-            return "Timeout Issues"
-        elif "connection" in desc:
-            return "Connection Issues"
-        else:
-            return "General Errors"
\ No newline at end of file
+        # Labels are listed by precedence: a description matching several keeps the first label
+        matches = (m.lastgroup for m in _ERR_RE.finditer(pattern.pattern_description))
+        group = min(matches, key=_ERR_PRECEDENCE.__getitem__, default=None)
+        return _ERR_LABELS[group] if group else "General Errors"
\ No newline at end of file
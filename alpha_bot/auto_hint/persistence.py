@@ -2,20 +2,118 @@
 
 import os
 import json
+import atexit
 import hashlib
-from typing import List, Dict, Any, Optional
+import mmap
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 from loguru import logger
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from .types import HintMetadata, HintCategory
 
 
+def _default(obj: Any) -> Any:
+    """JSON fallback for values the encoder does not handle natively"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    return str(obj)
+
+
+def _dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes, via orjson when it is installed
+    
+    The json fallback uses the same separators so both produce the same
+    bytes for the plain dicts stored here (content hashes do not depend
+    on whether orjson is available).
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=(",", ": ") if indent else (",", ":"),
+        sort_keys=sort_keys,
+        ensure_ascii=False,
+        default=_default
+    ).encode("utf-8")
+
+
+# fdatasync skips the inode metadata flush; not available on macOS
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, via orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Managers with usage updates that may not be flushed yet; drained at exit
+_live_managers: "weakref.WeakSet[HintPersistenceManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for manager in list(_live_managers):
+        manager.flush()
+
+
 class HintPersistenceManager:
     """
     Manages persistence of generated hints including storage, retrieval, and versioning
     """
     
+    # Map skill names to directories; anything else goes to "general"
+    SKILL_DIRECTORIES = {
+        "BrowserSkill": "browser",
+        "CommandSkill": "command", 
+        "WeChatSkill": "wechat",
+        "FeishuSkill": "feishu",
+        "PPTSkill": "ppt",
+        "ImageSkill": "image",
+        "DirectLLMSkill": "direct_llm"
+    }
+    
+    WRITE_WORKERS = 8  # Concurrent hint file writes in save_hints
+    FLUSH_INTERVAL = 1.0  # Seconds usage/effectiveness updates may wait before being logged
+    
     def __init__(self, base_path: Optional[str] = None):
         """
         Initialize the persistence manager
@@ -32,9 +130,72 @@ class HintPersistenceManager:
             )
         
         self.base_path = Path(base_path)
-        self.metadata_file = self.base_path / "hints_metadata.json"
+        # Skill directory paths, built once rather than per lookup
+        self._skill_dirs = {name: self.base_path / sub for name, sub in self.SKILL_DIRECTORIES.items()}
+        self._default_skill_dir = self.base_path / "general"
+        # The snapshot is only read and written by this class, so it is stored
+        # as MessagePack when msgpack is installed; an existing JSON snapshot
+        # is read once and migrated by the first compaction
+        self.json_metadata_file = self.base_path / "hints_metadata.json"
+        if msgpack is not None:
+            self.metadata_file = self.base_path / "hints_metadata.msgpack"
+        else:
+            self.metadata_file = self.json_metadata_file
+        # Mutations are appended here as one JSON line each and folded into
+        # metadata_file by compact(), so an update costs one record, not the whole file
+        self.log_file = self.base_path / "hints_metadata.log"
+        # Opened on the first write, so read-only use never creates the file
+        self._log_fd: Optional[int] = None
+        self._log_unavailable = False
+        self._log_size = 0
+        self._snapshot_size = 0
+        # Secondary indexes: skill name / category -> hint ids. Dicts are used
+        # as ordered sets so lookups keep the order of self.metadata
+        self._by_skill: Dict[str, Dict[str, None]] = {}
+        self._by_category: Dict[str, Dict[str, None]] = {}
+        # hint id -> parsed created_at (None if missing/unparsable), so cleanup
+        # sweeps don't re-parse every ISO timestamp
+        self._created_at: Dict[str, Optional[datetime]] = {}
+        # Column arrays (ids, created epoch, effectiveness, usage) for the
+        # NumPy cleanup filter; rebuilt lazily after any change
+        self._columns: Optional[Tuple[Any, Any, Any, Any]] = None
+        # Hint file path -> (st_mtime_ns, content), so unchanged files are not re-read
+        self._content_cache: Dict[str, Tuple[int, str]] = {}
+        # Hints whose usage/effectiveness changed since the last log write
+        # (dict as ordered set); a timer flushes them so bursts of updates
+        # become one append
+        self._dirty: Dict[str, None] = {}
+        # Usage bumps not yet folded into the records; applied (with one
+        # updated_at timestamp) when the log is written or a reader needs them
+        self._usage_delta: Dict[str, int] = {}
+        self._dirty_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        # Metadata is parsed on first use (see the metadata property): callers
+        # that only construct the manager, e.g. skills fetching the global
+        # hint system at startup, never pay for it
+        self._metadata: Optional[Dict[str, Dict[str, Any]]] = None
         self._ensure_directories()
-        self._load_metadata()
+    
+    @property
+    def metadata(self) -> Dict[str, Dict[str, Any]]:
+        """Hint id -> metadata record, loaded from disk on first access"""
+        if self._metadata is None:
+            self._ensure_loaded()
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value: Dict[str, Dict[str, Any]]):
+        self._metadata = value
+    
+    def _ensure_loaded(self):
+        """Load metadata and build the indexes if that has not happened yet"""
+        with self._dirty_lock:
+            if self._metadata is not None:
+                return
+            self._load_metadata()
+            self._rebuild_indexes()
+            if self.metadata_file != self.json_metadata_file and self.json_metadata_file.exists():
+                self.compact()
     
     def _ensure_directories(self):
         """Ensure all required directories exist"""
@@ -42,56 +203,238 @@ class HintPersistenceManager:
         self.base_path.mkdir(parents=True, exist_ok=True)
         
         # Create skill-specific directories
-        skill_dirs = [
-            "browser", "command", "general", "wechat", 
-            "feishu", "ppt", "image", "direct_llm"
-        ]
-        
-        for skill_dir in skill_dirs:
-            (self.base_path / skill_dir).mkdir(exist_ok=True)
+        for skill_dir in (*self._skill_dirs.values(), self._default_skill_dir):
+            skill_dir.mkdir(exist_ok=True)
     
     def _load_metadata(self):
-        """Load hints metadata from file"""
-        if self.metadata_file.exists():
+        """Load hints metadata from the snapshot file, then replay the change log"""
+        snapshot = self.metadata_file if self.metadata_file.exists() else self.json_metadata_file
+        if snapshot.exists():
             try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    self.metadata = json.load(f)
+                self.metadata = self._read_snapshot(snapshot)
             except Exception as e:
                 logger.warning(f"Failed to load hints metadata: {e}")
                 self.metadata = {}
         else:
             self.metadata = {}
+        
+        if self.log_file.exists():
+            try:
+                data = self.log_file.read_bytes()
+            except Exception as e:
+                logger.warning(f"Failed to read hints metadata log: {e}")
+                return
+            self._log_size = len(data)
+            for line in data.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    self._apply_log_entry(_loads(line))
+                except Exception as e:
+                    # A crash mid-append can leave a partial last line
+                    logger.warning(f"Skipping bad hints metadata log entry: {e}")
+    
+    def _read_snapshot(self, snapshot: Path) -> Dict[str, Dict[str, Any]]:
+        """Parse a snapshot file straight from a read-only memory map"""
+        with open(snapshot, 'rb') as f:
+            self._snapshot_size = os.fstat(f.fileno()).st_size
+            if not self._snapshot_size:
+                return _loads(b"")  # mmap can't map an empty file; raises like any bad snapshot
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if snapshot.suffix == ".msgpack":
+                    with memoryview(mm) as view:
+                        return msgpack.unpackb(view, raw=False)
+                if orjson is not None:
+                    with memoryview(mm) as view:
+                        return orjson.loads(view)
+                return json.loads(mm[:])
+    
+    def _apply_log_entry(self, entry: Dict[str, Any]):
+        """Apply one change log entry to the in-memory metadata"""
+        if entry["op"] == "upsert":
+            self.metadata[entry["id"]] = entry["rec"]
+        elif entry["op"] == "delete":
+            self.metadata.pop(entry["id"], None)
+    
+    def _rebuild_indexes(self):
+        """Build the skill and category indexes in one pass over the metadata"""
+        self._by_skill.clear()
+        self._by_category.clear()
+        self._created_at.clear()
+        for hint_id in self.metadata:
+            self._index(hint_id)
+    
+    def _index(self, hint_id: str):
+        """Add a hint to the skill and category indexes"""
+        self._columns = None
+        meta = self.metadata[hint_id]
+        self._by_skill.setdefault(meta.get("skill_name", "unknown"), {})[hint_id] = None
+        self._by_category.setdefault(meta.get("category", "unknown"), {})[hint_id] = None
+        try:
+            self._created_at[hint_id] = datetime.fromisoformat(meta["created_at"])
+        except (KeyError, TypeError, ValueError):
+            self._created_at[hint_id] = None
+    
+    def _unindex(self, hint_id: str):
+        """Remove a hint from the skill and category indexes"""
+        self._columns = None
+        meta = self.metadata[hint_id]
+        for index, key in ((self._by_skill, meta.get("skill_name", "unknown")),
+                           (self._by_category, meta.get("category", "unknown"))):
+            ids = index.get(key)
+            if ids is not None:
+                ids.pop(hint_id, None)
+                if not ids:
+                    del index[key]
+        self._created_at.pop(hint_id, None)
+    
+    def _open_log(self):
+        """Open the change log for appending; without it every change rewrites the snapshot"""
+        try:
+            self._log_fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        except OSError as e:
+            logger.warning(f"Failed to open hints metadata log, falling back to full rewrites: {e}")
+            self._log_fd = None
+            self._log_unavailable = True
     
     def _save_metadata(self):
         """Save hints metadata to file"""
         try:
-            # Convert metadata to JSON-serializable format
-            def make_serializable(obj):
-                if hasattr(obj, '__dict__'):
-                    # Handle dataclass objects
-                    result = {}
-                    for k, v in obj.__dict__.items():
-                        result[k] = make_serializable(v)
-                    return result
-                elif isinstance(obj, (list, tuple)):
-                    return [make_serializable(item) for item in obj]
-                elif isinstance(obj, dict):
-                    return {k: make_serializable(v) for k, v in obj.items()}
-                elif hasattr(obj, 'value') and hasattr(obj, 'name'):
-                    # Handle enum objects
-                    return obj.value
-                elif hasattr(obj, 'isoformat'):
-                    # Handle datetime objects
-                    return obj.isoformat()
-                else:
-                    return obj
-            
-            serializable_metadata = make_serializable(self.metadata)
-            
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(serializable_metadata, f, indent=2, ensure_ascii=False, default=str)
+            # Records are flat dicts of primitives (save_hint converts enums and
+            # datetimes up front); _default only catches stray leaf values
+            if msgpack is not None:
+                data = msgpack.packb(self.metadata, use_bin_type=True, default=_default)
+            else:
+                data = _dumps(self.metadata, indent=True, sort_keys=True)
+            # Write a temp file and rename it over the snapshot, so a crash
+            # mid-write never leaves a truncated snapshot behind
+            tmp_file = self.metadata_file.with_name(self.metadata_file.name + ".tmp")
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                _fdatasync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_file, self.metadata_file)
+            self._snapshot_size = len(data)
+            if self.metadata_file != self.json_metadata_file and self.json_metadata_file.exists():
+                # Migrated; a stale JSON snapshot must not be picked up again
+                self.json_metadata_file.unlink()
+            return True
         except Exception as e:
             logger.error(f"Failed to save hints metadata: {e}")
+            return False
+    
+    def _log_change(self, op: str, hint_id: str):
+        """
+        Record a change to one hint in the change log
+        
+        Args:
+            op: "upsert" (the current record of hint_id) or "delete"
+            hint_id: ID of the changed hint
+        """
+        self._log_changes([(op, hint_id)])
+    
+    def _log_changes(self, changes: List[Tuple[str, str]]):
+        """Record several (op, hint_id) changes, plus any dirty hints, with a single append"""
+        with self._dirty_lock:
+            self._write_changes(changes)
+    
+    def _write_changes(self, changes: List[Tuple[str, str]]):
+        """Append changes to the log; caller holds _dirty_lock"""
+        self._apply_usage_deltas()
+        # Fold in pending usage updates; an explicit change to the same hint supersedes them
+        if self._dirty:
+            explicit = {hint_id for _, hint_id in changes}
+            changes = [
+                ("upsert", hint_id) for hint_id in self._dirty
+                if hint_id not in explicit and hint_id in self.metadata
+            ] + changes
+            self._dirty.clear()
+        if not changes:
+            return
+        
+        if self._log_fd is None and not self._log_unavailable:
+            self._open_log()
+        if self._log_fd is None:
+            self._save_metadata()
+            return
+        
+        lines = []
+        for op, hint_id in changes:
+            entry = {"op": op, "id": hint_id}
+            if op == "upsert":
+                entry["rec"] = self.metadata[hint_id]
+            lines.append(_dumps(entry) + b"\n")
+        data = b"".join(lines)
+        try:
+            # One write per call; O_APPEND keeps concurrent appends whole
+            os.write(self._log_fd, data)
+        except OSError as e:
+            logger.error(f"Failed to append to hints metadata log: {e}")
+            self._save_metadata()
+            return
+        
+        self._log_size += len(data)
+        if self._log_size > self._snapshot_size:
+            self.compact()
+    
+    def _apply_usage_deltas(self):
+        """Fold queued usage bumps into the metadata records"""
+        if not self._usage_delta:
+            return
+        with self._dirty_lock:
+            now = datetime.now().isoformat()
+            for hint_id, count in self._usage_delta.items():
+                meta = self.metadata.get(hint_id)
+                if meta is not None:
+                    meta["usage_count"] = meta.get("usage_count", 0) + count
+                    meta["updated_at"] = now
+            self._usage_delta.clear()
+            self._columns = None
+    
+    def _mark_dirty(self, hint_id: str):
+        """Queue a hint's record to be logged by the next flush"""
+        with self._dirty_lock:
+            self._columns = None
+            self._dirty[hint_id] = None
+            if self._flush_timer is None:
+                _live_managers.add(self)
+                self._flush_timer = threading.Timer(self.FLUSH_INTERVAL, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush(self):
+        """Write pending usage/effectiveness updates to the change log"""
+        with self._dirty_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._write_changes([])
+    
+    def compact(self):
+        """Fold the change log into the metadata snapshot and truncate the log"""
+        if not self._save_metadata():
+            return
+        try:
+            if self._log_fd is not None:
+                os.ftruncate(self._log_fd, 0)
+            elif self.log_file.exists():
+                self.log_file.write_bytes(b"")
+            self._log_size = 0
+        except OSError as e:
+            logger.warning(f"Failed to truncate hints metadata log: {e}")
+    
+    def close(self):
+        """Flush pending updates, compact the change log and close it"""
+        self.flush()
+        if self._log_size:
+            self.compact()
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
     
     def save_hint(self, hint_data: Dict[str, Any]) -> bool:
         """
@@ -103,74 +446,166 @@ class HintPersistenceManager:
         Returns:
             bool: True if saved successfully
         """
-        logger.info(f"Saving hint: {hint_data}")
-        try:
-            metadata = hint_data.get("metadata")
-            if not metadata:
-                logger.error("Hint data missing metadata")
-                return False
-            
-            # Convert metadata to dict if it's a dataclass
-            if hasattr(metadata, '__dict__'):
-                metadata_dict = metadata.__dict__.copy()  # Create a copy to avoid modifying the original
-                # Convert enum fields to their values
-                if 'category' in metadata_dict and hasattr(metadata_dict['category'], 'value'):
-                    metadata_dict['category'] = metadata_dict['category'].value
-                # Convert datetime fields to ISO format strings
-                if 'created_at' in metadata_dict and hasattr(metadata_dict['created_at'], 'isoformat'):
-                    metadata_dict['created_at'] = metadata_dict['created_at'].isoformat()
-                if 'updated_at' in metadata_dict and hasattr(metadata_dict['updated_at'], 'isoformat'):
-                    metadata_dict['updated_at'] = metadata_dict['updated_at'].isoformat()
-            else:
-                metadata_dict = metadata
-            
-            # Generate unique filename based on content hash
-            # Use formatted hint data for hash generation
-            hash_hint_data = {
-                "metadata": metadata_dict,
-                "content": hint_data.get("content", "")
-            }
-            content_hash = self._generate_content_hash(hash_hint_data)
-            filename = f"hint_{content_hash}.md"
-            
-            # Determine directory based on skill
-            skill_dir = self._get_skill_directory(metadata_dict.get("skill_name", "general"))
-            file_path = skill_dir / filename
+        return self.save_hints([hint_data]) == 1
+    
+    def save_hints(self, hints: List[Dict[str, Any]]) -> int:
+        """
+        Save a batch of generated hints
+        
+        The markdown files are written concurrently and all metadata changes
+        go to the change log in one append, instead of one round of
+        open/write/close plus a log write per hint. A hint whose content is
+        already stored for its skill is not written again; the existing
+        hint's usage count is bumped instead.
+        
+        Args:
+            hints: List of dictionaries containing hint metadata and content
             
-            # Create hint content
-            # Create new hint_data with converted metadata
-            formatted_hint_data = {
-                "metadata": metadata_dict,
-                "content": hint_data.get("content", "")
-            }
-            hint_content = self._format_hint_content(formatted_hint_data)
+        Returns:
+            int: Number of hints saved successfully
+        """
+        # One footer timestamp for the whole batch
+        generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        prepared = []
+        unchanged = 0
+        batch_hashes = set()
+        for hint_data in hints:
+            logger.info(f"Saving hint: {hint_data}")
+            try:
+                item = self._prepare_hint(hint_data, generated_at)
+            except Exception as e:
+                logger.error(f"Failed to save hint: {e}")
+                continue
             
-            # Write to file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(hint_content)
+            file_path, _, _, record = item
+            key = (record["skill_name"], record["content_hash"])
+            with self._dirty_lock:
+                existing_id = self._find_stored_content(record)
+                if key in batch_hashes or (existing_id is not None and os.path.exists(file_path)):
+                    if existing_id is not None:
+                        self.update_hint_usage(existing_id)
+                    logger.info(f"Hint unchanged, skipped write: {record['title'] or 'Untitled'}")
+                    unchanged += 1
+                    continue
+            batch_hashes.add(key)
+            prepared.append(item)
+        if not prepared:
+            return unchanged
+        
+        def write(item) -> Optional[Exception]:
+            file_path, hint_content = item[0], item[1]
+            try:
+                with open(file_path, 'wb') as f:
+                    f.write(hint_content)
+            except Exception as e:
+                return e
+            return None
+        
+        if len(prepared) == 1:
+            results = [write(prepared[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(prepared), self.WRITE_WORKERS)) as pool:
+                results = list(pool.map(write, prepared))
+        
+        changes = []
+        # The flush timer and atexit hook serialize the same dict, so the
+        # metadata, the indexes and the log append change together under the lock
+        with self._dirty_lock:
+            for (file_path, _, hint_id, record), error in zip(prepared, results):
+                if error is not None:
+                    logger.error(f"Failed to save hint: {error}")
+                    continue
+                # Another batch may have stored the same content while the files were written
+                existing_id = self._find_stored_content(record)
+                if existing_id is not None and existing_id != hint_id:
+                    self.update_hint_usage(existing_id)
+                    unchanged += 1
+                    continue
+                if hint_id in self.metadata:
+                    self._unindex(hint_id)
+                self.metadata[hint_id] = record
+                self._index(hint_id)
+                changes.append(("upsert", hint_id))
+                logger.info(f"Saved hint: {record['title'] or 'Untitled'} to {file_path}")
             
-            # Update metadata
-            hint_id = metadata_dict.get("id", content_hash)
-            self.metadata[hint_id] = {
-                "id": hint_id,
+            if changes:
+                self._log_changes(changes)
+        return len(changes) + unchanged
+    
+    def _find_stored_content(self, record: Dict[str, Any]) -> Optional[str]:
+        """ID of a stored hint of the same skill with the same content hash, if any"""
+        self._ensure_loaded()
+        for hint_id in self._by_skill.get(record["skill_name"], ()):
+            if self.metadata[hint_id].get("content_hash") == record["content_hash"]:
+                return hint_id
+        return None
+    
+    def _prepare_hint(self, hint_data: Dict[str, Any],
+                      generated_at: Optional[str] = None) -> Tuple[Path, bytes, str, Dict[str, Any]]:
+        """
+        Render a hint and build its metadata record without touching the disk
+        
+        Returns:
+            (file path, UTF-8 markdown content, hint id, metadata record)
+        """
+        metadata = hint_data.get("metadata")
+        if not metadata:
+            raise ValueError("Hint data missing metadata")
+        
+        # Convert metadata to dict if it's a dataclass (slotted, so no __dict__)
+        if is_dataclass(metadata):
+            metadata_dict = {f.name: getattr(metadata, f.name) for f in fields(metadata)}
+            # Convert enum fields to their values
+            if 'category' in metadata_dict and hasattr(metadata_dict['category'], 'value'):
+                metadata_dict['category'] = metadata_dict['category'].value
+            # Convert datetime fields to ISO format strings
+            if 'created_at' in metadata_dict and hasattr(metadata_dict['created_at'], 'isoformat'):
+                metadata_dict['created_at'] = metadata_dict['created_at'].isoformat()
+            if 'updated_at' in metadata_dict and hasattr(metadata_dict['updated_at'], 'isoformat'):
+                metadata_dict['updated_at'] = metadata_dict['updated_at'].isoformat()
+        else:
+            metadata_dict = metadata
+        
+        # Generate unique filename based on content hash. Only the fields that
+        # make up the hint go into the hash (not its id or timestamps), so
+        # regenerating the same hint maps to the same file
+        hash_hint_data = {
+            "metadata": {
                 "title": metadata_dict.get("title", ""),
                 "category": metadata_dict.get("category", "best_practice"),
-                "skill_name": metadata_dict.get("skill_name", "general"),
-                "filename": filename,
-                "created_at": metadata_dict.get("created_at", datetime.now().isoformat()),
-                "updated_at": datetime.now().isoformat(),
-                "usage_count": metadata_dict.get("usage_count", 0),
-                "effectiveness_score": metadata_dict.get("effectiveness_score", 0.0),
-                "content_hash": content_hash
-            }
-            
-            self._save_metadata()
-            logger.info(f"Saved hint: {metadata_dict.get('title', 'Untitled')} to {file_path}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to save hint: {e}")
-            return False
+                "skill_name": metadata_dict.get("skill_name", "general")
+            },
+            "content": hint_data.get("content", "")
+        }
+        content_hash = self._generate_content_hash(hash_hint_data)
+        filename = f"hint_{content_hash}.md"
+        
+        # Determine directory based on skill
+        skill_dir = self._get_skill_directory(metadata_dict.get("skill_name", "general"))
+        file_path = skill_dir / filename
+        
+        # Create hint content
+        # Create new hint_data with converted metadata
+        formatted_hint_data = {
+            "metadata": metadata_dict,
+            "content": hint_data.get("content", "")
+        }
+        hint_content = self._format_hint_content(formatted_hint_data, generated_at)
+        
+        hint_id = metadata_dict.get("id", content_hash)
+        record = {
+            "id": hint_id,
+            "title": metadata_dict.get("title", ""),
+            "category": metadata_dict.get("category", "best_practice"),
+            "skill_name": metadata_dict.get("skill_name", "general"),
+            "filename": filename,
+            "created_at": metadata_dict.get("created_at", datetime.now().isoformat()),
+            "updated_at": datetime.now().isoformat(),
+            "usage_count": metadata_dict.get("usage_count", 0),
+            "effectiveness_score": metadata_dict.get("effectiveness_score", 0.0),
+            "content_hash": content_hash
+        }
+        return file_path, hint_content, hint_id, record
     
     def load_hints_for_skill(self, skill_name: str) -> List[Dict[str, Any]]:
         """
@@ -182,6 +617,8 @@ class HintPersistenceManager:
         Returns:
             List of hint dictionaries
         """
+        self._ensure_loaded()
+        self._apply_usage_deltas()
         hints = []
         skill_dir = self._get_skill_directory(skill_name)
         
@@ -189,23 +626,29 @@ class HintPersistenceManager:
             return hints
         
         # Load hints from metadata
-        skill_hints = [
-            meta for meta in self.metadata.values()
-            if meta.get("skill_name") == skill_name
-        ]
+        skill_hints = [self.metadata[hint_id] for hint_id in self._by_skill.get(skill_name, ())]
         
-        # Read content for each hint
+        # Read content for each hint, reusing cached content while the file is unchanged
         for hint_meta in skill_hints:
             try:
-                file_path = skill_dir / hint_meta["filename"]
-                if file_path.exists():
+                file_path = os.path.join(skill_dir, hint_meta["filename"])
+                try:
+                    mtime = os.stat(file_path).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                
+                cached = self._content_cache.get(file_path)
+                if cached is not None and cached[0] == mtime:
+                    content = cached[1]
+                else:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         content = f.read()
-                    
-                    hints.append({
-                        "metadata": hint_meta,
-                        "content": content
-                    })
+                    self._content_cache[file_path] = (mtime, content)
+                
+                hints.append({
+                    "metadata": hint_meta,
+                    "content": content
+                })
             except Exception as e:
                 logger.warning(f"Failed to load hint {hint_meta.get('title', 'Unknown')}: {e}")
         
@@ -220,11 +663,11 @@ class HintPersistenceManager:
         """
         all_hints = {}
         
-        # Get all skill directories
-        skill_dirs = [d for d in self.base_path.iterdir() if d.is_dir() and d.name != ".git"]
+        # Get all skill directories; scandir entries carry the file type, so no stat per entry
+        with os.scandir(self.base_path) as it:
+            skill_names = [e.name for e in it if e.is_dir(follow_symlinks=False) and e.name != ".git"]
         
-        for skill_dir in skill_dirs:
-            skill_name = skill_dir.name
+        for skill_name in skill_names:
             hints = self.load_hints_for_skill(skill_name)
             if hints:
                 all_hints[skill_name] = hints
@@ -238,11 +681,14 @@ class HintPersistenceManager:
         Args:
             hint_id: ID of the hint to update
         """
-        if hint_id in self.metadata:
-            self.metadata[hint_id]["usage_count"] = self.metadata[hint_id].get("usage_count", 0) + 1
-            self.metadata[hint_id]["updated_at"] = datetime.now().isoformat()
-            self._save_metadata()
-            logger.debug(f"Updated usage count for hint {hint_id}")
+        # Only counted here; the record itself is updated when the count is
+        # applied (see _apply_usage_deltas), so the hot path builds no strings
+        with self._dirty_lock:
+            if hint_id not in self.metadata:
+                return
+            self._usage_delta[hint_id] = self._usage_delta.get(hint_id, 0) + 1
+            self._mark_dirty(hint_id)
+        logger.debug("Updated usage count for hint {}", hint_id)
     
     def update_hint_effectiveness(self, hint_id: str, score: float):
         """
@@ -252,11 +698,13 @@ class HintPersistenceManager:
             hint_id: ID of the hint to update
             score: Effectiveness score (0.0-1.0)
         """
-        if hint_id in self.metadata:
+        with self._dirty_lock:
+            if hint_id not in self.metadata:
+                return
             self.metadata[hint_id]["effectiveness_score"] = score
             self.metadata[hint_id]["updated_at"] = datetime.now().isoformat()
-            self._save_metadata()
-            logger.debug(f"Updated effectiveness score for hint {hint_id}: {score}")
+            self._mark_dirty(hint_id)
+        logger.debug(f"Updated effectiveness score for hint {hint_id}: {score}")
     
     def delete_hint(self, hint_id: str) -> bool:
         """
@@ -268,21 +716,25 @@ class HintPersistenceManager:
         Returns:
             bool: True if deleted successfully
         """
-        if hint_id not in self.metadata:
-            return False
-        
         try:
-            hint_meta = self.metadata[hint_id]
-            skill_dir = self._get_skill_directory(hint_meta["skill_name"])
-            file_path = skill_dir / hint_meta["filename"]
-            
-            # Delete file
-            if file_path.exists():
-                file_path.unlink()
-            
-            # Remove from metadata
-            del self.metadata[hint_id]
-            self._save_metadata()
+            with self._dirty_lock:
+                hint_meta = self.metadata.get(hint_id)
+                if hint_meta is None:
+                    return False
+                skill_dir = self._get_skill_directory(hint_meta["skill_name"])
+                file_path = skill_dir / hint_meta["filename"]
+                
+                # Delete file
+                if file_path.exists():
+                    file_path.unlink()
+                self._content_cache.pop(str(file_path), None)
+                
+                # Remove from metadata
+                self._unindex(hint_id)
+                del self.metadata[hint_id]
+                self._usage_delta.pop(hint_id, None)
+                self._dirty.pop(hint_id, None)
+                self._log_change("delete", hint_id)
             
             logger.info(f"Deleted hint: {hint_meta.get('title', 'Unknown')}")
             return True
@@ -298,23 +750,11 @@ class HintPersistenceManager:
         Returns:
             Dictionary with statistics
         """
-        total_hints = len(self.metadata)
-        hints_by_skill = {}
-        hints_by_category = {}
-        
-        for meta in self.metadata.values():
-            # Count by skill
-            skill = meta.get("skill_name", "unknown")
-            hints_by_skill[skill] = hints_by_skill.get(skill, 0) + 1
-            
-            # Count by category
-            category = meta.get("category", "unknown")
-            hints_by_category[category] = hints_by_category.get(category, 0) + 1
-        
+        self._ensure_loaded()
         return {
-            "total_hints": total_hints,
-            "hints_by_skill": hints_by_skill,
-            "hints_by_category": hints_by_category,
+            "total_hints": len(self.metadata),
+            "hints_by_skill": {skill: len(ids) for skill, ids in self._by_skill.items()},
+            "hints_by_category": {category: len(ids) for category, ids in self._by_category.items()},
             "storage_path": str(self.base_path)
         }
     
@@ -329,14 +769,53 @@ class HintPersistenceManager:
         Returns:
             Number of hints deleted
         """
+        self._ensure_loaded()
+        self._apply_usage_deltas()
         deleted_count = 0
         cutoff_date = datetime.now() - timedelta(days=max_age_days)
         
+        if np is not None:
+            ids, created, effectiveness, usage = self._cleanup_columns()
+            # NaN (no creation time) compares False, so such hints count as new
+            mask = (effectiveness < min_effectiveness) & ((created < cutoff_date.timestamp()) | (usage == 0))
+            to_delete = ids[mask].tolist()
+        else:
+            to_delete = self._cleanup_candidates(cutoff_date, min_effectiveness)
+        
+        # Perform deletion
+        for hint_id in to_delete:
+            if self.delete_hint(hint_id):
+                deleted_count += 1
+        
+        if deleted_count > 0:
+            logger.info(f"Cleaned up {deleted_count} old/ineffective hints")
+        
+        return deleted_count
+    
+    def _cleanup_columns(self) -> Tuple[Any, Any, Any, Any]:
+        """Metadata as NumPy columns (ids, created epoch, effectiveness, usage), cached until the next change"""
+        if self._columns is None:
+            with self._dirty_lock:
+                ids = list(self.metadata)
+                created = [
+                    created_at.timestamp() if created_at is not None else np.nan
+                    for created_at in map(self._created_at.get, ids)
+                ]
+                self._columns = (
+                    np.array(ids, dtype=object),
+                    np.array(created, dtype=np.float64),
+                    np.array([self.metadata[i].get("effectiveness_score", 0.0) for i in ids], dtype=np.float64),
+                    np.array([self.metadata[i].get("usage_count", 0) for i in ids], dtype=np.int64),
+                )
+        return self._columns
+    
+    def _cleanup_candidates(self, cutoff_date: datetime, min_effectiveness: float) -> List[str]:
+        """IDs of hints matching the cleanup criteria (pure Python path)"""
         to_delete = []
         for hint_id, meta in self.metadata.items():
-            # Check age
-            created_at = datetime.fromisoformat(meta.get("created_at", datetime.now().isoformat()))
-            is_old = created_at < cutoff_date
+            # Check age (hints without a usable creation time count as new)
+            created_at = self._created_at.get(hint_id)
+            is_old = created_at is not None and created_at < cutoff_date
             
             # Check effectiveness
             effectiveness = meta.get("effectiveness_score", 0.0)
@@ -350,63 +829,47 @@ class HintPersistenceManager:
             if (is_old and is_ineffective) or (is_unused and is_ineffective):
                 to_delete.append(hint_id)
         
-        # Perform deletion
-        for hint_id in to_delete:
-            if self.delete_hint(hint_id):
-                deleted_count += 1
-        
-        if deleted_count > 0:
-            logger.info(f"Cleaned up {deleted_count} old/ineffective hints")
-        
-        return deleted_count
+        return to_delete
     
     def _get_skill_directory(self, skill_name: str) -> Path:
         """Get directory path for a skill"""
-        # Map skill names to directories
-        skill_mapping = {
-            "BrowserSkill": "browser",
-            "CommandSkill": "command", 
-            "WeChatSkill": "wechat",
-            "FeishuSkill": "feishu",
-            "PPTSkill": "ppt",
-            "ImageSkill": "image",
-            "DirectLLMSkill": "direct_llm"
-        }
-        
-        dir_name = skill_mapping.get(skill_name, "general")
-        return self.base_path / dir_name
+        return self._skill_dirs.get(skill_name, self._default_skill_dir)
     
     def _generate_content_hash(self, hint_data: Dict[str, Any]) -> str:
         """Generate hash of hint content for unique identification"""
-        content_str = json.dumps(hint_data, sort_keys=True, ensure_ascii=False)
-        return hashlib.md5(content_str.encode('utf-8')).hexdigest()[:12]
+        data = _dumps(hint_data, sort_keys=True)
+        # Only used to name files, so a fast non-cryptographic hash is enough
+        if xxhash is not None:
+            return xxhash.xxh3_64(data).hexdigest()[:12]
+        return hashlib.md5(data).hexdigest()[:12]
     
-    def _format_hint_content(self, hint_data: Dict[str, Any]) -> str:
-        """Format hint data as markdown content"""
+    def _format_hint_content(self, hint_data: Dict[str, Any], generated_at: Optional[str] = None) -> bytes:
+        """
+        Format hint data as UTF-8 markdown content
+        
+        Args:
+            hint_data: Dictionary with converted metadata and content
+            generated_at: Footer timestamp; defaults to now (save_hints passes one per batch)
+        """
         metadata = hint_data.get("metadata", {})
         content = hint_data.get("content", "")
-        
-        # Create markdown header
-        md_lines = []
-        md_lines.append(f"# {metadata.get('title', 'Untitled Hint')}")
-        md_lines.append("")
-        
-        # Add metadata as frontmatter-like section
-        md_lines.append("## Metadata")
-        md_lines.append(f"- **Category**: {metadata.get('category', 'best_practice')}")
-        md_lines.append(f"- **Skill**: {metadata.get('skill_name', 'general')}")
-        md_lines.append(f"- **Created**: {metadata.get('created_at', 'Unknown')}")
-        md_lines.append(f"- **Usage Count**: {metadata.get('usage_count', 0)}")
-        md_lines.append(f"- **Effectiveness**: {metadata.get('effectiveness_score', 0.0):.2f}")
-        md_lines.append("")
-        
-        # Add main content
-        md_lines.append("## Content")
-        md_lines.append(content)
-        md_lines.append("")
-        
-        # Add footer
-        md_lines.append("---")
-        md_lines.append(f"*Generated automatically from execution history on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*")
-        
-        return "\n".join(md_lines)
\ No newline at end of file
+        if generated_at is None:
+            generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Title, frontmatter-like metadata section, main content and footer
+        return (
+            f"# {metadata.get('title', 'Untitled Hint')}\n"
+            f"\n"
+            f"## Metadata\n"
+            f"- **Category**: {metadata.get('category', 'best_practice')}\n"
+            f"- **Skill**: {metadata.get('skill_name', 'general')}\n"
+            f"- **Created**: {metadata.get('created_at', 'Unknown')}\n"
+            f"- **Usage Count**: {metadata.get('usage_count', 0)}\n"
+            f"- **Effectiveness**: {metadata.get('effectiveness_score', 0.0):.2f}\n"
+            f"\n"
+            f"## Content\n"
+            f"{content}\n"
+            f"\n"
+            f"---\n"
+            f"*Generated automatically from execution history on {generated_at}*"
+        ).encode("utf-8")
\ No newline at end of file
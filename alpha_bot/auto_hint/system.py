@@ -1,17 +1,22 @@
 """Auto Hint System - Main system that orchestrates hint extraction and generation"""
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
 from loguru import logger
+import heapq
+import queue
 import threading
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 
 from ..models.types import ExecutionResult
 # Import BaseSkill in functions to avoid circular import
 from .types import ExecutionAnalysisResult
-from .analyzer import ExecutionResultAnalyzer
 from .generator import HintGenerator
 from .persistence import HintPersistenceManager
 
+if TYPE_CHECKING:
+    from .analyzer import ExecutionResultAnalyzer
+
 
 class AutoHintSystem:
     """
@@ -24,6 +29,8 @@ class AutoHintSystem:
     4. Provides interface for skills to access hints
     """
     
+    MAX_QUEUED_TASKS = 8  # Task completions submit_task_completion may queue before dropping new ones
+    
     def __init__(self, enable_persistence: bool = True, hints_path: Optional[str] = None):
         """
         Initialize the auto hint system
@@ -33,7 +40,9 @@ class AutoHintSystem:
             hints_path: Custom path for hints storage (optional)
         """
         self.enable_persistence = enable_persistence
-        self.analyzer = ExecutionResultAnalyzer()
+        # Built on first analysis; see the analyzer property
+        self._analyzer: Optional["ExecutionResultAnalyzer"] = None
+        self._analyzer_lock = threading.Lock()
         # Initialize generator with LLM support based on persistence setting
         self.generator = HintGenerator(enable_llm=enable_persistence)
         
@@ -47,12 +56,32 @@ class AutoHintSystem:
         self.analysis_interval = 1  # Analyze every N task completions
         self.task_completion_count = 0
         self._lock = threading.Lock()
+        # Task completions waiting for the background worker (see submit_task_completion)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.MAX_QUEUED_TASKS)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
         
         # Cache for loaded hints
         self._hints_cache = {}
-        self._cache_timestamp = {}
+        self._cache_expiry: Dict[str, float] = {}  # cache key -> time.monotonic() deadline
         self.cache_ttl = timedelta(hours=1)  # Cache for 1 hour
     
+    @property
+    def analyzer(self) -> "ExecutionResultAnalyzer":
+        """
+        Execution result analyzer, created on first use
+        
+        Importing the analyzer pulls in its optional numpy/numba/pyahocorasick
+        backends, which one-shot and direct-mode runs never need.
+        """
+        if self._analyzer is None:
+            # Hint learning runs on a background thread; only one analyzer may be built
+            with self._analyzer_lock:
+                if self._analyzer is None:
+                    from .analyzer import ExecutionResultAnalyzer
+                    self._analyzer = ExecutionResultAnalyzer()
+        return self._analyzer
+    
     def process_task_completion(self, history: List[ExecutionResult], 
                               skills,
                               task_description: str = "") -> bool:
@@ -60,7 +89,8 @@ class AutoHintSystem:
         Process completed task and potentially extract hints
         
         This should be called when a task completes successfully or after sufficient
-        execution history has accumulated.
+        execution history has accumulated. It blocks until the hints are saved;
+        use submit_task_completion to hand the work to the background worker.
         
         Args:
             history: Complete execution history for the task
@@ -71,48 +101,135 @@ class AutoHintSystem:
             bool: True if hints were generated and saved
         """
         with self._lock:
-            self.task_completion_count += 1
+            generated_hints = self._extract_hints(history, skills, task_description)
+            return self._save_generated_hints(generated_hints) > 0
+    
+    def submit_task_completion(self, history: List[ExecutionResult], 
+                               skills,
+                               task_description: str = "") -> bool:
+        """
+        Queue a completed task for hint extraction on a background worker
+        
+        Returns immediately. The worker drains everything queued so far,
+        analyzes each task, and saves all resulting hints as one batch. It
+        exits when the queue is empty, so a pending batch still completes
+        before the interpreter exits.
+        
+        Args:
+            history: Complete execution history for the task
+            skills: List of available skills
+            task_description: Original task description
             
-            # Check if we should trigger analysis
-            if not self._should_analyze(history):
-                return False
+        Returns:
+            bool: True if queued, False if the queue is full
+        """
+        try:
+            self._queue.put_nowait((list(history), list(skills), task_description))
+        except queue.Full:
+            logger.warning("Auto hint queue is full, skipping this task")
+            return False
+        
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._drain_queue, name="auto-hint")
+                self._worker.start()
+        return True
+    
+    def wait_for_pending(self):
+        """Block until every task queued by submit_task_completion has been processed"""
+        self._queue.join()
+    
+    def _drain_queue(self):
+        """Background worker: process queued task completions until the queue is empty"""
+        while True:
+            with self._worker_lock:
+                batch = []
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    self._worker = None
+                    return
             
             try:
-                logger.info("Starting automatic hint extraction process...")
-                
-                # Step 1: Analyze execution history
-                analysis_result = self.analyzer.analyze_history(history, skills)
-                
-                if not analysis_result.patterns:
-                    logger.info("No significant patterns found in execution history")
-                    return False
-                
-                # Step 2: Generate hints from analysis
-                generated_hints = self.generator.generate_hints_from_analysis(
-                    analysis_result, task_description
-                )
-                
-                if not generated_hints:
-                    logger.info("No hints generated from analysis")
-                    return False
-                
-                # Step 3: Save hints (if persistence enabled)
-                saved_count = 0
-                if self.enable_persistence and self.persistence:
-                    for hint_data in generated_hints:
-                        if self.persistence.save_hint(hint_data):
-                            saved_count += 1
-                
-                logger.info(f"Auto hint extraction completed: {saved_count}/{len(generated_hints)} hints saved")
-                
-                # Clear cache to force reload on next access
-                self._clear_cache()
-                
-                return saved_count > 0
-                
-            except Exception as e:
-                logger.error(f"Error during hint extraction: {e}")
-                return False
+                with self._lock:
+                    generated_hints = []
+                    for history, skills, task_description in batch:
+                        generated_hints.extend(self._extract_hints(history, skills, task_description))
+                    self._save_generated_hints(generated_hints)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _extract_hints(self, history: List[ExecutionResult], skills,
+                       task_description: str) -> List[Dict[str, Any]]:
+        """
+        Count a task completion and, if due, analyze it and generate hints
+        
+        Caller holds self._lock.
+        
+        Returns:
+            Generated hints (empty if analysis was not triggered or found nothing)
+        """
+        self.task_completion_count += 1
+        
+        # Check if we should trigger analysis
+        if not self._should_analyze(history):
+            return []
+        
+        try:
+            logger.info("Starting automatic hint extraction process...")
+            
+            # Step 1: Analyze execution history
+            analysis_result = self.analyzer.analyze_history(history, skills)
+            
+            if not analysis_result.patterns:
+                logger.info("No significant patterns found in execution history")
+                return []
+            
+            # Step 2: Generate hints from analysis
+            generated_hints = self.generator.generate_hints_from_analysis(
+                analysis_result, task_description
+            )
+            
+            if not generated_hints:
+                logger.info("No hints generated from analysis")
+                return []
+            
+            return generated_hints
+            
+        except Exception as e:
+            logger.error(f"Error during hint extraction: {e}")
+            return []
+    
+    def _save_generated_hints(self, generated_hints: List[Dict[str, Any]]) -> int:
+        """
+        Save generated hints (if persistence enabled) and invalidate the hints cache
+        
+        Returns:
+            Number of hints saved
+        """
+        if not generated_hints:
+            return 0
+        
+        try:
+            # Step 3: Save hints (if persistence enabled)
+            saved_count = 0
+            if self.enable_persistence and self.persistence:
+                saved_count = self.persistence.save_hints(generated_hints)
+            
+            logger.info(f"Auto hint extraction completed: {saved_count}/{len(generated_hints)} hints saved")
+            
+            # Clear cache to force reload on next access
+            self._clear_cache()
+            
+            return saved_count
+            
+        except Exception as e:
+            logger.error(f"Error during hint extraction: {e}")
+            return 0
     
     def get_hints_for_skill(self, skill_name: str, max_hints: int = 5) -> List[Dict[str, Any]]:
         """
@@ -128,26 +245,27 @@ class AutoHintSystem:
         if not self.enable_persistence or not self.persistence:
             return []
         
-        # Check cache first
-        cache_key = f"skill_{skill_name}"
+        # Check cache first (the top-K is cached per max_hints)
+        cache_key = f"skill_{skill_name}:{max_hints}"
         if self._is_cache_valid(cache_key):
-            return self._hints_cache[cache_key][:max_hints]
+            return list(self._hints_cache[cache_key])
         
         try:
             # Load hints from persistence
             hints = self.persistence.load_hints_for_skill(skill_name)
             
-            # Sort by effectiveness and usage (most effective and frequently used first)
-            hints.sort(key=lambda x: (
+            # Most effective and frequently used first; nlargest keeps only K
+            # (same result and tie order as a full reverse sort)
+            top = tuple(heapq.nlargest(max_hints, hints, key=lambda x: (
                 x.get("metadata", {}).get("effectiveness_score", 0),
                 x.get("metadata", {}).get("usage_count", 0)
-            ), reverse=True)
+            )))
             
             # Cache the results
-            self._hints_cache[cache_key] = hints
-            self._cache_timestamp[cache_key] = datetime.now()
+            self._hints_cache[cache_key] = top
+            self._cache_expiry[cache_key] = time.monotonic() + self.cache_ttl.total_seconds()
             
-            return hints[:max_hints]
+            return list(top)
             
         except Exception as e:
             logger.error(f"Error loading hints for skill {skill_name}: {e}")
@@ -173,7 +291,7 @@ class AutoHintSystem:
             
             # Cache the results
             self._hints_cache[cache_key] = all_hints
-            self._cache_timestamp[cache_key] = datetime.now()
+            self._cache_expiry[cache_key] = time.monotonic() + self.cache_ttl.total_seconds()
             
             return all_hints
             
@@ -294,19 +412,12 @@ class AutoHintSystem:
         Returns:
             bool: True if cache is valid
         """
-        if cache_key not in self._hints_cache:
-            return False
-        
-        if cache_key not in self._cache_timestamp:
-            return False
-        
-        cache_age = datetime.now() - self._cache_timestamp[cache_key]
-        return cache_age < self.cache_ttl
+        return cache_key in self._hints_cache and time.monotonic() < self._cache_expiry.get(cache_key, 0.0)
     
     def _clear_cache(self):
         """Clear all cached hints"""
         self._hints_cache.clear()
-        self._cache_timestamp.clear()
+        self._cache_expiry.clear()
         logger.debug("Hints cache cleared")
     
     def enable(self):
@@ -342,12 +453,18 @@ class AutoHintSystem:
 
 # Global instance
 _auto_hint_system: Optional[AutoHintSystem] = None
+_auto_hint_system_lock = threading.Lock()
 
 
 def get_auto_hint_system(enable_persistence: bool = True) -> AutoHintSystem:
     """
     Get or create the global auto hint system instance
     
+    The instance (and the analyzer it builds on first use) is shared by the
+    whole process, so matcher setup and any JIT compilation happen once.
+    Creation is guarded by a lock: skills call this while being constructed
+    and AlphaBot calls it from its background hint-learning thread.
+    
     Args:
         enable_persistence: Whether to enable persistent storage
         
@@ -357,7 +474,10 @@ def get_auto_hint_system(enable_persistence: bool = True) -> AutoHintSystem:
     global _auto_hint_system
     
     if _auto_hint_system is None:
-        _auto_hint_system = AutoHintSystem(enable_persistence=enable_persistence)
+        # Skills may be constructed concurrently; make sure only one instance is created
+        with _auto_hint_system_lock:
+            if _auto_hint_system is None:
+                _auto_hint_system = AutoHintSystem(enable_persistence=enable_persistence)
     
     return _auto_hint_system
 
@@ -371,8 +491,9 @@ def initialize_auto_hint_system(enable_persistence: bool = True, hints_path: Opt
         hints_path: Custom path for hints storage
     """
     global _auto_hint_system
-    _auto_hint_system = AutoHintSystem(
-        enable_persistence=enable_persistence,
-        hints_path=hints_path
-    )
+    with _auto_hint_system_lock:
+        _auto_hint_system = AutoHintSystem(
+            enable_persistence=enable_persistence,
+            hints_path=hints_path
+        )
     logger.info("Global auto hint system initialized")
\ No newline at end of file
@@ -6,6 +6,8 @@ from typing import List, Dict, Optional, Any
 from enum import Enum
 import uuid
 
+from ..models.types import SLOTS
+
 
 class HintCategory(Enum):
     """Categories of hints"""
@@ -41,10 +43,13 @@ class HintPattern:
             self.category = HintCategory(self.category)
 
 
-@dataclass
+@dataclass(frozen=True, **SLOTS)
 class HintMetadata:
     """
     Metadata for generated hints
+    
+    Immutable and slotted: one is created per generated hint and never
+    changed afterwards (usage counts live in the persisted metadata).
     """
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     title: str = ""
@@ -59,7 +64,7 @@ class HintMetadata:
     
     def __post_init__(self):
         if isinstance(self.category, str):
-            self.category = HintCategory(self.category)
+            object.__setattr__(self, "category", HintCategory(self.category))
 
 
 @dataclass
@@ -0,0 +1,6 @@
+"""Caching layers for skill executions"""
+
+from .semantic import SemanticCache, SemanticTextCache
+from .exec_cache import ExecCache
+
+__all__ = ["SemanticCache", "SemanticTextCache", "ExecCache"]
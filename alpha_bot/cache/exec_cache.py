@@ -0,0 +1,148 @@
+"""Execution Cache - memoize read-only shell commands for a short TTL"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from loguru import logger
+
+from ..models.types import ExecutionResult
+
+
+class ExecCache:
+    """
+    SQLite-backed cache of successful read-only command results
+
+    While exploring, the agent often re-runs the same `ls`, `pwd` or `cat`
+    within a few seconds. Results of allowlisted commands are keyed by
+    (cwd, command, PATH) and reused until the TTL expires. Any command that is
+    not cacheable may change the filesystem, so running one clears the cache;
+    callers should also clear it after steps that change state outside the
+    executor (other skills, the user).
+
+    The cache lives in a per-process in-memory database unless a path is
+    given; a file database is created readable by the owner only, since
+    command output may contain secrets. Cache errors are logged and never
+    fail the command being cached.
+    """
+
+    # Command prefixes considered free of side effects
+    CACHEABLE_PREFIXES = ("ls", "pwd", "echo", "git status", "cat", "which")
+
+    # Shell metacharacters that can redirect output or chain other commands
+    UNSAFE_CHARS = frozenset(";&|<>`$\n")
+
+    def __init__(self, db_path: Optional[str] = None, ttl: float = 30.0):
+        """
+        Initialize execution cache
+
+        Args:
+            db_path: SQLite database path, defaults to a private in-memory database
+            ttl: Seconds a cached result stays valid
+        """
+        self.db_path = db_path or ":memory:"
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            if self.db_path != ":memory:":
+                # Create the file with owner-only permissions before SQLite opens it
+                os.close(os.open(self.db_path, os.O_CREAT | os.O_WRONLY, 0o600))
+                os.chmod(self.db_path, 0o600)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS exec_cache ("
+                "key TEXT PRIMARY KEY, rc INT, stdout BLOB, stderr BLOB, ts REAL)"
+            )
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Exec cache disabled: {e}")
+            self._conn = None
+
+    def is_cacheable(self, command: str) -> bool:
+        """Check whether a command is read-only according to the allowlist"""
+        command = command.strip()
+        if any(ch in self.UNSAFE_CHARS for ch in command):
+            return False
+        return any(
+            command == prefix or command.startswith(prefix + " ")
+            for prefix in self.CACHEABLE_PREFIXES
+        )
+
+    @staticmethod
+    def _key(command: str, cwd: str) -> str:
+        env_subset = os.environ.get("PATH", "")
+        raw = f"{cwd}|{command.strip()}|{env_subset}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, command: str, cwd: str) -> Optional[ExecutionResult]:
+        """Return the cached result for a command, or None if missing or expired"""
+        if self._conn is None or not self.is_cacheable(command):
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT rc, stdout, stderr, ts FROM exec_cache WHERE key = ?",
+                    (self._key(command, cwd),)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Exec cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        rc, stdout, stderr, ts = row
+        if time.time() - ts > self.ttl:
+            return None
+        logger.info(f"Exec cache hit: {command}")
+        return ExecutionResult(
+            command=command,
+            returncode=rc,
+            stdout=stdout.decode("utf-8", errors="replace"),
+            stderr=stderr.decode("utf-8", errors="replace")
+        )
+
+    def record(self, command: str, cwd: str, result: ExecutionResult):
+        """
+        Record a freshly executed command
+
+        Successful cacheable commands are stored; anything not on the allowlist
+        may have changed state, so the whole cache is dropped.
+        """
+        if self._conn is None:
+            return
+        if not self.is_cacheable(command):
+            self.clear()
+            return
+        if result.returncode != 0:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM exec_cache WHERE ts < ?", (now - self.ttl,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO exec_cache (key, rc, stdout, stderr, ts) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        self._key(command, cwd),
+                        result.returncode,
+                        result.stdout.encode("utf-8"),
+                        result.stderr.encode("utf-8"),
+                        now,
+                    )
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Exec cache write failed: {e}")
+
+    def clear(self):
+        """Remove all cached results"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM exec_cache")
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Exec cache clear failed: {e}")
@@ -0,0 +1,200 @@
+"""Semantic Cache - reuse skill responses for near-identical prompts"""
+
+import copy
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from ..models.types import ExecutionResult, SkillResponse
+
+try:
+    import faiss
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    faiss = None
+    np = None
+    SentenceTransformer = None
+
+
+class SemanticCache:
+    """
+    Caches SkillResponse objects keyed by sentence embeddings of the prompt
+    
+    Prompts are embedded with a small local sentence-transformer and looked up
+    in a FAISS inner-product index over L2-normalized vectors, so the score is
+    the cosine similarity. A hit above the threshold returns the stored response
+    and lets the caller skip the LLM entirely. Entries expire after `ttl` seconds.
+    
+    Similar is not the same for commands: "delete a.txt" and "delete b.txt"
+    embed almost identically. A response that runs a command is therefore only
+    replayed for the exact same (whitespace-normalized) prompt; similarity
+    alone only replays responses without one. Responses whose commands are
+    not idempotent (rm, mv, curl -X POST) are never stored at all.
+    
+    The cache is disabled (every lookup misses) when faiss or
+    sentence-transformers is not installed.
+    """
+    
+    DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+    
+    # Separates the task from the previous step's state in make_key() prompts
+    STATE_SEPARATOR = "\n--- previous step ---\n"
+    
+    # Characters of the previous step's stdout that are part of the key
+    STDOUT_TAIL = 512
+    
+    # Commands that must never be replayed from cache, even for the exact same prompt
+    NON_IDEMPOTENT_PATTERN = re.compile(r"\b(rm|mv)\b|\bcurl\b.*(-X\s*|--request[\s=]+)POST\b", re.IGNORECASE)
+    
+    def __init__(self, threshold: float = 0.95, model_name: str = DEFAULT_MODEL, max_entries: int = 1000,
+                 ttl: float = 86400):
+        """
+        Initialize semantic cache
+        
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            model_name: sentence-transformers model used for embeddings
+            max_entries: Maximum number of cached responses
+            ttl: Seconds a cached response stays valid (default one day)
+        """
+        self.threshold = threshold
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.available = faiss is not None and SentenceTransformer is not None
+        self._model = None
+        self._index = None
+        self._responses: List[SkillResponse] = []
+        self._stored_at: List[float] = []
+        self._states: List[Optional[str]] = []
+        self._exact: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if not self.available:
+            logger.info("Semantic cache disabled: faiss or sentence-transformers not installed")
+    
+    @classmethod
+    def make_key(cls, task: str, last_result: Optional[ExecutionResult], iteration: int) -> str:
+        """
+        Build the prompt text a response is cached under
+        
+        The previous step's state is its command (whitespace collapsed), its
+        return code and the tail of its stdout, plus the iteration bucketed
+        (1, 2-3, 4-7, ...). The same command failing or printing something
+        else is a different state, and lookup() only matches entries stored
+        for exactly the same state.
+        """
+        if last_result is None:
+            state = f"#{iteration.bit_length()}"
+        else:
+            command = " ".join(last_result.command.split())
+            stdout_tail = (last_result.stdout or "")[-cls.STDOUT_TAIL:]
+            state = f"{command}\nexit {last_result.returncode}\n{stdout_tail}\n#{iteration.bit_length()}"
+        return f"{task}{cls.STATE_SEPARATOR}{state}"
+    
+    @classmethod
+    def _state_of(cls, text: str) -> Optional[str]:
+        """The previous-step part of a make_key() prompt, None for plain prompts"""
+        if cls.STATE_SEPARATOR not in text:
+            return None
+        return text.rpartition(cls.STATE_SEPARATOR)[2]
+    
+    def _embed(self, text: str):
+        """Embed text into a (1, dim) L2-normalized float32 matrix"""
+        if self._model is None:
+            self._model = SentenceTransformer(self.model_name)
+        vector = self._model.encode([text], normalize_embeddings=True)
+        return np.asarray(vector, dtype="float32")
+    
+    def lookup(self, text: str) -> Optional[SkillResponse]:
+        """
+        Find a cached response for a semantically similar prompt
+        
+        Args:
+            text: Prompt text
+            
+        Returns:
+            A copy of the cached SkillResponse, or None on miss
+        """
+        if not self.available:
+            return None
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return None
+            position = self._exact.get(self._normalize(text))
+            if position is not None:
+                if time.monotonic() - self._stored_at[position] > self.ttl:
+                    return None
+                logger.info("Semantic cache hit (exact prompt)")
+                return copy.copy(self._responses[position])
+            scores, indices = self._index.search(self._embed(text), 1)
+            position = int(indices[0, 0])
+            if scores[0, 0] < self.threshold or position < 0:
+                return None
+            if time.monotonic() - self._stored_at[position] > self.ttl:
+                return None
+            # Only the task may differ; the previous step must have ended the same way
+            if self._states[position] != self._state_of(text):
+                return None
+            # Commands act on the exact arguments in the prompt; never replay them for a merely similar one
+            if self._has_command(self._responses[position]):
+                return None
+            logger.info(f"Semantic cache hit (similarity {scores[0, 0]:.3f})")
+            return copy.copy(self._responses[position])
+    
+    def store(self, text: str, response: SkillResponse):
+        """
+        Store a response for the given prompt if it is safe to replay
+        
+        Args:
+            text: Prompt text
+            response: Response returned by the skill manager
+        """
+        if not self.available or not self.is_cacheable(response):
+            return
+        with self._lock:
+            vector = self._embed(text)
+            if self._index is None or self._index.ntotal >= self.max_entries:
+                self._index = faiss.IndexFlatIP(vector.shape[1])
+                self._responses = []
+                self._stored_at = []
+                self._states = []
+                self._exact = {}
+            self._exact[self._normalize(text)] = len(self._responses)
+            self._index.add(vector)
+            self._responses.append(copy.copy(response))
+            self._stored_at.append(time.monotonic())
+            self._states.append(self._state_of(text))
+    
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Collapse whitespace so formatting differences still count as the same prompt"""
+        return " ".join(text.split())
+    
+    @staticmethod
+    def _has_command(response) -> bool:
+        """Whether replaying the response would run a command"""
+        return bool(getattr(response, "command", "") or getattr(response, "parallel_commands", None))
+    
+    @classmethod
+    def is_cacheable(cls, response: SkillResponse) -> bool:
+        """Only cache responses that are safe and meaningful to replay"""
+        if response.is_dangerous or response.skill is None:
+            return False
+        commands = [response.command or "", *(response.parallel_commands or [])]
+        return not any(cls.NON_IDEMPOTENT_PATTERN.search(command) for command in commands)
+
+
+class SemanticTextCache(SemanticCache):
+    """
+    SemanticCache for plain text responses, such as generated hints
+    
+    Text has no side effects to replay, so any non-empty string is cached.
+    """
+    
+    @classmethod
+    def is_cacheable(cls, response: str) -> bool:
+        return bool(response)
@@ -87,13 +87,16 @@ def main():
             sys.exit(1)
         
         # 运行
-        if args.interactive or not args.task:
-            agent.run_interactive()
-        else:
-            context = agent.run(args.task)
-            # 返回非零退出码如果任务失败
-            if context.status.value == "failed":
-                sys.exit(1)
+        try:
+            if args.interactive or not args.task:
+                agent.run_interactive()
+            else:
+                context = agent.run(args.task)
+                # 返回非零退出码如果任务失败
+                if context.status.value == "failed":
+                    sys.exit(1)
+        finally:
+            agent.close()
 
 
 if __name__ == "__main__":
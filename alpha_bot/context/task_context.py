@@ -1,24 +1,36 @@
 from loguru import logger
 from dataclasses import dataclass, field
-from typing import Optional, List
-from ..models.types import TaskStatus, ExecutionResult
+from typing import ClassVar, Optional, List
+from ..models.types import SLOTS, TaskStatus, ExecutionResult
 from ..memory.bank import MemoryBank
 from ..memory.types import MemoryEntry
 
 
 
-@dataclass
+@dataclass(**SLOTS)
 class TaskContext:
     """任务上下文"""
+    # 保留的最近执行结果数量，更早的结果已经压缩进 memory_bank
+    MAX_HISTORY: ClassVar[int] = 20
+    
     task_description: str
     status: TaskStatus = TaskStatus.PENDING
     iteration: int = 0
     history: List[ExecutionResult] = field(default_factory=list)
     memory_bank: MemoryBank = field(default_factory=MemoryBank)
+    # 累计统计（history 被截断后依然准确）
+    step_count: int = 0
+    success_count: int = 0
     
     def add_result(self, result: ExecutionResult):
         """添加执行结果到历史"""
         self.history.append(result)
+        if len(self.history) > self.MAX_HISTORY:
+            # 原地删除，保证引用 history 的对象（如 SkillContext）看到同一个列表
+            del self.history[0]
+        self.step_count += 1
+        if result.success:
+            self.success_count += 1
         
         # Add to memory bank as well
         if result.skill_response:
@@ -29,11 +41,16 @@ class TaskContext:
                 thinking=result.skill_response.thinking,
                 command=result.skill_response.command,
                 result=result.get_output_for_llm(max_length=2000),  # Use truncated output to avoid memory bloat
-                step_number=len(self.history)
+                step_number=self.step_count
             )
             self.memory_bank.add_entry(memory_entry)
             logger.info(f"Memory Bank Status: {self.memory_bank.get_stats()}")
     
+    @property
+    def failure_count(self) -> int:
+        """累计失败的步骤数"""
+        return self.step_count - self.success_count
+    
     @property
     def last_result(self) -> Optional[ExecutionResult]:
         """获取最后一次执行结果"""
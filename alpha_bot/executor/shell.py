@@ -1,45 +1,152 @@
 """Shell 命令执行器"""
 
 import os
+import selectors
 import subprocess
-from typing import Optional
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
 
 from ..models.types import ExecutionResult
+from ..safety import DANGEROUS_PATTERNS, get_matcher
+
+# 输出超过保留上限时加在该输出开头的提示
+_TRUNCATED_MARKER = "...(前面的输出已截断)\n"
+# 命令成功但没有任何输出时 stdout 使用的文本
+NO_OUTPUT_TEXT = "成功执行命令"
+
+
+class _TailBuffer:
+    """只保留最后 limit 字节的输出缓冲"""
+    
+    __slots__ = ("limit", "chunks", "size", "truncated")
+    
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.chunks = deque()
+        self.size = 0
+        self.truncated = False
+    
+    def append(self, data: bytes):
+        self.chunks.append(data)
+        self.size += len(data)
+        # 去掉整块丢弃后仍超出上限的最早数据
+        while self.size - len(self.chunks[0]) >= self.limit:
+            self.size -= len(self.chunks.popleft())
+            self.truncated = True
+    
+    def getvalue(self) -> bytes:
+        data = b"".join(self.chunks)
+        if len(data) > self.limit:
+            self.truncated = True
+            data = data[-self.limit:]
+        return data
 
 
 class ShellExecutor:
     """Shell 命令执行器"""
     
     # 危险命令黑名单
-    DANGEROUS_PATTERNS = [
-        "rm -rf /",
-        "rm -rf /*",
-        "mkfs",
-        "dd if=",
-        ":(){:|:&};:",
-        "> /dev/sda",
-        "chmod -R 777 /",
-        "chown -R",
-    ]
+    DANGEROUS_PATTERNS = list(DANGEROUS_PATTERNS)
+    
+    # 每次从管道读取的最大字节数和保留的输出上限（字节）
+    # 单次读取取大一些，输出很多的命令也只需要很少的系统调用
+    STREAM_CHUNK_SIZE = 64 * 1024
+    STREAM_MAX_OUTPUT = 64 * 1024
+    
+    # 批量执行时的最大并发数
+    BATCH_MAX_WORKERS = 8
     
     def __init__(self, working_dir: Optional[str] = None, timeout: int = 60):
         self.working_dir = working_dir or os.getcwd()
         self.timeout = timeout
+        # 子进程环境变量只在创建时复制一次，每条命令直接复用
+        self._env = {**os.environ, "LANG": "en_US.UTF-8"}
+    
+    def update_env(self, key: str, value: str):
+        """设置之后执行的命令使用的环境变量"""
+        self._env[key] = value
     
     def is_dangerous(self, command: str) -> bool:
         """检查命令是否危险"""
-        command_lower = command.lower().strip()
-        for pattern in self.DANGEROUS_PATTERNS:
-            if pattern.lower() in command_lower:
-                return True
-        return False
+        return get_matcher(tuple(self.DANGEROUS_PATTERNS)).is_dangerous(command)
     
     def execute(self, command: str, timeout: Optional[int] = None) -> ExecutionResult:
         """
         执行 shell 命令
         
+        与 execute_streaming 共用同一套管道读取逻辑，只是不回调输出。
+        
+        Args:
+            command: 要执行的命令
+            timeout: 超时时间（秒），默认使用实例配置
+            
+        Returns:
+            ExecutionResult: 执行结果
+        """
+        return self.execute_streaming(command, on_chunk=None, timeout=timeout)
+    
+    def _execute_blocking(self, command: str, timeout: int) -> ExecutionResult:
+        """一次性执行命令并收集全部输出（Windows 下 selectors 不支持管道时使用）"""
+        try:
+            result = subprocess.run(
+                command,
+                shell=True,
+                cwd=self.working_dir,
+                capture_output=True,
+                timeout=timeout,
+                env=self._env
+            )
+            # 以字节形式捕获，只解码最后 STREAM_MAX_OUTPUT 字节
+            limit = self.STREAM_MAX_OUTPUT
+            stdout_truncated = len(result.stdout) > limit
+            stderr_truncated = len(result.stderr) > limit
+            stdout = self._decode_tail(result.stdout[-limit:], stdout_truncated)
+            stderr = self._decode_tail(result.stderr[-limit:], stderr_truncated)
+            # 只在丢失了数据的那个输出前标明截断
+            if stdout_truncated:
+                stdout = _TRUNCATED_MARKER + stdout
+            if stderr_truncated:
+                stderr = _TRUNCATED_MARKER + stderr
+            return ExecutionResult(
+                command=command,
+                returncode=result.returncode,
+                stdout=stdout if stdout else NO_OUTPUT_TEXT,
+                stderr=stderr
+            )
+        except subprocess.TimeoutExpired:
+            return ExecutionResult(
+                command=command,
+                returncode=-1,
+                stdout="",
+                stderr=f"命令执行超时 (>{timeout}秒)"
+            )
+        except Exception as e:
+            return ExecutionResult(
+                command=command,
+                returncode=-1,
+                stdout="",
+                stderr=f"执行错误: {str(e)}"
+            )
+    
+    def execute_streaming(
+        self,
+        command: str,
+        on_chunk: Optional[Callable[[bytes], None]],
+        timeout: Optional[int] = None
+    ) -> ExecutionResult:
+        """
+        执行 shell 命令，并在输出产生时逐块回调
+        
+        只在内存中保留最后 STREAM_MAX_OUTPUT 字节的原始输出，
+        命令结束后只解码保留下来的这部分，长时间运行或输出很大的命令
+        不会阻塞界面，也不会占用大量内存和解码时间。
+        
         Args:
             command: 要执行的命令
+            on_chunk: 输出回调，接收每次读取到的原始字节（由调用方按需解码）；
+                为 None 时不回调
             timeout: 超时时间（秒），默认使用实例配置
             
         Returns:
@@ -56,23 +163,65 @@ class ShellExecutor:
                 stderr="拒绝执行: 检测到潜在危险命令"
             )
         
+        # Windows 下 selectors 不支持管道，回退到一次性执行
+        if os.name == "nt":
+            return self._execute_blocking(command, timeout)
+        
         try:
-            result = subprocess.run(
+            # 直接用 os.read 读管道的文件描述符，不经过 Python 的缓冲层
+            process = subprocess.Popen(
                 command,
                 shell=True,
                 cwd=self.working_dir,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                env={**os.environ, "LANG": "en_US.UTF-8"}
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=0,
+                env=self._env
             )
+        except Exception as e:
             return ExecutionResult(
                 command=command,
-                returncode=result.returncode,
-                stdout=result.stdout if result.stdout else "成功执行命令",
-                stderr=result.stderr
+                returncode=-1,
+                stdout="",
+                stderr=f"执行错误: {str(e)}"
             )
+        
+        streams = {
+            process.stdout: _TailBuffer(self.STREAM_MAX_OUTPUT),
+            process.stderr: _TailBuffer(self.STREAM_MAX_OUTPUT),
+        }
+        deadline = time.monotonic() + timeout
+        
+        try:
+            with selectors.DefaultSelector() as selector:
+                for pipe in streams:
+                    selector.register(pipe, selectors.EVENT_READ)
+                
+                while selector.get_map():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        process.kill()
+                        process.wait()
+                        return ExecutionResult(
+                            command=command,
+                            returncode=-1,
+                            stdout="",
+                            stderr=f"命令执行超时 (>{timeout}秒)"
+                        )
+                    
+                    for key, _ in selector.select(timeout=remaining):
+                        data = os.read(key.fd, self.STREAM_CHUNK_SIZE)
+                        if not data:
+                            selector.unregister(key.fileobj)
+                            continue
+                        streams[key.fileobj].append(data)
+                        if on_chunk is not None:
+                            on_chunk(data)
+            
+            returncode = process.wait(timeout=max(0.0, deadline - time.monotonic()))
         except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
             return ExecutionResult(
                 command=command,
                 returncode=-1,
@@ -80,12 +229,70 @@ class ShellExecutor:
                 stderr=f"命令执行超时 (>{timeout}秒)"
             )
         except Exception as e:
+            process.kill()
+            process.wait()
             return ExecutionResult(
                 command=command,
                 returncode=-1,
                 stdout="",
                 stderr=f"执行错误: {str(e)}"
             )
+        except BaseException:
+            # Ctrl+C 等中断：先结束并回收子进程，再继续向上抛出
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+        
+        stdout_buffer, stderr_buffer = streams[process.stdout], streams[process.stderr]
+        # getvalue() 可能再截掉一段，之后才能读 truncated
+        stdout_data, stderr_data = stdout_buffer.getvalue(), stderr_buffer.getvalue()
+        stdout = self._decode_tail(stdout_data, stdout_buffer.truncated)
+        stderr = self._decode_tail(stderr_data, stderr_buffer.truncated)
+        # 只在丢失了数据的那个输出前标明截断
+        if stdout_buffer.truncated:
+            stdout = _TRUNCATED_MARKER + stdout
+        if stderr_buffer.truncated:
+            stderr = _TRUNCATED_MARKER + stderr
+        
+        return ExecutionResult(
+            command=command,
+            returncode=returncode,
+            stdout=stdout if stdout else NO_OUTPUT_TEXT,
+            stderr=stderr
+        )
+    
+    @staticmethod
+    def _decode_tail(data: bytes, truncated: bool) -> str:
+        """解码保留的输出；被截断时跳过开头不完整的 UTF-8 字符"""
+        if truncated:
+            start = 0
+            while start < min(len(data), 3) and 0x80 <= data[start] < 0xC0:
+                start += 1
+            data = data[start:]
+        return data.decode("utf-8", errors="replace")
+    
+    def execute_batch(self, commands: List[str], timeout: Optional[int] = None) -> List[ExecutionResult]:
+        """
+        并发执行多条互相独立的命令
+        
+        各命令的等待时间（磁盘、网络 I/O）相互重叠，总耗时约等于最慢的一条。
+        
+        Args:
+            commands: 要执行的命令列表
+            timeout: 每条命令的超时时间（秒），默认使用实例配置
+            
+        Returns:
+            List[ExecutionResult]: 与 commands 顺序一致的执行结果
+        """
+        if len(commands) <= 1:
+            return [self.execute(command, timeout) for command in commands]
+        
+        workers = min(len(commands), self.BATCH_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda command: self.execute(command, timeout), commands))
     
     def change_directory(self, path: str) -> bool:
         """更改工作目录"""
@@ -2,5 +2,8 @@
 
 from .base import BaseLLMClient
 from .openai_client import OpenAIClient
+from .openai_async import AsyncOpenAIClient
+from .batcher import LLMBatcher
+from .cache import LLMResponseCache
 
-__all__ = ["BaseLLMClient", "OpenAIClient"]
+__all__ = ["BaseLLMClient", "OpenAIClient", "AsyncOpenAIClient", "LLMBatcher", "LLMResponseCache"]
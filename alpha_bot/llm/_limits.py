@@ -0,0 +1,72 @@
+"""LLM 请求限速"""
+
+import asyncio
+import os
+import time
+import weakref
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    异步请求的令牌桶限速 + 并发上限
+
+    令牌以 rpm / 60 个每秒的速度补充，桶容量为 rpm，短时间的突发请求可以
+    直接通过，持续请求则被平滑到每分钟 rpm 个，而不是先一起发出、
+    再因为 429 退避重试。同时进行的请求数不超过 max_inflight。
+
+    用法：`async with limiter:` 包住一次请求；重试前调用 `await limiter.wait()`
+    再取一个令牌。令牌桶在所有事件循环间共享；信号量在每个运行中的事件循环里
+    首次使用时创建（Python 3.10 以前 asyncio.Semaphore 会绑定创建时的循环），
+    因此同一个限速器可以跨多次 asyncio.run 使用。
+    """
+
+    def __init__(self, rpm: Optional[float] = None, max_inflight: int = 8):
+        """
+        Args:
+            rpm: 每分钟最多发起的请求数，默认读取 OPENAI_RPM 环境变量，0 或未设置时不限速
+            max_inflight: 同时进行的最大请求数
+        """
+        if rpm is None:
+            rpm = float(os.getenv("OPENAI_RPM", "0") or 0)
+        self.rpm = rpm
+        self.max_inflight = max_inflight
+        self._rate = rpm / 60.0
+        self._tokens = float(rpm)
+        self._updated_at = time.monotonic()
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """当前事件循环的并发信号量，首次使用时创建"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_inflight)
+        return semaphore
+
+    async def wait(self):
+        """等待一个令牌（不限速时立即返回）"""
+        if self._rate <= 0:
+            return
+        now = time.monotonic()
+        self._tokens = min(self.rpm, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+        # 令牌不足时预支一个，余额变为负数，之后的请求依次排在后面
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._rate)
+
+    async def __aenter__(self):
+        semaphore = self._semaphore()
+        await semaphore.acquire()
+        try:
+            await self.wait()
+        except BaseException:
+            semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore().release()
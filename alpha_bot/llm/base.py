@@ -1,6 +1,8 @@
 """LLM 客户端基类"""
 
+import hashlib
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Optional, List, Callable
 
 from ..models.types import LLMResponse, ExecutionResult, Message
@@ -12,6 +14,33 @@ class BaseLLMClient(ABC):
     def __init__(self):
         pass
     
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def prompt_cache_key(prefix: str) -> str:
+        """
+        生成稳定的提示词前缀缓存 key
+        
+        相同的静态前缀（系统提示词）总是得到相同的 key，
+        便于服务端复用前缀的 KV 缓存。系统提示词数量有限，结果按前缀缓存。
+        """
+        return hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:32]
+    
     @abstractmethod
     def generate(self, system_prompt: str, user_prompt: str, stream_callback: Optional[Callable[[str], None]] = None, response_class=None):
         pass
+    
+    def batch_generate(self, system_prompt: str, user_inputs: List[str], response_class=None) -> list:
+        """
+        对多个互相独立的输入分别生成响应
+        
+        默认逐个调用 generate，子类可以改为并发请求。
+        
+        Args:
+            system_prompt: 所有请求共用的系统提示词
+            user_inputs: 用户输入列表
+            response_class: 响应类，用于直接解析JSON到指定类型
+            
+        Returns:
+            与 user_inputs 顺序一致的响应列表
+        """
+        return [self.generate(system_prompt, user_input, response_class=response_class) for user_input in user_inputs]
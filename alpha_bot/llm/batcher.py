@@ -0,0 +1,55 @@
+"""LLM 请求合并"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class LLMBatcher:
+    """
+    合并并发的相同 LLM 请求
+
+    Chat Completions 接口不支持把不同的提示词放进一次调用，
+    所以这里只合并完全相同的请求：多个会话（例如 Web 模式）
+    同时发出同一个请求时，只有第一个真正调用 API，其余等待并共享结果。
+    请求结束后立即移除，不做结果缓存。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def submit(self, key: str, call: Callable[[], T]) -> T:
+        """
+        执行请求，若相同 key 的请求正在进行则等待它的结果
+
+        Args:
+            key: 请求的唯一标识（模型 + 消息 + 参数的哈希）
+            call: 实际发起请求的函数
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = call()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+# 进程内共享，所有客户端实例的相同请求都能合并
+default_batcher = LLMBatcher()
@@ -0,0 +1,142 @@
+"""LLM 响应缓存"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from ..models.types import LLMResponse
+from .base import BaseLLMClient
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+
+class LLMResponseCache(BaseLLMClient):
+    """
+    按提示词缓存 LLM 响应的客户端包装
+
+    key 为 sha256(系统提示词 + 用户输入 + 模型)，提示词完全相同时直接返回
+    上次的响应文本，不再请求 API。适合提示词只由输入数据决定的后台任务
+    （例如提示生成），重复运行时网络请求变成本地查询。
+
+    安装了 diskcache 时缓存写在磁盘上，跨进程共享；否则退化为进程内缓存。
+    流式输出和指定 response_class 的调用不缓存，直接交给底层客户端。
+    其他属性（model、client 等）都转发给底层客户端。
+    """
+
+    DEFAULT_DIRECTORY = os.path.join("~", ".cache", "alpha_bot", "hints")
+
+    def __init__(self, llm: BaseLLMClient, directory: Optional[str] = None, ttl: float = 7 * 24 * 3600):
+        """
+        Args:
+            llm: 被包装的客户端
+            directory: diskcache 目录，默认 ~/.cache/alpha_bot/hints
+            ttl: 缓存有效期（秒），默认 7 天
+        """
+        super().__init__()
+        self.llm = llm
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Tuple[float, str]] = {}
+        self._disk = None
+        if diskcache is not None:
+            try:
+                self._disk = diskcache.Cache(os.path.expanduser(directory or self.DEFAULT_DIRECTORY))
+            except Exception as e:
+                logger.warning(f"无法打开 LLM 响应磁盘缓存，改用内存缓存: {e}")
+
+    def __getattr__(self, name):
+        # 只在自身没有该属性时调用，转发给底层客户端
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def key(self, system_prompt: str, user_input: str) -> str:
+        """生成缓存 key"""
+        raw = json.dumps({"sys": system_prompt, "usr": user_input, "model": self.llm.model}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """读取未过期的响应文本"""
+        if self._disk is not None:
+            return self._disk.get(key)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._memory[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, text: str):
+        """写入响应文本"""
+        if self._disk is not None:
+            self._disk.set(key, text, expire=self.ttl)
+            return
+        with self._lock:
+            self._memory[key] = (time.monotonic() + self.ttl, text)
+
+    def generate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        response_class=None
+    ):
+        if stream_callback is not None or response_class is not None:
+            return self.llm.generate(system_prompt, user_input, stream_callback, response_class)
+
+        key = self.key(system_prompt, user_input)
+        text = self.get(key)
+        if text is not None:
+            self.hits += 1
+            return LLMResponse.from_json(text)
+
+        self.misses += 1
+        response = self.llm.generate(system_prompt, user_input)
+        # 空响应不缓存，下次重新请求
+        if response is not None and response.raw_json:
+            self.set(key, response.raw_json)
+        return response
+
+    def batch_generate(self, system_prompt: str, user_inputs: List[str], response_class=None) -> list:
+        """命中缓存的输入直接返回，其余交给底层客户端一次批量生成"""
+        if response_class is not None:
+            return self.llm.batch_generate(system_prompt, user_inputs, response_class)
+
+        keys = [self.key(system_prompt, user_input) for user_input in user_inputs]
+        results: list = [None] * len(user_inputs)
+        missing = []
+        for i, key in enumerate(keys):
+            text = self.get(key)
+            if text is not None:
+                self.hits += 1
+                results[i] = LLMResponse.from_json(text)
+            else:
+                self.misses += 1
+                missing.append(i)
+
+        if missing:
+            responses = self.llm.batch_generate(system_prompt, [user_inputs[i] for i in missing])
+            for i, response in zip(missing, responses):
+                results[i] = response
+                if response is not None and response.raw_json:
+                    self.set(keys[i], response.raw_json)
+        return results
+
+    def clear(self):
+        """清空缓存"""
+        if self._disk is not None:
+            self._disk.clear()
+        with self._lock:
+            self._memory.clear()
@@ -0,0 +1,127 @@
+"""OpenAI LLM 异步客户端"""
+
+import asyncio
+import os
+import random
+from typing import Optional, List, Callable
+
+from loguru import logger
+from openai import (
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from ._limits import RateLimiter
+from .openai_client import OpenAIClient
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+
+class AsyncOpenAIClient(OpenAIClient):
+    """
+    OpenAI API 异步客户端
+    
+    在 OpenAIClient 的基础上提供 agenerate / abatch_generate，
+    多个请求可以在同一个事件循环中同时进行，不必为每个请求占用一个线程。
+    所有异步请求共用一个 RateLimiter：并发数不超过 max_concurrency，
+    发起速度不超过 OPENAI_RPM；限流、超时、连接错误和 5xx 会带随机抖动地退避重试。
+    同步的 generate 等接口继承自 OpenAIClient，行为不变。
+    """
+    
+    # 同时进行的最大异步请求数
+    MAX_CONCURRENCY = 8
+    
+    # 值得退避重试的临时错误
+    RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        prompt_cache: Optional[bool] = None,
+        tool_calling: Optional[bool] = None,
+        max_concurrency: Optional[int] = None,
+        rpm: Optional[float] = None,
+        retries: int = 3
+    ):
+        super().__init__(api_key=api_key, base_url=base_url, model=model, prompt_cache=prompt_cache, tool_calling=tool_calling)
+        self.aclient = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url or os.getenv("OPENAI_API_BASE"),
+            http_client=DefaultAsyncHttpxClient(http2=h2 is not None)
+        )
+        self.max_concurrency = max_concurrency or self.MAX_CONCURRENCY
+        self.retries = retries
+        self.limiter = RateLimiter(rpm=rpm, max_inflight=self.max_concurrency)
+    
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_input: str,
+        stream_callback: Optional[Callable[[str], None]] = None,
+        response_class=None
+    ):
+        """
+        异步生成响应，参数和返回值与 generate 相同
+        
+        Args:
+            system_prompt: 系统提示词
+            user_input: 用户输入
+            stream_callback: 流式输出回调函数，接收每个 token
+            response_class: 响应类，用于直接解析JSON到指定类型
+        """
+        request = self._build_request(self._build_messages(system_prompt, user_input), response_class)
+        
+        async with self.limiter:
+            if stream_callback:
+                stream = await self._acreate(request, stream=True)
+                tokens = []
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    token = self._delta_text(chunk.choices[0].delta)
+                    if token:
+                        tokens.append(token)
+                        stream_callback(token)
+                response_text = "".join(tokens)
+            else:
+                response = await self._acreate(request)
+                response_text = self._message_text(response.choices[0].message)
+        
+        return self._parse_response(response_text, response_class)
+    
+    async def _acreate(self, request: dict, **kwargs):
+        """发起请求，临时错误按带抖动的指数退避重试（调用方已持有 limiter）"""
+        for attempt in range(self.retries + 1):
+            try:
+                return await self.aclient.chat.completions.create(**request, **kwargs)
+            except self.RETRYABLE_ERRORS as e:
+                if attempt == self.retries:
+                    raise
+                delay = min(2 ** attempt, 30) * (0.5 + random.random())
+                logger.debug("LLM 请求失败 ({})，{:.1f} 秒后重试", type(e).__name__, delay)
+                await asyncio.sleep(delay)
+                await self.limiter.wait()
+    
+    async def abatch_generate(self, system_prompt: str, user_inputs: List[str], response_class=None) -> list:
+        """
+        异步地对多个互相独立的输入生成响应
+        
+        并发数和请求速度由共用的 limiter 控制，结果与 user_inputs 顺序一致。
+        """
+        return list(await asyncio.gather(*(
+            self.agenerate(system_prompt, user_input, response_class=response_class)
+            for user_input in user_inputs
+        )))
+    
+    async def aclose(self):
+        """关闭异步 HTTP 连接"""
+        await self.aclient.close()
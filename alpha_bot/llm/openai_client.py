@@ -2,29 +2,126 @@
 
 import os
 import json
+import hashlib
+import threading
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
 from typing import Optional, List, Callable
 from loguru import logger
-from openai import OpenAI
+from openai import OpenAI, DefaultHttpxClient
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .base import BaseLLMClient
+from .batcher import default_batcher
 from ..models.types import LLMResponse, ExecutionResult, Message
 
 
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def shared_http_client() -> DefaultHttpxClient:
+    """
+    获取进程内共享的 HTTP 客户端
+    
+    各个技能都会创建自己的 OpenAIClient，共用一个连接池后
+    后续请求可以复用已经建立好的 TCP/TLS 连接；安装了 h2 时启用 HTTP/2。
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = DefaultHttpxClient(http2=h2 is not None)
+    return _http_client
+
+
+# Python 类型到 JSON Schema 类型的映射
+_SCHEMA_TYPES = {str: "string", bool: "boolean", int: "integer", float: "number", list: "array", dict: "object"}
+
+# 工具调用模式下使用的函数名
+TOOL_NAME = "respond"
+
+
+@lru_cache(maxsize=None)
+def tool_schema(response_class) -> Optional[dict]:
+    """
+    根据响应数据类的字段生成函数参数的 JSON Schema
+    
+    不是数据类，或者字段类型无法映射时返回 None（回退到 JSON 对象模式）。
+    """
+    if not is_dataclass(response_class):
+        return None
+    hints = typing.get_type_hints(response_class)
+    properties = {}
+    for f in fields(response_class):
+        if not f.init:
+            continue
+        annotation = hints.get(f.name)
+        origin = typing.get_origin(annotation) or annotation
+        if origin is typing.Union:
+            # Optional[X] 取其中的非 None 类型
+            args = [a for a in typing.get_args(annotation) if a is not type(None)]
+            origin = (typing.get_origin(args[0]) or args[0]) if len(args) == 1 else None
+        json_type = _SCHEMA_TYPES.get(origin)
+        if json_type is None:
+            return None
+        prop = {"type": json_type}
+        if json_type == "array":
+            item_args = typing.get_args(annotation)
+            item_type = _SCHEMA_TYPES.get(typing.get_origin(item_args[0]) or item_args[0]) if item_args else None
+            if item_type:
+                prop["items"] = {"type": item_type}
+        properties[f.name] = prop
+    return {"type": "object", "properties": properties}
+
+
 class OpenAIClient(BaseLLMClient):
     """OpenAI API 客户端"""
     
+    # batch_generate 同时进行的最大请求数
+    BATCH_MAX_WORKERS = 8
+    
+    # 最多缓存的系统消息数
+    MAX_SYSTEM_MESSAGES = 32
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        prompt_cache: Optional[bool] = None,
+        tool_calling: Optional[bool] = None
     ):
         super().__init__()
+        base_url = base_url or os.getenv("OPENAI_API_BASE")
         self.client = OpenAI(
             api_key=api_key or os.getenv("OPENAI_API_KEY"),
-            base_url=base_url or os.getenv("OPENAI_API_BASE")
+            base_url=base_url,
+            http_client=shared_http_client()
         )
         self.model = model or os.getenv("MODEL_NAME", "gpt-4")
+        # 提示词前缀缓存：默认只对官方 API 开启，兼容接口可能不认识 prompt_cache_key
+        if prompt_cache is None:
+            prompt_cache = os.getenv("OPENAI_PROMPT_CACHE", "false" if base_url else "true").lower() == "true"
+        self.prompt_cache = prompt_cache
+        # 工具调用模式：结构化响应通过强制的函数调用返回，参数由服务端按 Schema 约束。
+        # 不是所有兼容接口都支持 tools，默认关闭
+        if tool_calling is None:
+            tool_calling = os.getenv("OPENAI_TOOL_CALLING", "false").lower() == "true"
+        self.tool_calling = tool_calling
+        # 系统提示词 -> 系统消息，技能的系统提示词基本是固定的常量
+        self._system_messages = {}
     
     def generate(
         self,
@@ -43,11 +140,7 @@ class OpenAIClient(BaseLLMClient):
             history: 历史执行结果列表
             response_class: 响应类，用于直接解析JSON到指定类型
         """
-        # 构建 messages from scratch for each call
-        messages = [
-            Message(role="system", content=system_prompt),
-            Message(role="user", content=user_input)    
-        ]
+        messages = self._build_messages(system_prompt, user_input)
         
         # 调用 API - 使用流式输出
         if stream_callback:
@@ -55,11 +148,16 @@ class OpenAIClient(BaseLLMClient):
         else:
             response_text = self._generate_without_stream(messages, response_class)
         
+        return self._parse_response(response_text, response_class)
+    
+    @staticmethod
+    def _parse_response(response_text: str, response_class=None):
+        """把响应文本解析为 response_class 对象，未指定时返回 LLMResponse"""
         # 如果指定了响应类，则直接解析并返回对象
         if response_class is not None:
-            import json
             try:
-                parsed_data = json.loads(response_text)
+                # orjson 解析更快，其 JSONDecodeError 是 json.JSONDecodeError 的子类
+                parsed_data = orjson.loads(response_text) if orjson is not None else json.loads(response_text)
                 # Handle both dict instantiation and from_dict/from_json methods
                 if hasattr(response_class, 'from_dict'):
                     return response_class.from_dict(parsed_data)
@@ -78,32 +176,104 @@ class OpenAIClient(BaseLLMClient):
         # 否则返回原始的 LLMResponse
         return LLMResponse.from_json(response_text)
     
-    def _generate_with_stream(self, messages, callback: Callable[[str], None], response_class) -> str:
-        """使用流式输出生成响应"""
-        stream = self.client.chat.completions.create(
+    def batch_generate(self, system_prompt: str, user_inputs: List[str], response_class=None) -> list:
+        """
+        并发地对多个互相独立的输入生成响应
+        
+        Chat Completions 接口一次只能处理一组消息，这里用线程池同时发出请求，
+        共用同一个 OpenAI 客户端的连接池，总耗时接近最慢的一次请求而不是所有请求之和。
+        结果与 user_inputs 顺序一致。
+        """
+        if len(user_inputs) <= 1:
+            return super().batch_generate(system_prompt, user_inputs, response_class)
+        
+        workers = min(len(user_inputs), self.BATCH_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(
+                lambda user_input: self.generate(system_prompt, user_input, response_class=response_class),
+                user_inputs
+            ))
+    
+    def cache_options(self, system_prompt: str) -> Optional[dict]:
+        """构建提示词前缀缓存参数（以系统提示词作为静态前缀）"""
+        if not self.prompt_cache:
+            return None
+        return {"prompt_cache_key": self.prompt_cache_key(system_prompt)}
+    
+    def _build_messages(self, system_prompt: str, user_input: str) -> List[dict]:
+        """
+        构建 API 所需的消息列表
+        
+        系统消息始终放在第一条，并且同一个系统提示词复用同一个字典，
+        请求之间的前缀保持完全一致，便于命中服务端的提示词前缀缓存。
+        """
+        system_message = self._system_messages.get(system_prompt)
+        if system_message is None:
+            # 个别技能会把动态内容拼进系统提示词，超过上限时清空，避免无限增长
+            if len(self._system_messages) >= self.MAX_SYSTEM_MESSAGES:
+                self._system_messages.clear()
+            system_message = self._system_messages[system_prompt] = {"role": "system", "content": system_prompt}
+        return [system_message, {"role": "user", "content": user_input}]
+    
+    def _build_request(self, messages, response_class) -> dict:
+        """构建 chat.completions.create 的请求参数"""
+        request = dict(
             model=self.model,
-            messages=[{"role": m.role, "content": m.content} for m in messages],
+            messages=messages,
             temperature=0.1,
             response_format={"type": "json_object"} if response_class else None,
-            stream=True
+            extra_body=self.cache_options(messages[0]["content"])
         )
+        schema = tool_schema(response_class) if self.tool_calling and response_class is not None else None
+        if schema is not None:
+            del request["response_format"]
+            request["tools"] = [{"type": "function", "function": {"name": TOOL_NAME, "parameters": schema}}]
+            request["tool_choice"] = {"type": "function", "function": {"name": TOOL_NAME}}
+        return request
+    
+    @staticmethod
+    def _message_text(message) -> str:
+        """取出响应文本，工具调用时为函数参数的 JSON"""
+        if message.tool_calls:
+            return message.tool_calls[0].function.arguments
+        return message.content
+    
+    @staticmethod
+    def _delta_text(delta) -> Optional[str]:
+        """取出流式响应块中的文本，工具调用时为函数参数的 JSON 片段"""
+        if delta.content:
+            return delta.content
+        tool_calls = getattr(delta, "tool_calls", None)
+        if tool_calls and tool_calls[0].function is not None:
+            return tool_calls[0].function.arguments
+        return None
+    
+    def _generate_with_stream(self, messages, callback: Callable[[str], None], response_class) -> str:
+        """使用流式输出生成响应"""
+        stream = self.client.chat.completions.create(**self._build_request(messages, response_class), stream=True)
         
-        full_response = ""
+        # 收集到列表中最后一次拼接，避免逐 token 拼接字符串
+        tokens = []
         for chunk in stream:
-            if chunk.choices[0].delta.content:
-                token = chunk.choices[0].delta.content
-                full_response += token
+            if not chunk.choices:
+                continue
+            token = self._delta_text(chunk.choices[0].delta)
+            if token:
+                tokens.append(token)
                 callback(token)
         
-        return full_response
+        return "".join(tokens)
     
     def _generate_without_stream(self, messages, response_class) -> str:
-        """不使用流式输出生成响应"""
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": m.role, "content": m.content} for m in messages],
-            temperature=0.1,
-            response_format={"type": "json_object"} if response_class else None
-        )
-        return response.choices[0].message.content
+        """不使用流式输出生成响应（并发的相同请求合并为一次调用）"""
+        request = self._build_request(messages, response_class)
+        key = hashlib.sha256(
+            json.dumps([str(self.client.base_url), request], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        
+        def call() -> str:
+            response = self.client.chat.completions.create(**request)
+            return self._message_text(response.choices[0].message)
+        
+        return default_batcher.submit(key, call)
     
\ No newline at end of file
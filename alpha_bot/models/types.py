@@ -1,11 +1,27 @@
 """数据模型定义"""
 
+import re
+import sys
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from enum import Enum
 
 if TYPE_CHECKING:
     from ..skills.base_skill import BaseSkill
+    from ..memory.bank import MemoryBank
+
+
+# Python 3.10+ 上为高频创建的数据类生成 __slots__，去掉实例 __dict__
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# 终端颜色/光标控制序列（CSI），对 LLM 没有意义，只会浪费 token
+_ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
+
+
+# SkillResponse.flags 的位定义
+FLAG_COMPLETE = 1 << 0
+FLAG_DANGEROUS = 1 << 1
+FLAG_DIRECT_RESPONSE = 1 << 2
 
 
 class TaskStatus(Enum):
@@ -26,7 +42,7 @@ class SkillSelectResponse:
 
 
 # Define dataclasses for LLM responses based on prompt schemas
-@dataclass
+@dataclass(**SLOTS)
 class CommandSkillResponse:
     """Dataclass for CommandSkill LLM response - matches the JSON schema expected by the prompt"""
     thinking: str = ""
@@ -37,14 +53,19 @@ class CommandSkillResponse:
     is_dangerous: bool = False
     danger_reason: str = ""
     direct_response: str = ""  # For AI processing mode
+    parallel_commands: List[str] = None  # Independent commands that can run concurrently
 
-@dataclass
+    def __post_init__(self):
+        if self.parallel_commands is None:
+            self.parallel_commands = []
+
+@dataclass(**SLOTS)
 class DirectLLMSkillResponse:
     """Dataclass for DirectLLMSkill LLM response - matches the JSON schema expected by the prompt"""
     thinking: str = ""
     direct_response: str = ""
 
-@dataclass
+@dataclass(**SLOTS)
 class PPTSkillResponse:
     """Dataclass for PPTSkill LLM response - matches the JSON schema expected by the prompt"""
     title: str = ""
@@ -54,7 +75,7 @@ class PPTSkillResponse:
         if self.outline is None:
             self.outline = []
 
-@dataclass
+@dataclass(**SLOTS)
 class BrowserSkillResponse:
     """Dataclass for BrowserSkill LLM response - matches the JSON schema expected by the prompt"""
     thinking: str = ""
@@ -72,6 +93,7 @@ class SkillExecutionResponse:
     is_dangerous: bool = False  # Safety flag
     danger_reason: str = ""  # Danger explanation
     error_analysis: str = ""  # Error analysis if previous command failed
+    parallel_commands: List[str] = None  # Independent commands to run concurrently
     
     # Direct response fields (for LLM/content processing skills)
     direct_response: str = ""  # Direct content output
@@ -85,6 +107,8 @@ class SkillExecutionResponse:
     service_status: str = ""  # Status of service interaction
 
     def __post_init__(self):
+        if self.parallel_commands is None:
+            self.parallel_commands = []
         if self.generated_files is None:
             self.generated_files = []
         if self.file_metadata is None:
@@ -100,11 +124,23 @@ class SkillResponse(SkillSelectResponse, SkillExecutionResponse):
     
     This replaces the old LLMResponse and provides a common interface
     for all skill types.
+    
+    flags packs task_complete, is_dangerous and the presence of a direct
+    response into one int (FLAG_* bits) so the agent loop can test them
+    with a single attribute load. It is computed at construction time.
     """
-    pass
+    flags: int = field(default=0, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        super().__post_init__()
+        self.flags = (
+            (FLAG_COMPLETE if self.task_complete else 0)
+            | (FLAG_DANGEROUS if self.is_dangerous else 0)
+            | (FLAG_DIRECT_RESPONSE if self.direct_response else 0)
+        )
 
 
-@dataclass
+@dataclass(**SLOTS)
 class ExecutionResult:
     """命令执行结果"""
     command: str
@@ -112,6 +148,11 @@ class ExecutionResult:
     stdout: str
     stderr: str
     skill_response: Optional[SkillResponse] = None
+    # 合并输出和去除控制序列后的输出只计算一次
+    _output: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _llm_output: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    # 渲染好的历史步骤文本（由 skills.utils.format_one_step_message 填充）
+    _step_message: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     @property
     def success(self) -> bool:
@@ -120,12 +161,14 @@ class ExecutionResult:
     @property
     def output(self) -> str:
         """获取合并的输出"""
-        parts = []
-        if self.stdout:
-            parts.append(self.stdout)
-        if self.stderr:
-            parts.append(f"[stderr] {self.stderr}")
-        return "\n".join(parts) if parts else "(无输出)"
+        if self._output is None:
+            parts = []
+            if self.stdout:
+                parts.append(self.stdout)
+            if self.stderr:
+                parts.append(f"[stderr] {self.stderr}")
+            self._output = "\n".join(parts) if parts else "(无输出)"
+        return self._output
     
     def truncated_output(self, max_length: int = 2000) -> str:
         """获取截断的输出"""
@@ -135,14 +178,36 @@ class ExecutionResult:
         return output
     
     def get_output_for_llm(self, max_length: int = 10000) -> str:
-        """获取用于LLM处理的输出（更大的限制）"""
-        output = self.output
+        """获取用于LLM处理的输出（更大的限制，去除终端控制序列）"""
+        if self._llm_output is None:
+            output = self.output
+            self._llm_output = _ANSI_ESCAPE_RE.sub("", output) if "\x1b" in output else output
+        output = self._llm_output
         if len(output) > max_length:
             return output[:max_length] + f"\n...(输出已截断，仅显示前{max_length}字符)"
         return output
 
 
-@dataclass
+@dataclass(**SLOTS)
+class SkillContext:
+    """传递给技能的执行上下文，整个任务期间复用同一个实例并原地更新"""
+    last_result: Optional[ExecutionResult] = None
+    iteration: int = 0
+    history: List[ExecutionResult] = field(default_factory=list)
+    memory_bank: Optional["MemoryBank"] = None
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """兼容旧的字典式访问 context.get('history', [])"""
+        return getattr(self, key, default)
+    
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+
+@dataclass(**SLOTS)
 class LLMResponse:
     """LLM 响应结构 - 保留用于向后兼容，但主要使用 raw_json 字段"""
     raw_json: str = ""  # Raw JSON response from LLM
@@ -152,7 +217,7 @@ class LLMResponse:
         return cls(raw_json=json_str)
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Message:
     """对话消息"""
     role: str  # "system", "user", "assistant"
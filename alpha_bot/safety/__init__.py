@@ -0,0 +1,5 @@
+"""命令安全检查"""
+
+from .matcher import DANGEROUS_PATTERNS, DangerMatcher, get_matcher
+
+__all__ = ["DANGEROUS_PATTERNS", "DangerMatcher", "get_matcher"]
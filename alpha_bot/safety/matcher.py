@@ -0,0 +1,50 @@
+"""危险命令匹配器 - 将所有危险模式编译为一个正则，一次扫描完成检查"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+
+# 危险命令黑名单（按子串匹配，不区分大小写）
+DANGEROUS_PATTERNS: Tuple[str, ...] = (
+    "rm -rf /",
+    "rm -rf /*",
+    "mkfs",
+    "dd if=",
+    ":(){:|:&};:",
+    "> /dev/sda",
+    "chmod -R 777 /",
+    "chown -R",
+)
+
+
+class DangerMatcher:
+    """
+    危险命令匹配器
+    
+    所有模式在构造时被转义并合并成一个不区分大小写的正则，
+    检查一条命令只需对命令字符串扫描一次，而不是逐个模式做子串查找。
+    """
+    
+    def __init__(self, patterns: Iterable[str] = DANGEROUS_PATTERNS):
+        self.patterns = tuple(patterns)
+        # 长模式优先，保证返回的是最具体的匹配
+        ordered = sorted(self.patterns, key=len, reverse=True)
+        self._regex = re.compile("|".join(re.escape(p) for p in ordered), re.IGNORECASE) if ordered else None
+    
+    def match(self, command: str) -> Optional[str]:
+        """返回命令中命中的第一个危险模式，未命中时返回 None"""
+        if self._regex is None:
+            return None
+        found = self._regex.search(command)
+        return found.group(0) if found else None
+    
+    def is_dangerous(self, command: str) -> bool:
+        """检查命令是否命中任一危险模式"""
+        return self.match(command) is not None
+
+
+@lru_cache(maxsize=8)
+def get_matcher(patterns: Tuple[str, ...] = DANGEROUS_PATTERNS) -> DangerMatcher:
+    """获取（并缓存）指定模式集合对应的匹配器"""
+    return DangerMatcher(patterns)
@@ -4,7 +4,7 @@ This module provides a flexible skill system that allows the agent to have
 various capabilities beyond just shell command generation.
 """
 
-from .base_skill import BaseSkill
+from .base_skill import BaseSkill, LLMOwner
 from .skill_manager import SkillManager
 from .skill_selector import SkillSelector
 from .command_skill import CommandSkill
@@ -17,6 +17,7 @@ from .feishu_skill import FeishuSkill
 
 __all__ = [
     'BaseSkill', 
+    'LLMOwner',
     'SkillManager',
     'SkillSelector',
     'CommandSkill',
@@ -2,14 +2,21 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Protocol, runtime_checkable
 from enum import Enum
 
+from alpha_bot.llm.base import BaseLLMClient
 from alpha_bot.models.types import SkillExecutionResponse
 # Import auto hint system in __init__ to avoid circular import
 from alpha_bot.auto_hint import get_auto_hint_system
 
 
+@runtime_checkable
+class LLMOwner(Protocol):
+    """Any skill that owns an LLM client which other components can share"""
+    llm: BaseLLMClient
+
+
 class BaseSkill(ABC):
     """
     Base class for all Alpha-Bot skills
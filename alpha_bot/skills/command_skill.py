@@ -25,7 +25,8 @@ class CommandSkill(BaseSkill):
     "next_step": "下一步计划（如果任务还未完成）",
     "error_analysis": "如果上一条命令执行失败，分析失败原因",
     "is_dangerous": false,
-    "danger_reason": "如果是危险操作，说明原因"
+    "danger_reason": "如果是危险操作，说明原因",
+    "parallel_commands": []
 }
 
 重要规则：
@@ -37,6 +38,7 @@ class CommandSkill(BaseSkill):
 6. 如果命令执行失败，请分析原因并尝试修复
 7. 如果连续多次失败，请尝试不同的方法
 8. 始终关注最终目标，确保任务真正完成
+9. 例外：如果当前这一步需要多条互不依赖的只读命令（如同时查看多个文件、同时查询多个地址），可以把它们全部放进 parallel_commands 列表中并发执行，此时 command 留空
 
 **智能处理模式：**
 当任务需要AI能力（翻译、总结、分析等）时，你应该：
@@ -130,6 +132,7 @@ class CommandSkill(BaseSkill):
                 is_dangerous=llm_response.is_dangerous,
                 danger_reason=llm_response.danger_reason,
                 error_analysis=llm_response.error_analysis,
+                parallel_commands=llm_response.parallel_commands or [],
                 # Don't set task_complete here - skill selector will decide
             )
         except Exception as e:
@@ -1,10 +1,10 @@
 """Skill Manager for routing tasks to appropriate skills"""
 import os
 from loguru import logger
-from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from typing import List, Optional, Dict, Any, Callable, Tuple, Type, Union, TYPE_CHECKING
 from .skill_selector import SkillSelector
-from .base_skill import BaseSkill
-from ..models.types import SkillSelectResponse, SkillResponse
+from .base_skill import BaseSkill, LLMOwner
+from ..models.types import SkillSelectResponse, SkillResponse, SkillContext
 from .command_skill import CommandSkill
 from .direct_llm_skill import DirectLLMSkill
 from .image_skill import ImageSkill
@@ -19,6 +19,30 @@ if TYPE_CHECKING:
     from ..ui.console import ConsoleUI
 
 
+class LazySkill:
+    """
+    Placeholder for a registered skill that has not been instantiated yet
+    
+    Exposes the name, capabilities and description the SkillSelector needs by
+    calling the skill class methods directly, without running its constructor.
+    """
+    
+    def __init__(self, skill_cls: Type[BaseSkill]):
+        self.skill_cls = skill_cls
+        self.name = skill_cls.__name__
+        self.capabilities = self.get_capabilities()
+    
+    def get_capabilities(self) -> List[str]:
+        return self.skill_cls.get_capabilities(self)
+    
+    def get_description(self) -> str:
+        return self.skill_cls.get_description(self)
+    
+    def reset(self):
+        """Nothing to reset before the skill is instantiated"""
+        pass
+
+
 class SkillManager:
     """
     Manages all available skills and routes tasks to the appropriate skill
@@ -30,7 +54,18 @@ class SkillManager:
     4. Manages skill lifecycle (reset, etc.)
     """
     
-    def __init__(self, ui=None, enable_persistence: bool = True):
+    # 内置技能注册表：(技能类, 是否为默认技能)
+    SKILL_TABLE: List[Tuple[Type[BaseSkill], bool]] = [
+        (CommandSkill, True),       # 命令生成技能
+        (DirectLLMSkill, False),    # 直接LLM处理技能
+        (PPTSkill, False),          # PPT生成技能
+        (ImageSkill, False),        # 图片生成技能
+        (BrowserSkill, False),      # 浏览器自动化技能
+        (WeChatSkill, False),       # WeChat自动化技能
+        (FeishuSkill, False),       # Feishu自动化技能
+    ]
+    
+    def __init__(self, ui=None, enable_persistence: bool = True, prompt_cache: Optional[bool] = None):
         """
         Initialize SkillManager
         
@@ -38,49 +73,70 @@ class SkillManager:
             llm_client: LLM client for intelligent skill selection
             ui: ConsoleUI instance for displaying selection process
             enable_persistence: Whether to enable skill persistence
+            prompt_cache: Prompt prefix caching for the skill and selector LLM clients,
+                None keeps each client's own default
         """
         self.skills: List[BaseSkill] = []
         self.default_skill: Optional[BaseSkill] = None
-        self.skill_selector = SkillSelector()
+        self._factories: Dict[str, Callable[[], BaseSkill]] = {}
+        self._instances: Dict[str, BaseSkill] = {}
         self.ui = ui
         self.enable_persistence = enable_persistence
+        self.prompt_cache = prompt_cache
         if enable_persistence:
             self.persistence = SkillPersistence()
         else:
             self.persistence = None
         self.register_skill()
+        # 选择器与默认技能共用同一个 LLM 客户端，复用其 HTTP 连接
+        llm_client = self.default_skill.llm if isinstance(self.default_skill, LLMOwner) else None
+        self.skill_selector = self._configure(SkillSelector(llm_client))
         self.register_dynamic_skill()
     
     def register_skill(self):
         """注册所有可用技能"""
-        # 注册命令生成技能（默认技能）
-        command_skill = CommandSkill()
-        self.skills.append(command_skill)
-        self.default_skill = command_skill
-
-        # 注册直接LLM处理技能
-        direct_llm_skill = DirectLLMSkill()
-        self.skills.append(direct_llm_skill)
-        
-        # 注册PPT生成技能
-        ppt_skill = PPTSkill()
-        self.skills.append(ppt_skill)
-        
-        # 注册图片生成技能
-        image_skill = ImageSkill()
-        self.skills.append(image_skill)
-        
-        # 注册浏览器自动化技能
-        browser_skill = BrowserSkill()
-        self.skills.append(browser_skill)
-        
-        # 注册WeChat自动化技能
-        wechat_skill = WeChatSkill()
-        self.skills.append(wechat_skill)
+        for skill_cls, is_default in self.SKILL_TABLE:
+            if is_default:
+                # 默认技能立即初始化，其他技能出错时需要回退到它
+                skill = self._configure(skill_cls())
+                self.skills.append(skill)
+                self.default_skill = skill
+                self._instances[skill.name] = skill
+            else:
+                # 其他技能按需初始化（Playwright、WeChat、Feishu 等在大多数任务中用不到）
+                self.register_factory(skill_cls)
+    
+    def register_factory(self, skill_cls: Type[BaseSkill]):
+        """
+        Register a skill class that is instantiated the first time it is selected
         
-        # 注册Feishu自动化技能
-        feishu_skill = FeishuSkill()
-        self.skills.append(feishu_skill)
+        Args:
+            skill_cls: Skill class; its name, capabilities and description are
+                read without constructing it
+        """
+        placeholder = LazySkill(skill_cls)
+        self._factories[placeholder.name] = skill_cls
+        self.skills.append(placeholder)
+    
+    def _materialize(self, skill) -> BaseSkill:
+        """Return a real skill instance, constructing lazily registered skills on first use"""
+        if not isinstance(skill, LazySkill):
+            return skill
+        instance = self._instances.get(skill.name)
+        if instance is None:
+            logger.info(f"Initializing skill on first use: {skill.name}")
+            instance = self._configure(self._factories[skill.name]())
+            self._instances[skill.name] = instance
+            # Replace the placeholder so later lookups get the instance directly
+            self.skills = [instance if s is skill else s for s in self.skills]
+        return instance
+    
+    def _configure(self, skill):
+        """Apply the manager's prompt cache setting to the LLM client of a skill or the selector"""
+        llm = getattr(skill, "llm", None)
+        if self.prompt_cache is not None and hasattr(llm, "prompt_cache"):
+            llm.prompt_cache = self.prompt_cache
+        return skill
     
     def register_dynamic_skill(self):
         """Register dynamic skills"""
@@ -107,6 +163,7 @@ class SkillManager:
                     skill = skill_generator.parse_markdown_to_skill(file_content, skill_name)
                     logger.info(f"Generated skill '{skill_name}' from markdown")
                 
+                self._configure(skill)
                 logger.info(f"Registering dynamic skill:\n {skill.name=}\n, {skill.get_description()=}\n, {skill.get_capabilities()=}\n")
                 self.skills.append(skill)
     
@@ -145,24 +202,57 @@ class SkillManager:
                 logger.warning(f"[SkillManager] Intelligent selection failed: {e}, using default skill")
         return SkillSelectResponse(skill=self.default_skill, skill_name=self.default_skill.name if self.default_skill else "unknown", task_complete=False, select_reason="Fallback due to selection error")
     
+    def speculative_select(self, task: str, context: Optional[Dict[str, Any]] = None) -> Optional[SkillSelectResponse]:
+        """
+        Select a skill in the background without touching the UI
+        
+        Used to pick the next skill while the current command is still running,
+        for an assumed outcome of that command. The selector's completion
+        verdict is kept, so the caller can hand the selection to execute()
+        once the real outcome is known to match the assumed one.
+        
+        Returns:
+            SkillSelectResponse for the assumed context, or None if selection failed
+        """
+        try:
+            selected_skill, _, reasoning, task_complete = self.skill_selector.select_skill(task, self.skills, context)
+        except Exception as e:
+            logger.warning(f"Speculative skill selection failed: {e}")
+            return None
+        if task_complete:
+            return SkillSelectResponse(skill=None, skill_name="none", task_complete=True, select_reason="Task completed")
+        if selected_skill is None:
+            return None
+        return SkillSelectResponse(skill=selected_skill, skill_name=selected_skill.name, task_complete=False, select_reason=reasoning)
+    
     def execute(
         self,
         task: str,
-        context: Optional[Dict[str, Any]] = None,
+        context: Optional[Union[SkillContext, Dict[str, Any]]] = None,
+        forced_skill: Optional[str] = None,
+        selection: Optional[SkillSelectResponse] = None,
     ) -> SkillResponse:
         """
         Execute a task using the appropriate skill
         
         Args:
             task: The task to execute
-            context: Execution context
-            **kwargs: Additional parameters passed to skill
+            context: Execution context (SkillContext, or a plain dict with the same keys)
+            forced_skill: Name of a previously selected skill; bypasses the LLM-based selector
+            selection: A selection the selector already made for exactly this context
+                (see speculative_select); used as-is, including its completion verdict
             
         Returns:
             SkillResponse from the executed skill
         """
-        # Select skill
-        skill_select_response = self.select_skill(task, context) 
+        # Select skill (reuse a cached selection when the caller provides one)
+        skill_select_response = selection
+        if skill_select_response is None and forced_skill:
+            skill = self.get_skill_by_name(forced_skill)
+            if skill:
+                skill_select_response = SkillSelectResponse(skill=skill, skill_name=skill.name, task_complete=False, select_reason="Reused cached skill selection")
+        if skill_select_response is None:
+            skill_select_response = self.select_skill(task, context) 
         if not skill_select_response:
             return SkillResponse(
                 skill_name="error",
@@ -177,8 +267,9 @@ class SkillManager:
                 task_complete=True,
                 direct_response="Task completed."
             ) 
-        # Execute the selected skill
+        # Execute the selected skill (instantiate it on first use)
         try:
+            skill_select_response.skill = self._materialize(skill_select_response.skill)
             with self.ui.streaming_display() as stream_callback:
                 skill_exec_response = skill_select_response.skill.execute(task, context, stream_callback=stream_callback)
                 skill_response = SkillResponse(
@@ -193,6 +284,7 @@ class SkillManager:
                     is_dangerous=skill_exec_response.is_dangerous,
                     danger_reason=skill_exec_response.danger_reason,
                     error_analysis=skill_exec_response.error_analysis,
+                    parallel_commands=skill_exec_response.parallel_commands,
                     direct_response=skill_exec_response.direct_response,
                     generated_files=skill_exec_response.generated_files,
                     file_metadata=skill_exec_response.file_metadata,
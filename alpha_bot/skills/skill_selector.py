@@ -1,10 +1,12 @@
 """Intelligent Skill Selector using LLM"""
 
+import hashlib
 import json
 from typing import List, Optional, Dict, Any
 
 from loguru import logger
 
+from alpha_bot.llm.base import BaseLLMClient
 from alpha_bot.llm.openai_client import OpenAIClient
 from .base_skill import BaseSkill
 from ..models.types import ExecutionResult
@@ -45,21 +47,25 @@ class SkillSelector:
 8. 参考之前的执行历史（包括思考过程和下一步计划）来做出更好的选择
 
 任务完成的判断标准：
-上一步执行技能的 命令输出 或者 直接响应 成功完成了 用户任务
+上一步执行技能的 命令输出 或者 直接响应 成功完成了 用户任务"""
 
-用户任务：{task}
+    # 动态部分单独放在用户消息中，保证系统提示词（技能目录+规则）在各步之间字节一致
+    SKILL_SELECTION_USER_PROMPT = """用户任务：{task}
 
 当前执行上下文：
 {context}"""
 
-    def __init__(self):
+    def __init__(self, llm_client: Optional[BaseLLMClient] = None):
         """
         Initialize skill selector
         
         Args:
-            llm_client: LLM client for intelligent selection
+            llm_client: LLM client for intelligent selection, a new OpenAIClient if omitted
         """
-        self.llm = OpenAIClient()
+        self.llm = llm_client or OpenAIClient()
+        # 技能集合的指纹，只有技能集合变化时才重建系统提示词
+        self.prefix_fingerprint: Optional[str] = None
+        self._system_prompt = ""
     
     def select_skill(
         self,
@@ -78,22 +84,21 @@ class SkillSelector:
         Returns:
             Tuple of (selected_skill, confidence, reasoning)
         """
-        # Build skills description for LLM
-        skills_description = self._build_skills_description(available_skills)
+        # Build the static system prompt (skills catalog + rules), cached per skill set
+        system_prompt = self._get_system_prompt(available_skills)
         
         # Build context description
         context_description = self._build_context_description(context)
         
         # Create prompt
-        prompt = self.SKILL_SELECTION_PROMPT.format(
-            skills_description=skills_description,
+        prompt = self.SKILL_SELECTION_USER_PROMPT.format(
             task=task,
             context=context_description
         )
         logger.info(f"Skill Selection LLM Prompt: {prompt}")
         # Call LLM for skill selection
         try:
-            response = self._call_llm_for_selection(prompt)
+            response = self._call_llm_for_selection(system_prompt, prompt)
             logger.info(f"Skill Selection LLM Response: {response}")
             # Parse LLM response
             selected_skill_name = response.get("selected_skill", "CommandSkill")
@@ -119,6 +124,16 @@ class SkillSelector:
             # Fallback to first skill
             return available_skills[0], 0.5, f"选择失败，使用默认技能: {str(e)}", False
     
+    def _get_system_prompt(self, skills: List[BaseSkill]) -> str:
+        """Return the selection system prompt, rebuilding it only when the skill set changes"""
+        fingerprint = hashlib.sha256("\n".join(skill.name for skill in skills).encode("utf-8")).hexdigest()
+        if fingerprint != self.prefix_fingerprint:
+            self._system_prompt = self.SKILL_SELECTION_PROMPT.format(
+                skills_description=self._build_skills_description(skills)
+            )
+            self.prefix_fingerprint = fingerprint
+        return self._system_prompt
+    
     def _build_skills_description(self, skills: List[BaseSkill]) -> str:
         """Build formatted description of all available skills"""
         descriptions = []
@@ -146,12 +161,13 @@ class SkillSelector:
         
         return desc
     
-    def _call_llm_for_selection(self, prompt: str) -> Dict[str, Any]:
+    def _call_llm_for_selection(self, system_prompt: str, prompt: str) -> Dict[str, Any]:
         """
         Call LLM to get skill selection
         
         Args:
-            prompt: Selection prompt
+            system_prompt: Static selection prompt (skills catalog and rules)
+            prompt: Dynamic selection prompt (task and context)
             
         Returns:
             Parsed JSON response
@@ -162,7 +178,7 @@ class SkillSelector:
         try:
             # Use a simple API call to get JSON response
             messages = [
-                Message(role="system", content="You are a skill selector. Always respond with valid JSON."),
+                Message(role="system", content=f"{system_prompt}\n\nAlways respond with valid JSON."),
                 Message(role="user", content=prompt)
             ]
             
@@ -173,7 +189,8 @@ class SkillSelector:
                     model=self.llm.model,
                     messages=[{"role": m.role, "content": m.content} for m in messages],
                     temperature=0.3,  # Lower temperature for more deterministic selection
-                    max_tokens=500
+                    max_tokens=500,
+                    extra_body=self.llm.cache_options(messages[0].content)
                 )
                 response_text = completion.choices[0].message.content.strip()
                 
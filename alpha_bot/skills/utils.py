@@ -47,7 +47,13 @@ def build_full_history_message(history: List[ExecutionResult], task: str = "", m
 
 
 def format_one_step_message(result: ExecutionResult) -> str:
-    """格式化单步执行结果消息"""
+    """格式化单步执行结果消息（每个结果只渲染一次，之后每轮构建提示词时直接复用）"""
+    if result._step_message is None:
+        result._step_message = _render_one_step_message(result)
+    return result._step_message
+
+
+def _render_one_step_message(result: ExecutionResult) -> str:
     output = result.get_output_for_llm()  # 默认使用完整内容以提供更多信息
     history_str = f"技能选择: {result.skill_response.skill_name}\n"
     history_str += f"技能选择原因: {result.skill_response.select_reason}\n"
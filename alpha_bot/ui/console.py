@@ -12,16 +12,201 @@ from rich.syntax import Syntax
 from rich.table import Table
 from rich.live import Live
 from rich.markdown import Markdown
+from rich.markup import escape
 
 from ..models.types import LLMResponse, ExecutionResult
 from ..context.task_context import TaskContext
 
 
+# 流式显示中实时提取的字符串字段：字段名 -> 匹配 `"字段名": "` 的正则
+_FIELD_START_RES = {
+    name: re.compile(r'"%s"\s*:\s*"' % name)
+    for name in ("thinking", "error_analysis", "command", "explanation",
+                 "next_step", "direct_response", "code", "title")
+}
+# JSON 字符串内容（到未转义的引号之前为止）
+_STRING_BODY_RE = re.compile(r'(?:[^"\\]|\\.)*')
+# 查找字段名时与上次扫描位置重叠的字符数
+_FIELD_SCAN_OVERLAP = 64
+
+
+def _unescape(raw: str) -> str:
+    """还原 JSON 字符串中常见的转义字符"""
+    return raw.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
+
+
+# 流式输出中出现这些关键词时认为是浏览器自动化任务
+_BROWSER_TASK_RE = re.compile(r"playwright|browser|chromium|浏览器|goto|page\.", re.IGNORECASE)
+
+
+class _StreamingContent:
+    """流式响应的内容容器：增量提取各字段并生成显示内容"""
+    
+    def __init__(self):
+        self.buffer = ""
+        self.thinking = ""
+        self.command = ""
+        self.explanation = ""
+        self.next_step = ""
+        self.error_analysis = ""
+        self.direct_response = ""
+        self.code = ""
+        self.title = ""
+        self.outline = ""
+        self.is_browser_task = False
+        
+        # 增量解析状态：字段值的起始位置、已闭合的字段、下次查找字段名的起点
+        self._value_starts = {}
+        self._closed_fields = set()
+        self._outline_pos = None
+        self._scan_pos = 0
+                        
+        # 记录每个字段当前已显示的长度
+        self.thinking_displayed = 0
+        self.command_displayed = 0
+        self.explanation_displayed = 0
+        self.next_step_displayed = 0
+        self.error_analysis_displayed = 0
+        self.direct_response_displayed = 0
+        self.code_displayed = 0
+        self.title_displayed = 0
+    
+    def add_token(self, token: str):
+        """添加新的 token 并实时提取字段内容"""
+        self.buffer += token
+        # 一旦识别为浏览器任务就不再检查；否则只扫描新 token 及其前面一小段，
+        # 关键词被拆到两个 token 里也能匹配
+        if not self.is_browser_task:
+            start = max(0, len(self.buffer) - len(token) - 16)
+            self.is_browser_task = _BROWSER_TASK_RE.search(self.buffer, start) is not None
+        self._extract_fields()
+    
+    def _extract_fields(self):
+        """
+        实时提取各个字段的内容（支持部分内容）
+        
+        只在上次扫描位置之后查找尚未出现的字段名，已经闭合的字段不再处理，
+        每个 token 只需扫描新增内容和仍在增长的那个字段，而不是整个缓冲区。
+        """
+        buffer = self.buffer
+        for name, start_re in _FIELD_START_RES.items():
+            if name in self._closed_fields:
+                continue
+            value_start = self._value_starts.get(name)
+            if value_start is None:
+                match = start_re.search(buffer, self._scan_pos)
+                if match is None:
+                    continue
+                value_start = self._value_starts[name] = match.end()
+            body = _STRING_BODY_RE.match(buffer, value_start)
+            # 字符串后面已经出现结束引号，字段内容不会再变化
+            if buffer.startswith('"', body.end()):
+                self._closed_fields.add(name)
+            setattr(self, name, _unescape(body.group(0)))
+        
+        # PPT outline 字段（不是字符串，显示从字段名开始的全部内容）
+        if self._outline_pos is None:
+            pos = buffer.find('"outline"', self._scan_pos)
+            if pos != -1:
+                self._outline_pos = pos
+        if self._outline_pos is not None:
+            self.outline = buffer[self._outline_pos:]
+        
+        # 字段名可能被拆到两个 token 里，下次从末尾留出一段重叠开始查找
+        self._scan_pos = max(0, len(buffer) - _FIELD_SCAN_OVERLAP)
+
+    def get_display(self):
+        """获取显示内容 - 只显示新增的内容"""
+        from rich.console import Group
+        
+        panels = []
+        
+        # 思考过程 - 实时显示新增内容
+        if self.thinking:
+            panels.append(Panel(
+                f"💭 {self.thinking}",
+                title="[bold blue]💡 思考过程[/bold blue]",
+                border_style="blue",
+                padding=(1, 2)
+            ))
+        
+        # PPT Title - 实时显示
+        if self.title:
+            panels.append(Panel(
+                f"📄 {self.title}",
+                title="[bold magenta]🎯 PPT 标题[/bold magenta]",
+                border_style="magenta",
+                padding=(1, 2)
+            ))
+        
+        # PPT Outline - 实时显示
+        if self.outline:
+            panels.append(Panel(
+                self.outline,
+                title="[bold blue]📋 PPT 大纲[/bold blue]",
+                border_style="blue",
+                padding=(1, 2)
+            ))
+        
+        # 直接响应 - 用于直接LLM模式
+        if self.direct_response:
+            panels.append(Panel(
+                self.direct_response,
+                title="[bold cyan]💡 AI 响应[/bold cyan]",
+                border_style="cyan",
+                padding=(1, 2)
+            ))
+        
+        # 生成的命令 - 实时显示
+        if self.command:
+            panels.append(Panel(
+                Syntax(self.command, "bash", theme="monokai", line_numbers=False, word_wrap=True),
+                title="[bold green]✨ 生成的命令[/bold green]",
+                border_style="green",
+                padding=(0, 1)
+            ))
+
+        if self.code:
+            panels.append(Panel(
+                Syntax(self.code, "python", theme="monokai", line_numbers=True, word_wrap=True),
+                title="[bold purple]✨ 生成的代码[/bold purple]",
+                border_style="purple",
+                padding=(0, 1)
+            ))
+
+        # 说明 - 实时显示
+        if self.explanation:
+            panels.append(f"[dim]💬 说明: {self.explanation}[/dim]")
+        
+        # 下一步 - 实时显示
+        if self.next_step:
+            panels.append(f"[cyan]📋 下一步: {self.next_step}[/cyan]")
+        
+        # 如果什么都没有，显示思考中（带浏览器提示）
+        if not panels:
+            # 是否是浏览器相关任务（在 add_token 中根据新增内容判断）
+            if self.is_browser_task:
+                loading_text = "🌐 正在生成浏览器自动化代码..."
+            else:
+                loading_text = "💭 思考中..."
+            
+            panels.append(Panel(
+                loading_text,
+                title="[bold blue]💡 思考过程[/bold blue]",
+                border_style="blue",
+                padding=(1, 2)
+            ))
+        
+        return Group(*panels)
+
+
 class ConsoleUI:
     """控制台用户界面"""
     
     def __init__(self):
         self.console = Console()
+        self._executing_status = None
+        self._executing_label = ""
     
     def print_welcome(self):
         """打印欢迎信息"""
@@ -49,178 +234,7 @@ class ConsoleUI:
     @contextmanager
     def streaming_display(self):
         """流式显示 AI 响应的各个字段"""
-        
-        # 创建一个可变的内容容器
-        class StreamingContent:
-            def __init__(self):
-                self.buffer = ""
-                self.thinking = ""
-                self.command = ""
-                self.explanation = ""
-                self.next_step = ""
-                self.error_analysis = ""
-                self.direct_response = ""
-                self.code = ""
-                self.title = ""
-                self.outline = ""
-                                
-                # 记录每个字段当前已显示的长度
-                self.thinking_displayed = 0
-                self.command_displayed = 0
-                self.explanation_displayed = 0
-                self.next_step_displayed = 0
-                self.error_analysis_displayed = 0
-                self.direct_response_displayed = 0
-                self.code_displayed = 0
-                self.title_displayed = 0
-            
-            def add_token(self, token: str):
-                """添加新的 token 并实时提取字段内容"""
-                self.buffer += token
-                self._extract_fields()
-            
-            def _extract_fields(self):
-                """实时提取各个字段的内容（支持部分内容）"""
-                # 提取 thinking 字段
-                thinking_match = re.search(r'"thinking"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if thinking_match:
-                    raw_content = thinking_match.group(1)
-                    self.thinking = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 error_analysis 字段
-                error_match = re.search(r'"error_analysis"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if error_match:
-                    raw_content = error_match.group(1)
-                    self.error_analysis = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 command 字段
-                command_match = re.search(r'"command"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if command_match:
-                    raw_content = command_match.group(1)
-                    self.command = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 explanation 字段
-                explanation_match = re.search(r'"explanation"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if explanation_match:
-                    raw_content = explanation_match.group(1)
-                    self.explanation = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 next_step 字段
-                next_step_match = re.search(r'"next_step"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if next_step_match:
-                    raw_content = next_step_match.group(1)
-                    self.next_step = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 direct_response 字段
-                direct_response_match = re.search(r'"direct_response"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if direct_response_match:
-                    raw_content = direct_response_match.group(1)
-                    self.direct_response = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 code 字段
-                code_match = re.search(r'"code"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if code_match:
-                    raw_content = code_match.group(1)
-                    self.code = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-                
-                # 提取 PPT skill title 字段
-                title_match = re.search(r'"title"\s*:\s*"((?:[^"\\]|\\.)*)', self.buffer)
-                if title_match:
-                    raw_content = title_match.group(1)
-                    self.title = raw_content.replace('\\n', '\n').replace('\\"', '"').replace('\\\\', '\\')
-
-                outline_start_pos = self.buffer.find('"outline"')
-                if outline_start_pos != -1:
-                    self.outline = self.buffer[outline_start_pos:]
-
-            def get_display(self):
-                """获取显示内容 - 只显示新增的内容"""
-                from rich.console import Group
-                
-                panels = []
-                
-                # 思考过程 - 实时显示新增内容
-                if self.thinking:
-                    panels.append(Panel(
-                        f"💭 {self.thinking}",
-                        title="[bold blue]💡 思考过程[/bold blue]",
-                        border_style="blue",
-                        padding=(1, 2)
-                    ))
-                
-                # PPT Title - 实时显示
-                if self.title:
-                    panels.append(Panel(
-                        f"📄 {self.title}",
-                        title="[bold magenta]🎯 PPT 标题[/bold magenta]",
-                        border_style="magenta",
-                        padding=(1, 2)
-                    ))
-                
-                # PPT Outline - 实时显示
-                if self.outline:
-                    panels.append(Panel(
-                        self.outline,
-                        title="[bold blue]📋 PPT 大纲[/bold blue]",
-                        border_style="blue",
-                        padding=(1, 2)
-                    ))
-                
-                # 直接响应 - 用于直接LLM模式
-                if self.direct_response:
-                    panels.append(Panel(
-                        self.direct_response,
-                        title="[bold cyan]💡 AI 响应[/bold cyan]",
-                        border_style="cyan",
-                        padding=(1, 2)
-                    ))
-                
-                # 生成的命令 - 实时显示
-                if self.command:
-                    panels.append(Panel(
-                        Syntax(self.command, "bash", theme="monokai", line_numbers=False, word_wrap=True),
-                        title="[bold green]✨ 生成的命令[/bold green]",
-                        border_style="green",
-                        padding=(0, 1)
-                    ))
-
-                if self.code:
-                    panels.append(Panel(
-                        Syntax(self.code, "python", theme="monokai", line_numbers=True, word_wrap=True),
-                        title="[bold purple]✨ 生成的代码[/bold purple]",
-                        border_style="purple",
-                        padding=(0, 1)
-                    ))
-
-                # 说明 - 实时显示
-                if self.explanation:
-                    panels.append(f"[dim]💬 说明: {self.explanation}[/dim]")
-                
-                # 下一步 - 实时显示
-                if self.next_step:
-                    panels.append(f"[cyan]📋 下一步: {self.next_step}[/cyan]")
-                
-                # 如果什么都没有，显示思考中（带浏览器提示）
-                if not panels:
-                    # 检测是否是浏览器相关任务（根据buffer内容判断）
-                    is_browser_task = any(keyword in self.buffer.lower() for keyword in 
-                                         ['playwright', 'browser', 'chromium', '浏览器', 'goto', 'page.'])
-                    
-                    if is_browser_task:
-                        loading_text = "🌐 正在生成浏览器自动化代码..."
-                    else:
-                        loading_text = "💭 思考中..."
-                    
-                    panels.append(Panel(
-                        loading_text,
-                        title="[bold blue]💡 思考过程[/bold blue]",
-                        border_style="blue",
-                        padding=(1, 2)
-                    ))
-                
-                return Group(*panels)
-        
-        content = StreamingContent()
+        content = _StreamingContent()
         
         with Live(content.get_display(), console=self.console, refresh_per_second=10, screen=False) as live:
             def update_callback(token: str):
@@ -234,11 +248,24 @@ class ConsoleUI:
         """显示命令执行中的动画"""
         # 截断过长的命令用于显示
         display_cmd = command if len(command) <= 50 else command[:47] + "..."
-        with self.console.status(
-            f"[bold yellow]⚙️  正在执行:[/bold yellow] [dim]{display_cmd}[/dim]",
-            spinner="bouncingBall"
-        ) as status:
-            yield status
+        self._executing_label = f"[bold yellow]⚙️  正在执行:[/bold yellow] [dim]{display_cmd}[/dim]"
+        with self.console.status(self._executing_label, spinner="bouncingBall") as status:
+            self._executing_status = status
+            try:
+                yield status
+            finally:
+                self._executing_status = None
+    
+    def append_output(self, chunk: bytes):
+        """命令执行过程中显示最新的一行输出（只解码输出块的末尾）"""
+        status = self._executing_status
+        if status is None:
+            return
+        tail = chunk[-512:].decode("utf-8", errors="replace")
+        lines = [line for line in tail.splitlines() if line.strip()]
+        if lines:
+            last_line = escape(lines[-1][:80])
+            status.update(f"{self._executing_label}\n[dim]{last_line}[/dim]")
     
     def print_response(self, response: LLMResponse, skip_all: bool = False):
         """
@@ -389,8 +416,8 @@ class ConsoleUI:
         table.add_column("值", style="white")
         
         table.add_row("总步数", str(context.iteration))
-        table.add_row("成功命令", str(sum(1 for r in context.history if r.success)))
-        table.add_row("失败命令", str(sum(1 for r in context.history if not r.success)))
+        table.add_row("成功命令", str(context.success_count))
+        table.add_row("失败命令", str(context.failure_count))
         table.add_row("状态", context.status.value)
         
         self.console.print(table)
@@ -1,10 +1,12 @@
 """Web Server for Alpha-Bot UI - Enhanced Version"""
 
 import asyncio
+import codecs
 import json
 import threading
 import re
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Any
 from flask import Flask, render_template, request, jsonify, send_from_directory
@@ -93,13 +95,13 @@ class WebUI:
             end_time=end_time.isoformat(),
             duration=duration,
             iterations=context.iteration,
-            success_count=sum(1 for r in context.history if r.success),
-            failure_count=sum(1 for r in context.history if not r.success),
+            success_count=context.success_count,
+            failure_count=context.failure_count,
             execution_log=self.session_logs.get(session_id, []),
             summary={
                 'iterations': context.iteration,
-                'success_count': sum(1 for r in context.history if r.success),
-                'failure_count': sum(1 for r in context.history if not r.success)
+                'success_count': context.success_count,
+                'failure_count': context.failure_count
             }
         )
         
@@ -230,13 +232,13 @@ class WebUI:
                         end_time=end_time.isoformat(),
                         duration=duration,
                         iterations=context.iteration,
-                        success_count=sum(1 for r in context.history if r.success),
-                        failure_count=sum(1 for r in context.history if not r.success),
+                        success_count=context.success_count,
+                        failure_count=context.failure_count,
                         execution_log=self.session_logs.get(session_id, []),
                         summary={
                             'iterations': context.iteration,
-                            'success_count': sum(1 for r in context.history if r.success),
-                            'failure_count': sum(1 for r in context.history if not r.success)
+                            'success_count': context.success_count,
+                            'failure_count': context.failure_count
                         },
                         created_at=datetime.now().isoformat()
                     )
@@ -249,8 +251,8 @@ class WebUI:
                         'status': context.status.value,
                         'summary': {
                             'iterations': context.iteration,
-                            'success_count': sum(1 for r in context.history if r.success),
-                            'failure_count': sum(1 for r in context.history if not r.success)
+                            'success_count': context.success_count,
+                            'failure_count': context.failure_count
                         }
                     }, room=session_id)
                 except Exception as e:
@@ -352,8 +354,8 @@ class WebUI:
                         'status': context.status.value,
                         'summary': {
                             'iterations': context.iteration,
-                            'success_count': sum(1 for r in context.history if r.success),
-                            'failure_count': sum(1 for r in context.history if not r.success)
+                            'success_count': context.success_count,
+                            'failure_count': context.failure_count
                         }
                     }, room=session_id)
                     
@@ -437,6 +439,9 @@ class WebUI:
                 self.session_id = session_id
                 self.socketio = socketio
                 self.parent = parent
+                # Decodes command output for the current execution; a multibyte
+                # character split across two chunks is held back until complete
+                self._output_decoder = None
                 # Only capture essential execution events, not streaming updates
                 self.essential_events = {
                     'task_received', 'step_started', 'response_generated', 
@@ -570,7 +575,7 @@ class WebUI:
                 summary_data = {
                     'iteration': context.iteration,
                     'status': context.status.value,
-                    'history_count': len(context.history)
+                    'history_count': context.step_count
                 }
                 self._emit_event('summary', summary_data)
             
@@ -710,9 +715,29 @@ class WebUI:
                 
                 return streaming_context()
 
+            @contextmanager
             def executing_animation(self, command: str):
                 self._emit_event('executing_started', {'command': command})
-                return self.console_ui.executing_animation(command)
+                self._output_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+                try:
+                    with self.console_ui.executing_animation(command) as status:
+                        yield status
+                finally:
+                    # Flush bytes of a character the command never finished
+                    output = self._output_decoder.decode(b'', final=True)
+                    self._output_decoder = None
+                    if output:
+                        self._emit_event('execution_output', {'output': output})
+            
+            def append_output(self, chunk: bytes):
+                self.console_ui.append_output(chunk)
+                decoder = self._output_decoder
+                if decoder is None:
+                    output = chunk.decode('utf-8', errors='replace')
+                else:
+                    output = decoder.decode(chunk)
+                if output:
+                    self._emit_event('execution_output', {'output': output})
             
             def skill_selection_animation(self):
                 self._emit_event('skill_selection_started', {})
@@ -0,0 +1,181 @@
+"""Agent Loop Tests"""
+
+import os
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from alpha_bot.models.types import SkillResponse, SkillSelectResponse, TaskStatus
+
+
+class _ScriptedSkillManager:
+    """Skill manager stub: the selector returns responses from a script, forced skills repeat the command"""
+
+    def __init__(self, limit=10):
+        self.selector_responses = []
+        self.speculations = []
+        self.limit = limit
+        self.calls = []
+        self.skill = object()
+
+    def execute(self, task, context=None, forced_skill=None, selection=None):
+        self.calls.append("selection" if selection is not None else forced_skill)
+        if len(self.calls) > self.limit:
+            raise RuntimeError("agent loop did not terminate")
+        if selection is not None:
+            if selection.task_complete:
+                return SkillResponse(skill_name="none", task_complete=True)
+            return SkillResponse(skill_name=selection.skill_name, skill=self.skill, command="echo step", task_complete=False)
+        if forced_skill is not None:
+            return SkillResponse(skill_name=forced_skill, skill=self.skill, command="echo step", task_complete=False)
+        return self.selector_responses.pop(0)
+
+    def speculative_select(self, task, context=None):
+        return self.speculations.pop(0) if self.speculations else None
+
+    def reset_all(self):
+        pass
+
+
+def _step(task_complete=False, command="echo step", skill=None):
+    return SkillResponse(skill_name="CommandSkill", skill=skill, command=command, task_complete=task_complete)
+
+
+class _AgentTestCase(unittest.TestCase):
+    """AlphaBot with a scripted skill manager and a mocked UI"""
+
+    def setUp(self):
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "x"}), \
+                patch("alpha_bot.agent.SkillManager"), patch("alpha_bot.agent.ConsoleUI"):
+            from alpha_bot.agent import AlphaBot
+            self.bot = AlphaBot(auto_execute=True, enable_persistence=False)
+        self.bot.ui = MagicMock()
+        self.bot._schedule_auto_hint_learning = MagicMock()
+
+    def _manager(self, selector_responses):
+        manager = _ScriptedSkillManager()
+        manager.selector_responses = [
+            _step(r.task_complete, r.command, manager.skill) for r in selector_responses
+        ]
+        self.bot.skill_manager = manager
+        return manager
+
+
+class TestSelectorCache(_AgentTestCase):
+    """Test the per-task skill selection cache"""
+
+    def test_cached_step_can_still_end_task(self):
+        """Test that a repeated state goes back to the selector, which can complete the task"""
+        manager = self._manager([_step(), _step(), _step(task_complete=True, command="")])
+
+        context = self.bot.run("repeat a step")
+
+        self.assertEqual(context.status, TaskStatus.COMPLETED)
+        # 第三步命中缓存（强制技能），第四步同样的状态交回选择器
+        self.assertEqual(manager.calls, [None, None, "CommandSkill", None])
+
+    def test_completed_step_is_not_cached(self):
+        """Test that a step marked complete is never replayed from the cache"""
+        self._manager([_step(task_complete=True)])
+
+        self.bot.run("one step")
+
+        self.assertEqual(self.bot._selector_cache, {})
+
+    def test_failed_step_is_not_cached(self):
+        """Test that a step whose command failed is not cached"""
+        self._manager([_step(command="exit 3"), _step(task_complete=True, command="")])
+
+        self.bot.run("failing step")
+
+        self.assertEqual(self.bot._selector_cache, {})
+
+    def test_cache_is_cleared_between_runs(self):
+        """Test that selections from a previous task do not leak into the next run"""
+        self._manager([_step(), _step(task_complete=True, command="")])
+        self.bot.run("same task")
+        self.assertTrue(self.bot._selector_cache)
+
+        manager = self._manager([_step(task_complete=True, command="")])
+        context = self.bot.run("same task")
+
+        self.assertEqual(context.status, TaskStatus.COMPLETED)
+        self.assertEqual(manager.calls, [None])
+
+
+
+class TestSpeculation(_AgentTestCase):
+    """Test that a speculative skill selection is only used when its assumption held"""
+
+    def setUp(self):
+        super().setUp()
+        self.bot._speculation_pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.bot._speculation_pool.shutdown)
+
+    def test_speculated_completion_used_when_output_matches(self):
+        """Test that a command finishing silently, as assumed, reuses the selector's completion verdict"""
+        manager = self._manager([_step(command="true")])
+        manager.speculations = [SkillSelectResponse(skill_name="none", task_complete=True)]
+
+        context = self.bot.run("touch a file")
+
+        self.assertEqual(context.status, TaskStatus.COMPLETED)
+        self.assertEqual(manager.calls, [None, "selection"])
+
+    def test_speculation_discarded_when_output_differs(self):
+        """Test that real output the selection did not see sends the next step back to the selector"""
+        manager = self._manager([_step(command="echo step"), _step(task_complete=True, command="")])
+        manager.speculations = [SkillSelectResponse(skill_name="CommandSkill", skill=manager.skill, task_complete=False)]
+
+        context = self.bot.run("print something")
+
+        self.assertEqual(context.status, TaskStatus.COMPLETED)
+        self.assertEqual(manager.calls, [None, None])
+
+    def test_speculation_not_cached(self):
+        """Test that a speculative selection never enters the selector cache"""
+        manager = self._manager([_step(command="true"), _step(task_complete=True, command="")])
+        manager.speculations = [SkillSelectResponse(skill_name="CommandSkill", skill=manager.skill, task_complete=False)]
+
+        self.bot.run("touch a file")
+
+        # 只有第一步（选择器选出）被缓存，采用推测选择的第二步不缓存
+        self.assertEqual(manager.calls, [None, "selection", None])
+        self.assertEqual(len(self.bot._selector_cache), 1)
+
+
+class TestPromptCacheOption(unittest.TestCase):
+    """Test that the prompt_cache option stays local to the agent's own LLM clients"""
+
+    def test_option_does_not_touch_environment(self):
+        """Test that AlphaBot(prompt_cache=...) hands the setting to its SkillManager, not os.environ"""
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "x"}, clear=True), \
+                patch("alpha_bot.agent.SkillManager") as manager_cls, patch("alpha_bot.agent.ConsoleUI"):
+            from alpha_bot.agent import AlphaBot
+            AlphaBot(enable_persistence=False, prompt_cache=False)
+
+            self.assertNotIn("OPENAI_PROMPT_CACHE", os.environ)
+        self.assertIs(manager_cls.call_args.kwargs["prompt_cache"], False)
+
+    def test_manager_configures_skill_clients(self):
+        """Test that the skill manager applies the setting to skill and selector clients only"""
+        from alpha_bot.skills.skill_manager import SkillManager
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "x"}):
+            from alpha_bot.llm.openai_client import OpenAIClient
+            manager = SkillManager.__new__(SkillManager)
+            owned, other = OpenAIClient(prompt_cache=True), OpenAIClient(prompt_cache=True)
+            skill = MagicMock(llm=owned)
+
+            manager.prompt_cache = False
+            self.assertIs(manager._configure(skill), skill)
+            self.assertFalse(owned.prompt_cache)
+            self.assertTrue(other.prompt_cache)
+
+            manager.prompt_cache = None
+            owned.prompt_cache = True
+            manager._configure(skill)
+            self.assertTrue(owned.prompt_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
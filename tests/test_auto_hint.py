@@ -1,5 +1,6 @@
 """Auto Hint System Tests"""
 
+import json
 import unittest
 import tempfile
 import os
@@ -163,6 +164,76 @@ class TestHintPersistenceManager(unittest.TestCase):
         self.assertEqual(stats["hints_by_skill"]["TestSkill"], 1)
 
 
+class TestHintGenerator(unittest.TestCase):
+    """Test hint generator"""
+    
+    def setUp(self):
+        self.generator = HintGenerator(enable_llm=False)
+    
+    def _patterns(self, examples=("ls -la",)):
+        return [
+            HintPattern(skill_name="CommandSkill", pattern_description="List files",
+                        success_rate=1.0, frequency=3, examples=list(examples)),
+            HintPattern(skill_name="CommandSkill", pattern_description="List dirs",
+                        success_rate=0.5, frequency=1, examples=["ls -d */"]),
+        ]
+    
+    def test_combine_patterns(self):
+        """Test combining patterns"""
+        combined = self.generator._combine_patterns(self._patterns())
+        self.assertEqual(combined.frequency, 4)
+        self.assertAlmostEqual(combined.success_rate, 0.875)
+        self.assertEqual(combined.examples, ["ls -la", "ls -d */"])
+    
+    def test_combine_patterns_cached_across_runs(self):
+        """Test that rediscovered patterns (new ids, same content) reuse the combined pattern"""
+        first = self.generator._combine_patterns(self._patterns())
+        second = self.generator._combine_patterns(self._patterns())
+        self.assertIs(first, second)
+        
+        changed = self.generator._combine_patterns(self._patterns(examples=("ls -lh",)))
+        self.assertIsNot(changed, first)
+        self.assertEqual(changed.examples[0], "ls -lh")
+    
+    def _batch_client(self, status="completed", output=""):
+        client = Mock()
+        client.batches.create.return_value = Mock(id="batch-1", status=status, output_file_id="out-1")
+        client.batches.retrieve.return_value = client.batches.create.return_value
+        client.files.content.return_value = Mock(text=output)
+        self.generator.llm = Mock(model="test-model", client=client)
+        return client
+    
+    def test_run_batch_skips_unreadable_lines(self):
+        """Test that malformed batch output lines are skipped instead of raising"""
+        ok = {"custom_id": "skill-0", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": " hint "}}]}}}
+        self._batch_client(output="\n".join([
+            json.dumps(ok),
+            "{not json",
+            json.dumps({"custom_id": "skill-1", "response": {"status_code": 200, "body": {"choices": []}}}),
+        ]))
+        
+        results = self.generator._run_batch({"skill-0": ("sys", "usr"), "skill-1": ("sys", "usr")}, 0, 60)
+        
+        self.assertEqual(results, {"skill-0": "hint"})
+    
+    def test_run_batch_unusable_output_falls_back(self):
+        """Test that output without any usable response is treated as a failed job"""
+        self._batch_client(output="{not json")
+        
+        self.assertIsNone(self.generator._run_batch({"skill-0": ("sys", "usr")}, 0, 60))
+    
+    def test_run_batch_wait_is_bounded(self):
+        """Test that a job still running at the timeout is cancelled"""
+        client = self._batch_client(status="in_progress")
+        
+        with patch("alpha_bot.auto_hint.generator.time.sleep") as sleep:
+            self.assertIsNone(self.generator._run_batch({"skill-0": ("sys", "usr")}, 30.0, 0.05))
+        
+        client.batches.cancel.assert_called_once_with("batch-1")
+        for call in sleep.call_args_list:
+            self.assertLessEqual(call.args[0], 0.05)
+
+
 class TestAutoHintSystem(unittest.TestCase):
     """Test auto hint system"""
     
@@ -0,0 +1,110 @@
+"""Console Streaming Display Tests"""
+
+import json
+import random
+import unittest
+
+from alpha_bot.ui.console import _StreamingContent
+
+
+STRING_FIELDS = ("thinking", "error_analysis", "command", "explanation",
+                 "next_step", "direct_response", "code", "title")
+
+
+def _feed(text, sizes):
+    """Stream text into a fresh container in chunks of the given sizes"""
+    content = _StreamingContent()
+    pos = 0
+    for size in sizes:
+        content.add_token(text[pos:pos + size])
+        pos += size
+    if pos < len(text):
+        content.add_token(text[pos:])
+    return content
+
+
+class TestStreamingContent(unittest.TestCase):
+    """Test incremental field extraction from a streamed JSON response"""
+
+    def test_fields_extracted_after_full_response(self):
+        """Test that every string field equals the parsed JSON value"""
+        data = {
+            "thinking": "list the files",
+            "command": 'grep -n "a\\b" file.txt',
+            "explanation": "line one\nline two",
+            "next_step": "done",
+        }
+        content = _feed(json.dumps(data, ensure_ascii=False, indent=2), [1] * 10000)
+
+        for name, value in data.items():
+            self.assertEqual(getattr(content, name), value)
+
+    def test_partial_field_grows_while_streaming(self):
+        """Test that an unfinished string field shows the content received so far"""
+        content = _StreamingContent()
+        content.add_token('{"thinking": "first ')
+        self.assertEqual(content.thinking, "first ")
+
+        content.add_token('half, second')
+        self.assertEqual(content.thinking, "first half, second")
+
+        content.add_token(' half", "command": "l')
+        self.assertEqual(content.thinking, "first half, second half")
+        self.assertEqual(content.command, "l")
+
+    def test_field_name_split_across_tokens(self):
+        """Test that a field name cut between two tokens is still found"""
+        content = _StreamingContent()
+        for token in ('{"thinking": "x", "com', 'mand": "ls', ' -la"}'):
+            content.add_token(token)
+
+        self.assertEqual(content.command, "ls -la")
+
+    def test_escape_split_across_tokens(self):
+        """Test that an escaped quote cut after its backslash does not close the field"""
+        content = _StreamingContent()
+        content.add_token('{"command": "echo \\')
+        content.add_token('"hi\\"", "explanation": "quoted"}')
+
+        self.assertEqual(content.command, 'echo "hi"')
+        self.assertEqual(content.explanation, "quoted")
+
+    def test_closed_field_not_overwritten(self):
+        """Test that a field name appearing later inside another string does not replace a closed field"""
+        data = {"command": "ls", "explanation": 'not a real "command": "rm"'}
+        content = _feed(json.dumps(data), [3] * 1000)
+
+        self.assertEqual(content.command, "ls")
+        self.assertEqual(content.explanation, data["explanation"])
+
+    def test_random_chunking_matches_json(self):
+        """Test that any split of the response into tokens gives the same fields"""
+        rng = random.Random(0)
+        values = ["", "plain", 'q"uo\\te\nline', "中文 内容 " * 20]
+        for _ in range(200):
+            data = {name: rng.choice(values) for name in rng.sample(STRING_FIELDS, rng.randint(1, 5))}
+            text = json.dumps(data, ensure_ascii=False, indent=rng.choice([None, 2]))
+            content = _feed(text, [rng.randint(1, 9) for _ in range(len(text))])
+
+            for name in STRING_FIELDS:
+                self.assertEqual(getattr(content, name), data.get(name, ""))
+
+    def test_outline_shown_from_field_name(self):
+        """Test that the non-string outline field is shown from its name onwards"""
+        content = _feed('{"title": "Deck", "outline": [{"slide": 1}]}', [4] * 20)
+
+        self.assertEqual(content.title, "Deck")
+        self.assertEqual(content.outline, '"outline": [{"slide": 1}]}')
+
+    def test_browser_keyword_split_across_tokens(self):
+        """Test that a browser keyword cut between tokens is detected"""
+        content = _StreamingContent()
+        content.add_token('{"thinking": "use play')
+        self.assertFalse(content.is_browser_task)
+
+        content.add_token('wright to open it')
+        self.assertTrue(content.is_browser_task)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Execution Cache Tests"""
+
+import os
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from alpha_bot.cache.exec_cache import ExecCache
+from alpha_bot.models.types import ExecutionResult
+
+
+def _result(command, stdout="out", returncode=0):
+    return ExecutionResult(command=command, returncode=returncode, stdout=stdout, stderr="")
+
+
+class TestExecCache(unittest.TestCase):
+    """Test the read-only command result cache"""
+    
+    def setUp(self):
+        self.cache = ExecCache(ttl=30.0)
+        self.cwd = "/work"
+    
+    def test_default_database_is_in_memory(self):
+        """Test that no file is written unless a path is given"""
+        self.assertEqual(self.cache.db_path, ":memory:")
+    
+    def test_hit_after_record(self):
+        """Test that a recorded read-only command is served from the cache"""
+        self.cache.record("ls -la", self.cwd, _result("ls -la", "a\nb\n"))
+        cached = self.cache.get("ls -la", self.cwd)
+        self.assertIsNotNone(cached)
+        self.assertEqual(cached.stdout, "a\nb\n")
+        self.assertIsNone(self.cache.get("ls -la", "/elsewhere"))
+    
+    def test_non_cacheable_and_failed_commands_are_not_stored(self):
+        """Test that only successful allowlisted commands are cached"""
+        self.cache.record("ls > files.txt", self.cwd, _result("ls > files.txt"))
+        self.cache.record("cat missing", self.cwd, _result("cat missing", returncode=1))
+        self.assertIsNone(self.cache.get("ls > files.txt", self.cwd))
+        self.assertIsNone(self.cache.get("cat missing", self.cwd))
+    
+    def test_ttl_expiry(self):
+        """Test that entries older than the TTL are ignored"""
+        with patch("alpha_bot.cache.exec_cache.time.time", return_value=1000.0):
+            self.cache.record("pwd", self.cwd, _result("pwd", "/work\n"))
+        with patch("alpha_bot.cache.exec_cache.time.time", return_value=1029.0):
+            self.assertIsNotNone(self.cache.get("pwd", self.cwd))
+        with patch("alpha_bot.cache.exec_cache.time.time", return_value=1031.0):
+            self.assertIsNone(self.cache.get("pwd", self.cwd))
+    
+    def test_mutating_command_invalidates(self):
+        """Test that running a non-cacheable command drops every entry"""
+        self.cache.record("cat notes.txt", self.cwd, _result("cat notes.txt", "old"))
+        self.cache.record("echo new > notes.txt", self.cwd, _result("echo new > notes.txt"))
+        self.assertIsNone(self.cache.get("cat notes.txt", self.cwd))
+    
+    def test_clear(self):
+        """Test explicit invalidation"""
+        self.cache.record("ls", self.cwd, _result("ls"))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("ls", self.cwd))
+    
+    def test_file_database_is_private(self):
+        """Test that a file database is created with owner-only permissions"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "exec_cache.sqlite3")
+            cache = ExecCache(db_path=path)
+            cache.record("ls", self.cwd, _result("ls"))
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+    
+    def test_database_errors_do_not_propagate(self):
+        """Test that a broken database never fails the caller"""
+        self.cache._conn.close()
+        self.cache.record("ls", self.cwd, _result("ls"))
+        self.assertIsNone(self.cache.get("ls", self.cwd))
+        self.cache.clear()
+    
+    def test_unusable_path_disables_cache(self):
+        """Test that a database that cannot be opened disables caching"""
+        cache = ExecCache(db_path="/nonexistent-dir/exec_cache.sqlite3")
+        cache.record("ls", self.cwd, _result("ls"))
+        self.assertIsNone(cache.get("ls", self.cwd))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+"""Hint Persistence Change Log Tests"""
+
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from alpha_bot.auto_hint.persistence import HintPersistenceManager
+from alpha_bot.auto_hint.types import HintCategory, HintMetadata
+
+
+def _hint(title, skill_name="CommandSkill", content=None):
+    return {
+        "metadata": HintMetadata(title=title, category=HintCategory.BEST_PRACTICE, skill_name=skill_name),
+        "content": content if content is not None else f"Content of {title}",
+    }
+
+
+class TestHintPersistenceConcurrency(unittest.TestCase):
+    """Test that saves, deletes and background flushes can interleave"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.persistence = HintPersistenceManager(self.temp_dir)
+    
+    def tearDown(self):
+        self.persistence.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_concurrent_saves_flushes_and_deletes(self):
+        """Test that concurrent writers keep the metadata and log consistent"""
+        errors = []
+        
+        def saver(worker):
+            try:
+                for i in range(20):
+                    self.persistence.save_hints([_hint(f"w{worker}-{i}"), _hint(f"w{worker}-{i}b")])
+                    self.persistence.update_hint_usage(next(iter(self.persistence.metadata)))
+            except Exception as e:
+                errors.append(e)
+        
+        def flusher():
+            try:
+                for _ in range(50):
+                    self.persistence.flush()
+                    self.persistence.compact()
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=saver, args=(n,)) for n in range(4)]
+        threads.append(threading.Thread(target=flusher))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        
+        for hint_id in list(self.persistence.metadata)[::2]:
+            self.assertTrue(self.persistence.delete_hint(hint_id))
+        self.persistence.close()
+        
+        reopened = HintPersistenceManager(self.temp_dir)
+        self.assertEqual(reopened.metadata.keys(), self.persistence.metadata.keys())
+    
+    def test_duplicate_content_from_parallel_batches_is_stored_once(self):
+        """Test that two batches saving the same content produce one record"""
+        # Both batches pass the duplicate check before either writes its file
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def open_after_both_checked(*args, **kwargs):
+            barrier.wait()
+            return open(*args, **kwargs)
+        
+        def saver():
+            self.persistence.save_hints([_hint("Same", content="Same content")])
+        
+        with patch("alpha_bot.auto_hint.persistence.open", open_after_both_checked, create=True):
+            threads = [threading.Thread(target=saver) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        self.assertEqual(len(self.persistence.load_hints_for_skill("CommandSkill")), 1)
+
+
+class TestHintChangeLog(unittest.TestCase):
+    """Test the append-only metadata change log and its compaction"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.persistence = HintPersistenceManager(self.temp_dir)
+    
+    def tearDown(self):
+        self.persistence.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _only_id(self, manager):
+        self.assertEqual(len(manager.metadata), 1)
+        return next(iter(manager.metadata))
+    
+    def test_log_created_on_first_write(self):
+        """Test that reading metadata does not create the log file"""
+        self.assertEqual(self.persistence.metadata, {})
+        self.assertFalse(self.persistence.log_file.exists())
+        
+        self.persistence.save_hint(_hint("First"))
+        
+        self.assertTrue(self.persistence.log_file.exists())
+    
+    def test_log_replayed_after_crash(self):
+        """Test that log entries written before a crash are replayed and a torn last line is skipped"""
+        self.persistence.save_hint(_hint("Old"))
+        self.persistence.close()
+        old_id = self._only_id(self.persistence)
+        record = dict(self.persistence.metadata[old_id], title="New")
+        
+        # The process died after appending these, before compaction; the last append was cut short
+        with open(self.persistence.log_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "upsert", "id": "new-id", "rec": record}) + "\n")
+            f.write(json.dumps({"op": "delete", "id": old_id}) + "\n")
+            f.write('{"op": "upsert", "id": "torn')
+        
+        reopened = HintPersistenceManager(self.temp_dir)
+        try:
+            self.assertEqual(list(reopened.metadata), ["new-id"])
+            self.assertEqual(reopened.metadata["new-id"]["title"], "New")
+        finally:
+            reopened.close()
+    
+    def test_compact_folds_log_into_snapshot(self):
+        """Test that compaction empties the log and the snapshot alone restores the metadata"""
+        self.persistence.save_hints([_hint("A"), _hint("B")])
+        hint_id = next(iter(self.persistence.metadata))
+        self.persistence.update_hint_usage(hint_id)
+        self.persistence.flush()
+        
+        self.persistence.compact()
+        
+        self.assertEqual(self.persistence.log_file.stat().st_size, 0)
+        self.persistence.log_file.unlink()
+        reopened = HintPersistenceManager(self.temp_dir)
+        try:
+            self.assertEqual(reopened.metadata, self.persistence.metadata)
+            self.assertEqual(reopened.metadata[hint_id]["usage_count"], 1)
+        finally:
+            reopened.close()
+    
+    def test_log_compacted_once_larger_than_snapshot(self):
+        """Test that the log never grows past the snapshot size"""
+        self.persistence.save_hints([_hint("A"), _hint("B"), _hint("C")])
+        hint_id = next(iter(self.persistence.metadata))
+        
+        for _ in range(30):
+            self.persistence.update_hint_usage(hint_id)
+            self.persistence.flush()
+            self.assertLessEqual(
+                self.persistence.log_file.stat().st_size,
+                self.persistence.metadata_file.stat().st_size,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
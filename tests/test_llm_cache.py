@@ -0,0 +1,187 @@
+"""LLM Request Batcher and Response Cache Tests"""
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from alpha_bot.llm.base import BaseLLMClient
+from alpha_bot.llm.batcher import LLMBatcher
+from alpha_bot.llm.cache import LLMResponseCache
+from alpha_bot.models.types import LLMResponse
+
+
+class _CountingClient(BaseLLMClient):
+    """LLM client stub that echoes the input and counts API calls"""
+
+    def __init__(self, model="test-model"):
+        super().__init__()
+        self.model = model
+        self.calls = []
+        self.batch_calls = []
+
+    def generate(self, system_prompt, user_prompt, stream_callback=None, response_class=None):
+        self.calls.append(user_prompt)
+        if user_prompt == "empty":
+            return LLMResponse(raw_json="")
+        return LLMResponse(raw_json=f'{{"echo": "{user_prompt}"}}')
+
+    def batch_generate(self, system_prompt, user_inputs, response_class=None):
+        self.batch_calls.append(list(user_inputs))
+        return [self.generate(system_prompt, user_input) for user_input in user_inputs]
+
+
+class TestLLMBatcher(unittest.TestCase):
+    """Test coalescing of identical concurrent requests"""
+
+    def setUp(self):
+        self.batcher = LLMBatcher()
+
+    def _capture(self, outcome, key, call):
+        try:
+            outcome["result"] = self.batcher.submit(key, call)
+        except BaseException as e:
+            outcome["error"] = e
+
+    def _start_owner(self, key, call, outcome):
+        thread = threading.Thread(target=self._capture, args=(outcome, key, call))
+        thread.start()
+        while key not in self.batcher._in_flight:
+            time.sleep(0.001)
+        return thread
+
+    def _start_waiter(self, key, call, outcome):
+        thread = threading.Thread(target=self._capture, args=(outcome, key, call))
+        thread.start()
+        # 给等待方时间拿到进行中的请求
+        time.sleep(0.1)
+        return thread
+
+    def test_concurrent_identical_requests_share_one_call(self):
+        """Test that a request made while an identical one is in flight reuses its result"""
+        release = threading.Event()
+        calls = []
+
+        def call():
+            calls.append(1)
+            release.wait(5)
+            return "response"
+
+        owner_outcome, outcome = {}, {}
+        owner = self._start_owner("k", call, owner_outcome)
+        waiter = self._start_waiter("k", call, outcome)
+        release.set()
+        owner.join(5)
+        waiter.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(owner_outcome["result"], "response")
+        self.assertEqual(outcome["result"], "response")
+        self.assertEqual(self.batcher._in_flight, {})
+
+    def test_error_propagates_to_waiters(self):
+        """Test that the owner's exception is raised in every waiting caller"""
+        release = threading.Event()
+        error = ValueError("api down")
+
+        def call():
+            release.wait(5)
+            raise error
+
+        owner_outcome, outcome = {}, {}
+        owner = self._start_owner("k", call, owner_outcome)
+        waiter = self._start_waiter("k", call, outcome)
+        release.set()
+        owner.join(5)
+        waiter.join(5)
+
+        self.assertIs(owner_outcome["error"], error)
+        self.assertIs(outcome["error"], error)
+        # 失败的请求不会留下，下一次重新发起
+        self.assertEqual(self.batcher.submit("k", lambda: "retry"), "retry")
+
+    def test_different_keys_are_not_coalesced(self):
+        """Test that requests with different keys each call the API"""
+        calls = []
+        self.batcher.submit("a", lambda: calls.append("a"))
+        self.batcher.submit("b", lambda: calls.append("b"))
+
+        self.assertEqual(calls, ["a", "b"])
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    """Test the prompt-keyed LLM response cache (in-memory backend)"""
+
+    def setUp(self):
+        patcher = patch("alpha_bot.llm.cache.diskcache", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = _CountingClient()
+        self.cache = LLMResponseCache(self.client, ttl=60)
+
+    def test_repeated_prompt_served_from_cache(self):
+        """Test that an identical prompt does not call the API again"""
+        first = self.cache.generate("sys", "hello")
+        second = self.cache.generate("sys", "hello")
+
+        self.assertEqual(self.client.calls, ["hello"])
+        self.assertEqual(second.raw_json, first.raw_json)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_depends_on_prompt_and_model(self):
+        """Test that system prompt, input and model all change the key"""
+        key = self.cache.key("sys", "hello")
+
+        self.assertNotEqual(key, self.cache.key("other", "hello"))
+        self.assertNotEqual(key, self.cache.key("sys", "bye"))
+        self.client.model = "other-model"
+        self.assertNotEqual(key, self.cache.key("sys", "hello"))
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are requested again"""
+        with patch("alpha_bot.llm.cache.time.monotonic", return_value=0.0):
+            self.cache.generate("sys", "hello")
+        with patch("alpha_bot.llm.cache.time.monotonic", return_value=61.0):
+            self.cache.generate("sys", "hello")
+
+        self.assertEqual(self.client.calls, ["hello", "hello"])
+
+    def test_empty_response_not_cached(self):
+        """Test that empty responses are requested again next time"""
+        self.cache.generate("sys", "empty")
+        self.cache.generate("sys", "empty")
+
+        self.assertEqual(self.client.calls, ["empty", "empty"])
+
+    def test_streaming_bypasses_cache(self):
+        """Test that streamed calls always go to the underlying client"""
+        self.cache.generate("sys", "hello", stream_callback=lambda chunk: None)
+        self.cache.generate("sys", "hello", stream_callback=lambda chunk: None)
+
+        self.assertEqual(self.client.calls, ["hello", "hello"])
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+
+    def test_batch_generate_requests_only_misses(self):
+        """Test that cached inputs are skipped in the batch sent to the client"""
+        self.cache.generate("sys", "b")
+
+        results = self.cache.batch_generate("sys", ["a", "b", "c"])
+
+        self.assertEqual(self.client.batch_calls, [["a", "c"]])
+        self.assertEqual([r.raw_json for r in results], ['{"echo": "a"}', '{"echo": "b"}', '{"echo": "c"}'])
+
+    def test_clear(self):
+        """Test that clear() drops every entry"""
+        self.cache.generate("sys", "hello")
+        self.cache.clear()
+        self.cache.generate("sys", "hello")
+
+        self.assertEqual(self.client.calls, ["hello", "hello"])
+
+    def test_attributes_forwarded_to_client(self):
+        """Test that unknown attributes are read from the wrapped client"""
+        self.assertEqual(self.cache.model, "test-model")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Numeric Kernel Tests"""
+
+import itertools
+import random
+import unittest
+from array import array
+from unittest.mock import patch
+
+from alpha_bot.auto_hint import _numeric
+
+
+def _columns():
+    """Every flag column up to length 8 plus a few long random ones"""
+    for length in range(9):
+        for flags in itertools.product((0, 1), repeat=length):
+            yield array('B', flags)
+    rng = random.Random(0)
+    for _ in range(20):
+        yield array('B', (rng.random() < 0.7 for _ in range(rng.randint(50, 500))))
+
+
+def _python_results():
+    """Results of the plain Python fallback for every column"""
+    with patch.multiple(_numeric, np=None, _max_run_of_zeros_jit=None, _segment_success_runs_jit=None):
+        return [
+            (_numeric.max_run_of_zeros(ok), [_numeric.segment_success_runs(ok, n) for n in range(5)])
+            for ok in _columns()
+        ]
+
+
+class TestNumericKernels(unittest.TestCase):
+    """Test that the numba, numpy and python implementations agree"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = _python_results()
+
+    def _results(self):
+        return [
+            (_numeric.max_run_of_zeros(ok), [_numeric.segment_success_runs(ok, n) for n in range(5)])
+            for ok in _columns()
+        ]
+
+    def test_python_fallback(self):
+        """Test the plain Python implementation on small known columns"""
+        with patch.multiple(_numeric, np=None, _max_run_of_zeros_jit=None, _segment_success_runs_jit=None):
+            ok = array('B', [1, 0, 0, 1, 1, 1, 0, 1, 1])
+            self.assertEqual(_numeric.max_run_of_zeros(ok), 2)
+            self.assertEqual(_numeric.segment_success_runs(ok, 2), [(3, 6), (7, 9)])
+            self.assertEqual(_numeric.max_run_of_zeros(array('B')), 0)
+            self.assertEqual(_numeric.segment_success_runs(array('B'), 1), [])
+
+    @unittest.skipIf(_numeric.np is None, "numpy not installed")
+    def test_numpy_matches_python(self):
+        """Test that the NumPy implementation gives the same results as the fallback"""
+        with patch.multiple(_numeric, _max_run_of_zeros_jit=None, _segment_success_runs_jit=None):
+            self.assertEqual(self._results(), self.expected)
+
+    @unittest.skipIf(_numeric._max_run_of_zeros_jit is None, "numba not installed")
+    def test_numba_matches_python(self):
+        """Test that the Numba kernels give the same results as the fallback"""
+        self.assertEqual(self._results(), self.expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""LLM Rate Limiter Tests"""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from alpha_bot.llm._limits import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test the async token bucket and in-flight limit"""
+
+    def _run_requests(self, limiter, count):
+        """Run `count` concurrent requests through the limiter and return the peak concurrency"""
+        state = {"inflight": 0, "peak": 0}
+
+        async def request():
+            async with limiter:
+                state["inflight"] += 1
+                state["peak"] = max(state["peak"], state["inflight"])
+                await asyncio.sleep(0.01)
+                state["inflight"] -= 1
+
+        async def main():
+            await asyncio.gather(*(request() for _ in range(count)))
+
+        asyncio.run(main())
+        return state["peak"]
+
+    def test_limits_inflight_requests(self):
+        """Test that no more than max_inflight requests run at once"""
+        limiter = RateLimiter(rpm=0, max_inflight=2)
+
+        self.assertEqual(self._run_requests(limiter, 6), 2)
+
+    def test_usable_across_event_loops(self):
+        """Test that one limiter works across separate asyncio.run invocations"""
+        limiter = RateLimiter(rpm=0, max_inflight=2)
+
+        self.assertEqual(self._run_requests(limiter, 4), 2)
+        self.assertEqual(self._run_requests(limiter, 4), 2)
+
+    def test_semaphore_created_per_loop(self):
+        """Test that each running loop gets its own semaphore"""
+        limiter = RateLimiter(rpm=0, max_inflight=2)
+
+        async def current():
+            return limiter._semaphore()
+
+        first = asyncio.run(current())
+        second = asyncio.run(current())
+
+        self.assertIsNot(first, second)
+
+    def test_no_wait_without_rpm(self):
+        """Test that wait() returns immediately when no rate is configured"""
+        limiter = RateLimiter(rpm=0)
+        with patch("alpha_bot.llm._limits.asyncio.sleep", new_callable=AsyncMock) as sleep:
+            asyncio.run(limiter.wait())
+        sleep.assert_not_called()
+
+    def test_bucket_paces_requests_after_burst(self):
+        """Test that requests beyond the bucket capacity wait for refilled tokens"""
+        with patch("alpha_bot.llm._limits.time.monotonic", return_value=0.0):
+            limiter = RateLimiter(rpm=60)
+
+            async def main():
+                for _ in range(62):
+                    await limiter.wait()
+
+            with patch("alpha_bot.llm._limits.asyncio.sleep", new_callable=AsyncMock) as sleep:
+                asyncio.run(main())
+
+        # 60 个令牌的突发直接通过，之后每个请求多等一秒
+        self.assertEqual([call.args[0] for call in sleep.await_args_list], [1.0, 2.0])
+
+    def test_rpm_from_environment(self):
+        """Test that OPENAI_RPM is used when rpm is not given"""
+        with patch.dict("os.environ", {"OPENAI_RPM": "120"}):
+            limiter = RateLimiter()
+        self.assertEqual(limiter.rpm, 120.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+"""Semantic Cache Tests"""
+
+import unittest
+from unittest.mock import patch
+
+from alpha_bot.cache.semantic import SemanticCache, SemanticTextCache
+from alpha_bot.models.types import ExecutionResult, SkillResponse
+
+
+class _Matrix:
+    """Minimal stand-in for the 2-D arrays faiss returns"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.shape = (len(rows), len(rows[0]))
+
+    def __getitem__(self, key):
+        row, column = key
+        return self.rows[row][column]
+
+
+class _FlatIndex:
+    """Brute-force inner-product index with the faiss.IndexFlatIP interface used by the cache"""
+
+    def __init__(self, dim):
+        self.vectors = []
+
+    @property
+    def ntotal(self):
+        return len(self.vectors)
+
+    def add(self, matrix):
+        self.vectors.extend(matrix.rows)
+
+    def search(self, matrix, k):
+        query = matrix.rows[0]
+        scores = [sum(a * b for a, b in zip(query, vector)) for vector in self.vectors]
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return _Matrix([[scores[best]]]), _Matrix([[best]])
+
+
+class _FakeFaiss:
+    IndexFlatIP = _FlatIndex
+
+
+# 相似的提示词映射到几乎相同的向量（余弦相似度 > 0.99）
+_EMBEDDINGS = {
+    "delete a.txt": [1.0, 0.0],
+    "delete b.txt": [0.995, 0.0999],
+    "what is in a.txt": [0.0, 1.0],
+    "what's in a.txt": [0.0999, 0.995],
+}
+
+
+def _embed(text):
+    # 只按任务部分取向量，上一步的状态不影响相似度
+    task = text.split(SemanticCache.STATE_SEPARATOR)[0]
+    return _Matrix([_EMBEDDINGS[" ".join(task.split())]])
+
+
+def _response(command="", direct_response=""):
+    return SkillResponse(skill_name="CommandSkill", skill=object(), command=command, direct_response=direct_response)
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test when a cached skill response may be replayed"""
+
+    def setUp(self):
+        patcher = patch("alpha_bot.cache.semantic.faiss", _FakeFaiss)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = SemanticCache(threshold=0.95)
+        self.cache.available = True
+        self.cache._embed = _embed
+
+    def test_command_not_replayed_for_similar_prompt(self):
+        """Test that a command response is not replayed for a different but similar prompt"""
+        self.cache.store("delete a.txt", _response(command="cat a.txt"))
+
+        self.assertIsNone(self.cache.lookup("delete b.txt"))
+
+    def test_command_replayed_for_exact_prompt(self):
+        """Test that a command response is replayed for the same prompt, ignoring whitespace"""
+        self.cache.store("delete a.txt", _response(command="ls a.txt"))
+
+        hit = self.cache.lookup("delete  a.txt ")
+
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit.command, "ls a.txt")
+
+    def test_parallel_commands_need_exact_prompt(self):
+        """Test that parallel commands are treated like a single command"""
+        response = _response()
+        response.parallel_commands = ["cat a.txt", "cat b.txt"]
+        self.cache.store("delete a.txt", response)
+
+        self.assertIsNone(self.cache.lookup("delete b.txt"))
+
+    def test_commandless_response_replayed_for_similar_prompt(self):
+        """Test that a response without a command is replayed on similarity alone"""
+        self.cache.store("what is in a.txt", _response(direct_response="hello"))
+
+        hit = self.cache.lookup("what's in a.txt")
+
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit.direct_response, "hello")
+
+    def test_expired_entry_misses(self):
+        """Test that entries older than the TTL are not replayed"""
+        self.cache.ttl = 10
+        with patch("alpha_bot.cache.semantic.time.monotonic", return_value=100.0):
+            self.cache.store("delete a.txt", _response(command="ls a.txt"))
+        with patch("alpha_bot.cache.semantic.time.monotonic", return_value=111.0):
+            self.assertIsNone(self.cache.lookup("delete a.txt"))
+
+    def test_dangerous_response_not_stored(self):
+        """Test that dangerous responses are never cached"""
+        response = _response(command="rm -rf build")
+        response.is_dangerous = True
+        self.cache.store("delete a.txt", response)
+
+        self.assertIsNone(self.cache.lookup("delete a.txt"))
+
+    def test_non_idempotent_command_not_stored(self):
+        """Test that rm, mv and curl POST responses are never replayed, even for the exact prompt"""
+        self.cache.store("what is in a.txt", _response(direct_response="hello"))
+        for command in ("rm a.txt", "mv a.txt b.txt", "curl -X POST https://example.com/api",
+                        "curl --request POST https://example.com/api"):
+            self.cache.store("delete a.txt", _response(command=command))
+            self.assertIsNone(self.cache.lookup("delete a.txt"), command)
+
+        response = _response()
+        response.parallel_commands = ["ls", "rm a.txt"]
+        self.cache.store("delete a.txt", response)
+        self.assertIsNone(self.cache.lookup("delete a.txt"))
+
+    def test_idempotent_command_stored(self):
+        """Test that read-only commands are still cached"""
+        self.cache.store("delete a.txt", _response(command="curl https://example.com/a.txt"))
+
+        self.assertIsNotNone(self.cache.lookup("delete a.txt"))
+
+    def test_text_cache_replays_similar_prompt(self):
+        """Test that plain text responses are replayed on similarity"""
+        cache = SemanticTextCache(threshold=0.95)
+        cache.available = True
+        cache._embed = _embed
+        cache.store("what is in a.txt", "a hint")
+
+        self.assertEqual(cache.lookup("what's in a.txt"), "a hint")
+
+    def test_unavailable_cache_misses(self):
+        """Test that the cache is a no-op without faiss and sentence-transformers"""
+        cache = SemanticCache()
+        cache.available = False
+        cache.store("delete a.txt", _response(command="rm a.txt"))
+
+        self.assertIsNone(cache.lookup("delete a.txt"))
+
+
+
+class TestSemanticCacheKey(unittest.TestCase):
+    """Test that the previous step's outcome is part of the cache key"""
+
+    def setUp(self):
+        patcher = patch("alpha_bot.cache.semantic.faiss", _FakeFaiss)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = SemanticCache(threshold=0.95)
+        self.cache.available = True
+        self.cache._embed = _embed
+        self.ok = ExecutionResult(command="cat a.txt", returncode=0, stdout="hello", stderr="")
+        self.failed = ExecutionResult(command="cat a.txt", returncode=1, stdout="", stderr="No such file")
+
+    def test_key_includes_returncode_and_stdout(self):
+        """Test that the same command with another exit code or output gives another key"""
+        key = SemanticCache.make_key("task", self.ok, 2)
+        other_output = ExecutionResult(command="cat  a.txt", returncode=0, stdout="bye", stderr="")
+
+        self.assertNotEqual(key, SemanticCache.make_key("task", self.failed, 2))
+        self.assertNotEqual(key, SemanticCache.make_key("task", other_output, 2))
+        self.assertEqual(key, SemanticCache.make_key("task", ExecutionResult("cat  a.txt", 0, "hello", ""), 3))
+
+    def test_stdout_tail_is_bounded(self):
+        """Test that only the end of a long stdout goes into the key"""
+        long_output = ExecutionResult(command="cat big", returncode=0, stdout="x" * 10000 + "end", stderr="")
+
+        key = SemanticCache.make_key("task", long_output, 2)
+
+        self.assertLess(len(key), SemanticCache.STDOUT_TAIL + 100)
+        self.assertIn("end", key)
+
+    def test_failed_previous_step_misses(self):
+        """Test that a response cached after a successful step is not replayed after a failed one"""
+        self.cache.store(SemanticCache.make_key("what is in a.txt", self.ok, 2), _response(direct_response="hello"))
+        self.cache.store(SemanticCache.make_key("delete a.txt", self.ok, 2), _response(command="ls a.txt"))
+
+        self.assertIsNone(self.cache.lookup(SemanticCache.make_key("what is in a.txt", self.failed, 2)))
+        self.assertIsNone(self.cache.lookup(SemanticCache.make_key("what's in a.txt", self.failed, 2)))
+        self.assertIsNone(self.cache.lookup(SemanticCache.make_key("delete a.txt", self.failed, 2)))
+
+    def test_same_previous_step_hits(self):
+        """Test that a similar task after the same previous step still hits"""
+        self.cache.store(SemanticCache.make_key("what is in a.txt", self.ok, 2), _response(direct_response="hello"))
+
+        hit = self.cache.lookup(SemanticCache.make_key("what's in a.txt", self.ok, 2))
+
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit.direct_response, "hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
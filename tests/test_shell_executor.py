@@ -0,0 +1,158 @@
+"""Shell Executor Output Buffer Tests"""
+
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from alpha_bot.executor.shell import ShellExecutor, _TailBuffer
+
+
+class TestTailBuffer(unittest.TestCase):
+    """Test the bounded buffer that keeps the end of a command's output"""
+
+    def test_small_output_kept_whole(self):
+        """Test that output under the limit is kept as-is"""
+        buffer = _TailBuffer(10)
+        buffer.append(b"abc")
+        buffer.append(b"def")
+
+        self.assertEqual(buffer.getvalue(), b"abcdef")
+        self.assertFalse(buffer.truncated)
+
+    def test_keeps_last_limit_bytes(self):
+        """Test that only the last `limit` bytes survive and truncation is flagged"""
+        buffer = _TailBuffer(5)
+        for chunk in (b"0123", b"4567", b"89"):
+            buffer.append(chunk)
+
+        self.assertEqual(buffer.getvalue(), b"56789")
+        self.assertTrue(buffer.truncated)
+
+    def test_drops_whole_chunks_while_appending(self):
+        """Test that old chunks are released as soon as they are no longer needed"""
+        buffer = _TailBuffer(4)
+        for _ in range(100):
+            buffer.append(b"xy")
+
+        self.assertLessEqual(len(buffer.chunks), 3)
+        self.assertTrue(buffer.truncated)
+
+    def test_exact_limit_not_truncated(self):
+        """Test that output of exactly `limit` bytes is not reported as truncated"""
+        buffer = _TailBuffer(4)
+        buffer.append(b"ab")
+        buffer.append(b"cd")
+
+        self.assertEqual(buffer.getvalue(), b"abcd")
+        self.assertFalse(buffer.truncated)
+
+
+class TestDecodeTail(unittest.TestCase):
+    """Test decoding of a byte tail that may start inside a UTF-8 character"""
+
+    def test_skips_partial_leading_character(self):
+        """Test that continuation bytes cut off from their lead byte are dropped"""
+        data = "你好世界".encode("utf-8")
+        for cut in range(1, 3):
+            self.assertEqual(ShellExecutor._decode_tail(data[cut:], True), "好世界")
+
+    def test_untruncated_data_decoded_as_is(self):
+        """Test that a stray continuation byte in full output is replaced, not skipped"""
+        self.assertEqual(ShellExecutor._decode_tail(b"\x80ok", False), "�ok")
+
+    def test_at_most_three_bytes_skipped(self):
+        """Test that invalid data does not make the decoder skip more than one character"""
+        self.assertEqual(ShellExecutor._decode_tail(b"\x80\x80\x80\x80ok", True), "�ok")
+
+    def test_streamed_output_tail_decodes_cleanly(self):
+        """Test that a truncated multibyte stream is decoded without replacement characters"""
+        executor = ShellExecutor()
+        executor.STREAM_MAX_OUTPUT = 1000
+
+        result = executor.execute(f"\"{sys.executable}\" -c \"print('好' * 5000, end='')\"")
+
+        self.assertEqual(result.returncode, 0)
+        self.assertNotIn("�", result.stdout)
+        self.assertTrue(result.stdout.endswith("好" * 300))
+
+
+
+class TestTruncationMarker(unittest.TestCase):
+    """Test that only the stream that lost data is marked as truncated"""
+
+    MARKER = "...(前面的输出已截断)"
+
+    def setUp(self):
+        self.executor = ShellExecutor()
+        self.executor.STREAM_MAX_OUTPUT = 100
+
+    def _command(self, stdout_chars, stderr_chars):
+        script = f"import sys; sys.stdout.write('o' * {stdout_chars}); sys.stderr.write('e' * {stderr_chars})"
+        return f"\"{sys.executable}\" -c \"{script}\""
+
+    def _check(self, run):
+        result = run(self._command(1000, 10))
+        self.assertTrue(result.stdout.startswith(self.MARKER))
+        self.assertEqual(result.stderr, "e" * 10)
+
+        result = run(self._command(10, 1000))
+        self.assertEqual(result.stdout, "o" * 10)
+        self.assertTrue(result.stderr.startswith(self.MARKER))
+        self.assertTrue(result.stderr.endswith("e" * 100))
+
+        result = run(self._command(10, 10))
+        self.assertNotIn(self.MARKER, result.stdout + result.stderr)
+
+    def test_streaming_marks_only_truncated_stream(self):
+        """Test per-stream truncation markers in the streaming executor"""
+        self._check(self.executor.execute)
+
+    def test_blocking_marks_only_truncated_stream(self):
+        """Test per-stream truncation markers in the blocking fallback"""
+        self._check(lambda command: self.executor._execute_blocking(command, timeout=30))
+
+
+class TestStreamingInterrupt(unittest.TestCase):
+    """Test that the child process is killed and reaped when streaming is aborted"""
+
+    COMMAND = f"\"{sys.executable}\" -c \"import time; print('ready', flush=True); time.sleep(60)\""
+
+    def setUp(self):
+        self.processes = []
+        popen = subprocess.Popen
+
+        def spawn(*args, **kwargs):
+            self.processes.append(popen(*args, **kwargs))
+            return self.processes[-1]
+
+        patcher = patch("alpha_bot.executor.shell.subprocess.Popen", side_effect=spawn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, error):
+        def on_chunk(data):
+            raise error
+
+        return ShellExecutor().execute_streaming(self.COMMAND, on_chunk=on_chunk, timeout=30)
+
+    def test_error_in_callback_reaps_child(self):
+        """Test that an exception from on_chunk kills the command and leaves no zombie"""
+        result = self._run(RuntimeError("display failed"))
+
+        self.assertEqual(result.returncode, -1)
+        self.assertIn("display failed", result.stderr)
+        self.assertIsNotNone(self.processes[0].returncode)
+
+    def test_keyboard_interrupt_kills_child_and_propagates(self):
+        """Test that Ctrl+C during streaming kills and reaps the command before re-raising"""
+        with self.assertRaises(KeyboardInterrupt):
+            self._run(KeyboardInterrupt())
+
+        process = self.processes[0]
+        self.assertIsNotNone(process.returncode)
+        self.assertTrue(process.stdout.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Web UI Wrapper Tests"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from alpha_bot.web.server import WebUI
+
+
+class TestExecutionOutput(unittest.TestCase):
+    """Test that streamed command output is decoded correctly for the web client"""
+
+    def setUp(self):
+        web_ui = WebUI.__new__(WebUI)
+        web_ui.socketio = MagicMock()
+        self.socketio = web_ui.socketio
+        self.wrapper = web_ui._create_web_ui_wrapper(MagicMock(), "session-1")
+
+    def _outputs(self):
+        return [
+            call.args[1]["output"] for call in self.socketio.emit.call_args_list
+            if call.args[0] == "execution_output"
+        ]
+
+    def test_character_split_across_chunks(self):
+        """Test that a multibyte character split between chunks is emitted whole"""
+        data = "好好".encode("utf-8")
+        with self.wrapper.executing_animation("cat file"):
+            for i in range(len(data)):
+                self.wrapper.append_output(data[i:i + 1])
+
+        self.assertEqual("".join(self._outputs()), "好好")
+        self.assertNotIn("", self._outputs())
+
+    def test_unfinished_character_flushed_at_end(self):
+        """Test that bytes of a character the command never finished are flushed as a replacement"""
+        with self.wrapper.executing_animation("head -c 4 file"):
+            self.wrapper.append_output("ok".encode("utf-8") + "好".encode("utf-8")[:2])
+
+        self.assertEqual(self._outputs(), ["ok", "�"])
+
+    def test_each_execution_gets_a_fresh_decoder(self):
+        """Test that a partial character from one command does not leak into the next"""
+        with self.wrapper.executing_animation("first"):
+            self.wrapper.append_output("好".encode("utf-8")[:1])
+        with self.wrapper.executing_animation("second"):
+            self.wrapper.append_output(b"next")
+
+        self.assertEqual(self._outputs(), ["�", "next"])
+
+
+if __name__ == "__main__":
+    unittest.main()